@@ -0,0 +1,153 @@
+"""
+LifeArc POC - Page Render Benchmark
+===================================
+Renders every sidebar page of the Streamlit apps against the local DuckDB
+backend (local_backend.py) with Streamlit's AppTest harness and reports, per
+page:
+- cold render time (caches cleared) and median warm rerun time
+- queries issued on the cold render and on each warm rerun
+- uncaught exceptions
+
+Results can be saved as a baseline and later runs compared against it, which
+fails (exit code 1) when a page slows down beyond the tolerance or issues more
+queries per rerun than before.
+
+    python local_dev/benchmark_pages.py --rows 200000 --save baseline.json
+    python local_dev/benchmark_pages.py --rows 200000 --compare baseline.json
+
+Requires streamlit, snowflake-snowpark-python, duckdb, pandas and altair.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+APPS = {
+    "dashboard": REPO_ROOT / "streamlit" / "lifearc_ml_dashboard.py",
+    "intelligence": REPO_ROOT / "streamlit_apps" / "intelligence_demo.py",
+    "unstructured": REPO_ROOT / "streamlit_apps" / "unstructured_data_demo.py",
+}
+
+
+def timed_run(at, session):
+    """Run the script once; return (ms, queries issued)."""
+    before = session.query_count()
+    start = time.perf_counter()
+    at.run()
+    return (time.perf_counter() - start) * 1000, session.query_count() - before
+
+
+def benchmark_app(name, path, session, reruns, timeout, fast_mode=False):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(path), default_timeout=timeout)
+    at.run()
+    if fast_mode and name == "dashboard":
+        at.toggle(key="fast_mode").set_value(True)
+    nav = at.sidebar.radio[0]
+    results = []
+    for page in nav.options:
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        at.sidebar.radio[0].set_value(page)
+        cold_ms, cold_queries = timed_run(at, session)
+
+        warm = [timed_run(at, session) for _ in range(reruns)]
+        results.append({
+            'app': name,
+            'page': page,
+            'cold_ms': round(cold_ms, 1),
+            'warm_ms': round(statistics.median(ms for ms, _ in warm), 1) if warm else None,
+            'cold_queries': cold_queries,
+            'queries_per_rerun': max(q for _, q in warm) if warm else None,
+            'exceptions': len(at.exception)
+        })
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Regressions against a saved run: slower warm renders or more queries.
+
+    A slowdown only counts when it exceeds both the relative tolerance and
+    ``min_delta_ms``, so jitter on pages that render in a few ms is ignored.
+    """
+    previous = {(r['app'], r['page']): r for r in baseline}
+    failures = []
+    for r in results:
+        base = previous.get((r['app'], r['page']))
+        if base is None:
+            continue
+        label = f"{r['app']} / {r['page']}"
+        slowdown = r['warm_ms'] - base['warm_ms']
+        if slowdown > base['warm_ms'] * tolerance and slowdown > min_delta_ms:
+            failures.append(f"{label}: warm render {base['warm_ms']} ms -> {r['warm_ms']} ms")
+        if r['queries_per_rerun'] > base['queries_per_rerun']:
+            failures.append(f"{label}: queries per rerun {base['queries_per_rerun']} -> {r['queries_per_rerun']}")
+        if r['exceptions'] > base['exceptions']:
+            failures.append(f"{label}: exceptions {base['exceptions']} -> {r['exceptions']}")
+    return failures
+
+
+def print_table(results):
+    header = f"{'APP':<14}{'PAGE':<28}{'COLD MS':>10}{'WARM MS':>10}{'COLD Q':>8}{'Q/RERUN':>9}{'EXC':>5}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['app']:<14}{r['page'][:27]:<28}{r['cold_ms']:>10}{r['warm_ms']:>10}"
+              f"{r['cold_queries']:>8}{r['queries_per_rerun']:>9}{r['exceptions']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=list(APPS) + ["all"], default="all")
+    parser.add_argument("--rows", type=int, default=200000, help="synthetic clinical rows to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns per page")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument("--fast-mode", action="store_true", help="render the dashboard with fast mode on")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed warm render slowdown (fraction)")
+    parser.add_argument("--min-delta-ms", type=float, default=50, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    # The apps import local_backend, app_queries, vector_search (and the dashboard response_scorer) by name
+    os.environ["LIFEARC_DATA_BACKEND"] = "local"
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    os.environ["LIFEARC_LOCAL_ROWS"] = str(args.rows)
+    sys.path[:0] = [str(Path(__file__).resolve().parent), str(REPO_ROOT / "streamlit")]
+    from local_backend import get_local_session
+
+    start = time.perf_counter()
+    session = get_local_session(rows=args.rows, seed=args.seed)
+    print(f"Built local database ({args.rows:,} rows) in {time.perf_counter() - start:.1f}s\n")
+
+    apps = APPS if args.app == "all" else {args.app: APPS[args.app]}
+    results = []
+    for name, path in apps.items():
+        results.extend(benchmark_app(name, path, session, args.reruns, args.timeout, args.fast_mode))
+    print_table(results)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"\nSaved {len(results)} page results to {args.save}")
+
+    if args.compare:
+        failures = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance, args.min_delta_ms)
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"- {failure}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
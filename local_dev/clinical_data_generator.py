@@ -0,0 +1,425 @@
+"""
+LifeArc POC - Synthetic Clinical Trial Data Generator
+=====================================================
+Vectorized NumPy generator for CLINICAL_TRIAL_RESULTS-shaped data at scale
+(10M, 100M, 1B rows), for load-testing the dashboard, the ML_FEATURE_STORE
+views and the dbt marts beyond the fixed 1M benchmark table.
+
+Rows are drawn from a profile holding:
+- the joint distribution of (TRIAL_ID, TARGET_GENE, TREATMENT_ARM,
+  BIOMARKER_STATUS, CTDNA_CONFIRMATION) strata, each with its own
+  response-category probabilities, so per-gene rates and the biomarker,
+  ctDNA and arm effects carry over
+- PFS/OS mean and spread per (TARGET_GENE, RESPONSE_CATEGORY)
+- age, sex, cohort, site and adverse-event marginals
+
+The profile comes from demo_data/clinical_outcomes.csv (survival, age, sex and
+adverse events) plus the built-in gene response rates. It can be refit from
+the statistics of an existing table with ``profile_from_table``.
+
+Output is one Parquet file per chunk, so memory stays bounded by
+``--chunk-rows``. Every chunk has its own seed derived from (seed, chunk), so
+a run is reproducible and chunks can be generated in parallel or on several
+machines. A copy_into.sql next to the files loads them with one COPY.
+
+    python local_dev/clinical_data_generator.py --rows 100000000 --out /data/ctr_100m --workers 8
+    python local_dev/clinical_data_generator.py --rows 10000000 --out ctr_10m \\
+        --profile-from-table LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M --connection my_lifearc_poc
+"""
+
+import argparse
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+DEMO_DATA_DIR = Path(__file__).resolve().parent.parent / "demo_data"
+
+# Trial -> target gene, as in the dashboard's prediction form
+TRIAL_GENES = {
+    "TRIAL-BRCA-001": "BRCA1",
+    "TRIAL-BRCA-002": "BRCA2",
+    "TRIAL-EGFR-001": "EGFR",
+    "TRIAL-KRAS-001": "KRAS",
+    "TRIAL-TP53-001": "TP53"
+}
+
+# Base responder probability per gene; biomarker/ctDNA/arm shift it
+GENE_RESPONSE_RATES = {"BRCA1": 0.53, "BRCA2": 0.48, "EGFR": 0.41, "KRAS": 0.32, "TP53": 0.27}
+BIOMARKER_EFFECT = {"POSITIVE": 0.08, "NEGATIVE": -0.08}
+CTDNA_EFFECT = {"YES": 0.05, "NO": 0.0}
+ARM_EFFECT = {"Combination": 0.06, "Experimental": 0.0, "Standard": -0.06}
+
+RESPONSE_CATEGORIES = ["Complete_Response", "Partial_Response", "Stable_Disease", "Progressive_Disease"]
+STRATUM_COLUMNS = ["TRIAL_ID", "TARGET_GENE", "TREATMENT_ARM", "BIOMARKER_STATUS", "CTDNA_CONFIRMATION"]
+COHORTS = ["Cohort_A", "Cohort_B", "Cohort_C"]
+SITES_PER_TRIAL = 6
+CREATED_RANGE = ("2022-01-01", "2025-01-01")
+
+OUTPUT_COLUMNS = [
+    "RESULT_ID", "PATIENT_ID", "TRIAL_ID", "SITE_ID", "TARGET_GENE", "TREATMENT_ARM", "BIOMARKER_STATUS",
+    "CTDNA_CONFIRMATION", "COHORT", "PATIENT_AGE", "PATIENT_SEX", "RESPONSE_CATEGORY", "PFS_MONTHS",
+    "OS_MONTHS", "ADVERSE_EVENTS", "CREATED_AT"
+]
+
+
+# =============================================================================
+# PROFILES
+# =============================================================================
+
+def default_profile(outcomes_csv=DEMO_DATA_DIR / "clinical_outcomes.csv"):
+    """Profile from the built-in gene effects and demo_data/clinical_outcomes.csv."""
+    with open(outcomes_csv, newline="") as f:
+        patients = list(csv.DictReader(f))
+
+    # Response mix: responders split CR/PR and non-responders SD/PD in the
+    # proportions seen in the demo study
+    counts = {c: sum(p["RESPONSE"] == c for p in patients) for c in RESPONSE_CATEGORIES}
+    cr_share = counts["Complete_Response"] / max(counts["Complete_Response"] + counts["Partial_Response"], 1)
+    sd_share = counts["Stable_Disease"] / max(counts["Stable_Disease"] + counts["Progressive_Disease"], 1)
+
+    strata = []
+    for trial, arm, biomarker, ctdna in product(TRIAL_GENES, ARM_EFFECT, BIOMARKER_EFFECT, CTDNA_EFFECT):
+        gene = TRIAL_GENES[trial]
+        p = float(np.clip(GENE_RESPONSE_RATES[gene] + BIOMARKER_EFFECT[biomarker]
+                          + CTDNA_EFFECT[ctdna] + ARM_EFFECT[arm], 0.02, 0.95))
+        weight = (1 / len(TRIAL_GENES)) * (1 / len(ARM_EFFECT)) \
+            * (0.55 if biomarker == "POSITIVE" else 0.45) * (0.45 if ctdna == "YES" else 0.55)
+        strata.append({
+            "TRIAL_ID": trial, "TARGET_GENE": gene, "TREATMENT_ARM": arm,
+            "BIOMARKER_STATUS": biomarker, "CTDNA_CONFIRMATION": ctdna,
+            "WEIGHT": weight,
+            "RESPONSE_PROBS": [p * cr_share, p * (1 - cr_share), (1 - p) * sd_share, (1 - p) * (1 - sd_share)]
+        })
+
+    survival = {}
+    for category in RESPONSE_CATEGORIES:
+        rows = [p for p in patients if p["RESPONSE"] == category]
+        pfs = np.array([float(p["PFS_MONTHS"]) for p in rows])
+        os_ = np.array([float(p["OS_MONTHS"]) for p in rows])
+        # Two demo patients per category: floor the spread at 25% of the mean
+        survival[f"*|{category}"] = {
+            "PFS_MEAN": float(pfs.mean()), "PFS_STD": float(max(pfs.std(), 0.25 * pfs.mean())),
+            "OS_MEAN": float(os_.mean()), "OS_STD": float(max(os_.std(), 0.25 * os_.mean()))
+        }
+
+    ages = np.array([float(p["AGE"]) for p in patients])
+    adverse = {}
+    for p in patients:
+        adverse[p["ADVERSE_EVENTS"]] = adverse.get(p["ADVERSE_EVENTS"], 0) + 1
+
+    return {
+        "strata": strata,
+        "survival": survival,
+        "age": {"MEAN": float(ages.mean()), "STD": float(max(ages.std(), 8.0)), "MIN": 18, "MAX": 90},
+        "sex": {"F": sum(p["SEX"] == "F" for p in patients) / len(patients),
+                "M": sum(p["SEX"] == "M" for p in patients) / len(patients)},
+        "cohort": {c: 1 / len(COHORTS) for c in COHORTS},
+        "adverse_events": {k: v / len(patients) for k, v in adverse.items()},
+        "sites_per_trial": SITES_PER_TRIAL
+    }
+
+
+def profile_from_table(session, table, base=None):
+    """Refit strata, survival, age, sex and cohort marginals from an existing
+    table, keeping ``base`` (default_profile()) for anything it lacks."""
+    profile = dict(base or default_profile())
+    strata = session.sql(f"""
+        SELECT
+            {', '.join(STRATUM_COLUMNS)},
+            COUNT(*) AS N,
+            {', '.join(f"SUM(IFF(RESPONSE_CATEGORY = '{c}', 1, 0)) AS {c.upper()}" for c in RESPONSE_CATEGORIES)}
+        FROM {table}
+        WHERE RESPONSE_CATEGORY IS NOT NULL
+        GROUP BY {', '.join(STRATUM_COLUMNS)}
+    """).collect()
+    total = sum(r["N"] for r in strata)
+    profile["strata"] = [{
+        **{c: r[c] for c in STRATUM_COLUMNS},
+        "WEIGHT": r["N"] / total,
+        "RESPONSE_PROBS": [r[c.upper()] / r["N"] for c in RESPONSE_CATEGORIES]
+    } for r in strata]
+
+    survival = session.sql(f"""
+        SELECT
+            TARGET_GENE, RESPONSE_CATEGORY,
+            AVG(PFS_MONTHS) AS PFS_MEAN, STDDEV(PFS_MONTHS) AS PFS_STD,
+            AVG(OS_MONTHS) AS OS_MEAN, STDDEV(OS_MONTHS) AS OS_STD
+        FROM {table}
+        WHERE RESPONSE_CATEGORY IS NOT NULL
+        GROUP BY TARGET_GENE, RESPONSE_CATEGORY
+    """).collect()
+    profile["survival"] = {
+        **profile["survival"],
+        **{f"{r['TARGET_GENE']}|{r['RESPONSE_CATEGORY']}": {
+            k: float(r[k] or 0.0) for k in ("PFS_MEAN", "PFS_STD", "OS_MEAN", "OS_STD")
+        } for r in survival}
+    }
+
+    marginals = session.sql(f"""
+        SELECT
+            AVG(PATIENT_AGE) AS AGE_MEAN, STDDEV(PATIENT_AGE) AS AGE_STD,
+            MIN(PATIENT_AGE) AS AGE_MIN, MAX(PATIENT_AGE) AS AGE_MAX,
+            AVG(IFF(PATIENT_SEX = 'F', 1, 0)) AS FEMALE_SHARE
+        FROM {table}
+    """).collect()[0]
+    profile["age"] = {"MEAN": float(marginals["AGE_MEAN"]), "STD": float(marginals["AGE_STD"]),
+                      "MIN": int(marginals["AGE_MIN"]), "MAX": int(marginals["AGE_MAX"])}
+    female = float(marginals["FEMALE_SHARE"])
+    profile["sex"] = {"F": female, "M": 1 - female}
+
+    cohorts = session.sql(f"SELECT COHORT, COUNT(*) AS N FROM {table} GROUP BY COHORT").collect()
+    profile["cohort"] = {r["COHORT"]: r["N"] / sum(c["N"] for c in cohorts) for r in cohorts if r["COHORT"]}
+    return profile
+
+
+# =============================================================================
+# GENERATION
+# =============================================================================
+
+class CompiledProfile:
+    """Profile flattened into arrays for vectorized draws."""
+
+    def __init__(self, profile):
+        strata = profile["strata"]
+        self.dims = {c: sorted({s[c] for s in strata}) for c in STRATUM_COLUMNS}
+        self.stratum_codes = {
+            c: np.array([self.dims[c].index(s[c]) for s in strata], dtype=np.int32) for c in STRATUM_COLUMNS
+        }
+        weights = np.array([s["WEIGHT"] for s in strata], dtype=np.float64)
+        self.stratum_cdf = np.cumsum(weights / weights.sum())
+        probs = np.array([s["RESPONSE_PROBS"] for s in strata], dtype=np.float64)
+        self.response_cdf = np.cumsum(probs / probs.sum(axis=1, keepdims=True), axis=1)
+
+        # Survival parameters per (gene, category); gene-specific when the
+        # profile has them, otherwise the pooled "*" entry
+        genes = self.dims["TARGET_GENE"]
+        survival = profile["survival"]
+        self.survival = np.zeros((len(genes), len(RESPONSE_CATEGORIES), 4))
+        for g, gene in enumerate(genes):
+            for c, category in enumerate(RESPONSE_CATEGORIES):
+                entry = survival.get(f"{gene}|{category}") or survival[f"*|{category}"]
+                self.survival[g, c] = [entry["PFS_MEAN"], entry["PFS_STD"], entry["OS_MEAN"], entry["OS_STD"]]
+
+        self.age = profile["age"]
+        self.female_share = profile["sex"]["F"]
+        self.cohorts = list(profile["cohort"])
+        self.cohort_cdf = np.cumsum(list(profile["cohort"].values()))
+        self.cohort_cdf /= self.cohort_cdf[-1]
+        self.adverse = list(profile["adverse_events"])
+        self.adverse_cdf = np.cumsum(list(profile["adverse_events"].values()))
+        self.adverse_cdf /= self.adverse_cdf[-1]
+        self.sites_per_trial = profile["sites_per_trial"]
+        start, end = (np.datetime64(d, "s") for d in CREATED_RANGE)
+        self.created_start = start.astype(np.int64)
+        self.created_span = (end - start).astype(np.int64)
+
+
+def gamma_draw(rng, mean, std):
+    """Gamma draws with the given mean and std (elementwise)."""
+    mean = np.maximum(mean, 1e-3)
+    var = np.maximum(std, 1e-3) ** 2
+    return rng.gamma(mean * mean / var, var / mean)
+
+
+def generate_chunk(compiled, seed, chunk_index, start_row, n_rows):
+    """One chunk as a dict of column arrays; categoricals as (codes, labels)."""
+    rng = np.random.default_rng([seed, chunk_index])
+    n_cats = len(RESPONSE_CATEGORIES)
+
+    stratum = np.searchsorted(compiled.stratum_cdf, rng.random(n_rows), side="right")
+    stratum = np.minimum(stratum, compiled.stratum_cdf.size - 1)
+    codes = {c: compiled.stratum_codes[c][stratum] for c in STRATUM_COLUMNS}
+
+    # Row-wise categorical draw against each row's stratum CDF
+    u = rng.random(n_rows)[:, None]
+    response = np.minimum((u > compiled.response_cdf[stratum]).sum(axis=1), n_cats - 1)
+
+    params = compiled.survival[codes["TARGET_GENE"], response]
+    pfs = gamma_draw(rng, params[:, 0], params[:, 1])
+    # OS = PFS + post-progression survival, so OS >= PFS row by row
+    gap_mean = np.maximum(params[:, 2] - params[:, 0], 0.5)
+    gap_std = np.sqrt(np.maximum(params[:, 3] ** 2 - params[:, 1] ** 2, 0.25))
+    os_ = pfs + gamma_draw(rng, gap_mean, gap_std)
+
+    age = np.clip(np.rint(rng.normal(compiled.age["MEAN"], compiled.age["STD"], n_rows)),
+                  compiled.age["MIN"], compiled.age["MAX"]).astype(np.int16)
+    sex = (rng.random(n_rows) >= compiled.female_share).astype(np.int8)
+    cohort = np.searchsorted(compiled.cohort_cdf, rng.random(n_rows), side="right")
+    adverse = np.searchsorted(compiled.adverse_cdf, rng.random(n_rows), side="right")
+    site = codes["TRIAL_ID"] * compiled.sites_per_trial + rng.integers(0, compiled.sites_per_trial, n_rows)
+    created = compiled.created_start + rng.integers(0, compiled.created_span, n_rows)
+
+    row_ids = np.arange(start_row, start_row + n_rows, dtype=np.int64)
+    return {
+        "ROW_ID": row_ids,
+        **{c: (codes[c], compiled.dims[c]) for c in STRATUM_COLUMNS},
+        "COHORT": (np.minimum(cohort, len(compiled.cohorts) - 1), compiled.cohorts),
+        "PATIENT_AGE": age,
+        "PATIENT_SEX": (sex, ["F", "M"]),
+        "RESPONSE_CATEGORY": (response, RESPONSE_CATEGORIES),
+        "PFS_MONTHS": np.round(pfs, 1),
+        "OS_MONTHS": np.round(os_, 1),
+        "ADVERSE_EVENTS": (np.minimum(adverse, len(compiled.adverse) - 1), compiled.adverse),
+        "SITE_ID": site,
+        "CREATED_AT": created.astype("datetime64[s]")
+    }
+
+
+def chunk_to_arrow(chunk):
+    """Arrow table with dictionary-encoded categoricals (no per-row strings)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def dictionary(codes, labels):
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(labels, type=pa.string()))
+
+    def prefixed_id(prefix, values, width):
+        text = pc.utf8_lpad(pc.cast(pa.array(values), pa.string()), width=width, padding="0")
+        return pc.binary_join_element_wise(prefix, text, "")
+
+    columns = {
+        "RESULT_ID": prefixed_id("RES-", chunk["ROW_ID"], 10),
+        "PATIENT_ID": prefixed_id("PT-", chunk["ROW_ID"], 10),
+        "SITE_ID": prefixed_id("SITE-", chunk["SITE_ID"] + 1, 3),
+        "PATIENT_AGE": pa.array(chunk["PATIENT_AGE"]),
+        "PFS_MONTHS": pa.array(chunk["PFS_MONTHS"]),
+        "OS_MONTHS": pa.array(chunk["OS_MONTHS"]),
+        "CREATED_AT": pa.array(chunk["CREATED_AT"], type=pa.timestamp("s")),
+    }
+    for name, value in chunk.items():
+        if isinstance(value, tuple):
+            columns[name] = dictionary(*value)
+    return pa.table({name: columns[name] for name in OUTPUT_COLUMNS})
+
+
+def chunk_summary(chunk):
+    """Per-gene row and responder counts, for checking the output against the profile."""
+    genes, labels = chunk["TARGET_GENE"]
+    responders = chunk["RESPONSE_CATEGORY"][0] <= 1
+    rows = np.bincount(genes, minlength=len(labels))
+    hits = np.bincount(genes, weights=responders, minlength=len(labels))
+    return {label: (int(rows[i]), int(hits[i])) for i, label in enumerate(labels)}
+
+
+def write_chunk(args):
+    """Worker: generate one chunk and write it as a Parquet file."""
+    import pyarrow.parquet as pq
+
+    profile, seed, chunk_index, start_row, n_rows, out_dir, row_group_rows = args
+    chunk = generate_chunk(CompiledProfile(profile), seed, chunk_index, start_row, n_rows)
+    path = Path(out_dir) / f"chunk={chunk_index:05d}" / "part-0.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(chunk_to_arrow(chunk), path, row_group_size=row_group_rows, compression="zstd")
+    return chunk_index, str(path), chunk_summary(chunk)
+
+
+def copy_into_sql(table, stage):
+    return f"""-- Load generated chunks (run from the output directory's parent with SnowSQL / snow sql)
+CREATE STAGE IF NOT EXISTS {stage} FILE_FORMAT = (TYPE = PARQUET);
+-- PUT file://<output_dir>/chunk=*/part-0.parquet @{stage.split('.')[-1]} PARALLEL = 16;
+
+CREATE TABLE IF NOT EXISTS {table} (
+    RESULT_ID VARCHAR, PATIENT_ID VARCHAR, TRIAL_ID VARCHAR, SITE_ID VARCHAR,
+    TARGET_GENE VARCHAR, TREATMENT_ARM VARCHAR, BIOMARKER_STATUS VARCHAR, CTDNA_CONFIRMATION VARCHAR,
+    COHORT VARCHAR, PATIENT_AGE NUMBER, PATIENT_SEX VARCHAR, RESPONSE_CATEGORY VARCHAR,
+    PFS_MONTHS FLOAT, OS_MONTHS FLOAT, ADVERSE_EVENTS VARCHAR, CREATED_AT TIMESTAMP_NTZ
+);
+
+COPY INTO {table}
+FROM @{stage}
+FILE_FORMAT = (TYPE = PARQUET)
+MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
+PATTERN = '.*part-0[.]parquet';
+"""
+
+
+def generate(profile, rows, out_dir, seed=42, chunk_rows=5_000_000, workers=1,
+             row_group_rows=1_000_000, first_chunk=0, last_chunk=None):
+    """Write ``rows`` rows as Parquet chunks; returns per-gene (rows, responders)."""
+    n_chunks = -(-rows // chunk_rows)
+    last_chunk = n_chunks - 1 if last_chunk is None else min(last_chunk, n_chunks - 1)
+    tasks = [
+        (profile, seed, i, i * chunk_rows, min(chunk_rows, rows - i * chunk_rows), str(out_dir), row_group_rows)
+        for i in range(first_chunk, last_chunk + 1)
+    ]
+    totals = {}
+    start = time.perf_counter()
+
+    def record(result):
+        chunk_index, path, summary = result
+        for gene, (n, hits) in summary.items():
+            rows_so_far, hits_so_far = totals.get(gene, (0, 0))
+            totals[gene] = (rows_so_far + n, hits_so_far + hits)
+        print(f"  chunk {chunk_index:05d} -> {path} ({time.perf_counter() - start:.1f}s)")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(write_chunk, tasks):
+                record(result)
+    else:
+        for task in tasks:
+            record(write_chunk(task))
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=5_000_000, help="rows per Parquet file (bounds memory)")
+    parser.add_argument("--row-group-rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--first-chunk", type=int, default=0, help="generate a slice of chunks (for sharding)")
+    parser.add_argument("--last-chunk", type=int)
+    parser.add_argument("--profile", help="profile JSON to use instead of the demo_data defaults")
+    parser.add_argument("--profile-from-table", help="fit the profile from this table's statistics")
+    parser.add_argument("--connection", help="Snowflake CLI connection name for --profile-from-table")
+    parser.add_argument("--table", default="LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_SCALE",
+                        help="target table named in copy_into.sql")
+    parser.add_argument("--stage", default="LIFEARC_POC.BENCHMARK.CLINICAL_SCALE_STAGE")
+    args = parser.parse_args()
+
+    if args.profile:
+        profile = json.loads(Path(args.profile).read_text())
+    elif args.profile_from_table:
+        from snowflake.snowpark import Session
+        session = Session.builder.config("connection_name", args.connection).create()
+        profile = profile_from_table(session, args.profile_from_table)
+    else:
+        profile = default_profile()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "profile.json").write_text(json.dumps(profile, indent=2))
+    (out_dir / "copy_into.sql").write_text(copy_into_sql(args.table, args.stage))
+
+    print(f"Generating {args.rows:,} rows into {out_dir} (seed {args.seed}, {args.chunk_rows:,} rows per chunk)")
+    start = time.perf_counter()
+    totals = generate(profile, args.rows, out_dir, seed=args.seed, chunk_rows=args.chunk_rows,
+                      workers=args.workers, row_group_rows=args.row_group_rows,
+                      first_chunk=args.first_chunk, last_chunk=args.last_chunk)
+    elapsed = time.perf_counter() - start
+    generated = sum(n for n, _ in totals.values())
+    print(f"\n{generated:,} rows in {elapsed:.1f}s ({generated / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    # Generated responder rate per gene against the profile's expectation
+    expected = {}
+    for s in profile["strata"]:
+        weight, rate = expected.get(s["TARGET_GENE"], (0.0, 0.0))
+        expected[s["TARGET_GENE"]] = (weight + s["WEIGHT"], rate + s["WEIGHT"] * sum(s["RESPONSE_PROBS"][:2]))
+    print(f"\n{'GENE':<8}{'ROWS':>14}{'RESPONSE %':>12}{'PROFILE %':>11}")
+    for gene, (n, hits) in sorted(totals.items()):
+        weight, rate = expected[gene]
+        print(f"{gene:<8}{n:>14,}{hits / max(n, 1) * 100:>12.1f}{rate / weight * 100:>11.1f}")
+    print(f"\nLoad with: {out_dir / 'copy_into.sql'} ({datetime.now():%Y-%m-%d %H:%M})")
+
+
+if __name__ == "__main__":
+    main()
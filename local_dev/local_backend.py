@@ -0,0 +1,1017 @@
+"""
+LifeArc POC - Local Data Backend
+================================
+DuckDB stand-in for the Snowpark session used by the Streamlit apps, so pages
+can be rendered, profiled and load-tested on a laptop without an account.
+
+The apps pick it up through their get_session() when
+LIFEARC_DATA_BACKEND=local is set (with this directory on PYTHONPATH):
+
+    PYTHONPATH=local_dev LIFEARC_DATA_BACKEND=local \\
+        streamlit run streamlit/lifearc_ml_dashboard.py
+
+LocalSession implements the slice of the Snowpark API the apps call:
+- sql(...).collect() / .to_pandas() / .to_pandas_batches() / .collect_nowait(statement_params=...)
+- AsyncJob.result(result_type), including "pandas_batches", and .query_id
+- create_dataframe(...).write.mode(...).save_as_table(...)
+- write_pandas(...)
+- file.get_stream(...) (always missing, so callers take their fallback path)
+
+Tables are built in an in-memory DuckDB catalog named LIFEARC_POC, so the
+apps' fully qualified names resolve unchanged:
+- BENCHMARK.CLINICAL_TRIAL_RESULTS_1M: synthetic, generated in SQL, with the
+  demo_data/clinical_outcomes.csv patients mapped onto the same columns, or
+  read from clinical_data_generator.py output when LIFEARC_LOCAL_PARQUET
+  points at it
+- BENCHMARK summary tables: built with the same logic as
+  sql_scripts/dashboard_aggregates.sql
+- ML_DEMO.MODEL_EVALUATION_BINS / _CURVES: binned stand-in predictions
+- BENCHMARK.SURVIVAL_EVENT_COUNTS and the SURVIVAL_CURVES / _LOGRANK views,
+  with CALL BENCHMARK.BUILD_SURVIVAL_COUNTS(...) emulated in Python
+- BENCHMARK.CORTEX_RESPONSE_CACHE / CORTEX_CACHE_STATS / ANALYST_SQL_CACHE:
+  empty to start
+- ML_DEMO.MODEL_METRICS_LOG and the AI_DEMO tables: small fixed fixtures
+- AI_DEMO.EXECUTIVE_SNAPSHOT: one snapshot of the fixtures, dashboard tables
+  as JSON text; CALL AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT() adds another
+- AI_DEMO.RESEARCH_TERM_INDEX / _DOC_STATS / _CORPUS_STATS: built once from
+  the RESEARCH_INTELLIGENCE fixture (no stream or delta task)
+- AI_DEMO.RESEARCH_EMBEDDINGS: both research sources chunked and embedded
+  with local_embed_text, a hashed bag-of-words stand-in registered as
+  EMBED_TEXT_768 (VECTOR_COSINE_SIMILARITY maps to ARRAY_COSINE_SIMILARITY);
+  AI_DEMO.RESEARCH_RERANK_CACHE empty to start
+
+Snowflake-only features (Cortex, !PREDICT, stages, VARIANT paths,
+INFORMATION_SCHEMA.QUERY_HISTORY) raise, exactly like a missing object would
+in Snowflake, so every page exercises its existing error handling.
+"""
+
+import ast
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import namedtuple
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from clinical_data_generator import GENE_RESPONSE_RATES, TRIAL_GENES
+
+DEMO_DATA_DIR = Path(__file__).resolve().parent.parent / "demo_data"
+AGGREGATES_SQL = Path(__file__).resolve().parent.parent / "sql_scripts" / "dashboard_aggregates.sql"
+DEFAULT_ROWS = int(os.environ.get("LIFEARC_LOCAL_ROWS", "1000000"))
+# Directory written by clinical_data_generator.py; replaces the SQL-generated table
+PARQUET_DIR = os.environ.get("LIFEARC_LOCAL_PARQUET")
+DEFAULT_SEED = 42
+# Rows per DataFrame when a result is fetched as pandas_batches (Snowflake sizes its
+# Arrow batches by bytes; a fixed row count is close enough for local profiling)
+BATCH_ROWS = 100000
+
+# Snowflake spellings DuckDB does not accept as-is
+SQL_REWRITES = [
+    (re.compile(r"\bCURRENT_TIMESTAMP\(\)", re.IGNORECASE), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\bLISTAGG\(", re.IGNORECASE), "STRING_AGG("),
+    # LISTAGG(x, ', ') WITHIN GROUP (ORDER BY y) -> STRING_AGG(x, ', ' ORDER BY y)
+    (re.compile(r"\)\s*WITHIN GROUP\s*\(\s*(ORDER BY [^()]+)\)", re.IGNORECASE), r" \1)"),
+    (re.compile(r"\bSNOWFLAKE\.CORTEX\.EMBED_TEXT_768\(", re.IGNORECASE), "EMBED_TEXT_768("),
+    (re.compile(r"\bVECTOR_COSINE_SIMILARITY\(", re.IGNORECASE), "ARRAY_COSINE_SIMILARITY("),
+    (re.compile(r"\bLATERAL FLATTEN\(([\w.]+)\)\s+(\w+)", re.IGNORECASE), r"LATERAL (SELECT UNNEST(\1) AS VALUE) \2"),
+]
+
+MACROS = [
+    "CREATE OR REPLACE MACRO IFF(cond, a, b) AS CASE WHEN cond THEN a ELSE b END",
+    "CREATE OR REPLACE MACRO EQUAL_NULL(a, b) AS a IS NOT DISTINCT FROM b",
+    "CREATE OR REPLACE MACRO DATEADD(part, n, ts) AS ts + CAST(n || ' ' || part AS INTERVAL)",
+    "CREATE OR REPLACE MACRO TO_DATE(x) AS CAST(x AS DATE)",
+]
+
+
+CALL_PATTERN = re.compile(r"^\s*CALL\s+(?:LIFEARC_POC\.)?([\w.]+)\s*\((.*)\)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+
+
+def translate(sql):
+    """Rewrite the few Snowflake spellings DuckDB lacks."""
+    for pattern, replacement in SQL_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+class LocalRow:
+    """Snowpark Row look-alike: index by position or name, iterate values."""
+
+    __slots__ = ("_names", "_values")
+
+    def __init__(self, names, values):
+        self._names = names
+        self._values = values
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._names.index(key.upper())]
+        return self._values[key]
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except ValueError:
+            raise AttributeError(name) from None
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def as_dict(self):
+        return dict(zip(self._names, self._values))
+
+    def __repr__(self):
+        return f"Row({', '.join(f'{n}={v!r}' for n, v in zip(self._names, self._values))})"
+
+
+class LocalAsyncJob:
+    """Completed stand-in for snowpark.AsyncJob; the query already ran."""
+
+    def __init__(self, query_id, frame):
+        self.query_id = query_id
+        self._frame = frame
+
+    def is_done(self):
+        return True
+
+    def result(self, result_type="row"):
+        if result_type == "pandas":
+            return self._frame
+        if result_type == "pandas_batches":
+            return (self._frame.iloc[i:i + BATCH_ROWS] for i in range(0, len(self._frame), BATCH_ROWS))
+        names = list(self._frame.columns)
+        return [LocalRow(names, list(values)) for values in self._frame.itertuples(index=False, name=None)]
+
+
+class LocalDataFrame:
+    """Lazy SQL statement or in-memory frame, mirroring the Snowpark calls used."""
+
+    def __init__(self, session, sql=None, frame=None):
+        self._session = session
+        self._sql = sql
+        self._frame = frame
+
+    def _execute(self, statement_params=None):
+        if self._frame is not None:
+            return LocalAsyncJob(str(uuid.uuid4()), self._frame)
+        return self._session._execute(self._sql, statement_params)
+
+    def collect(self, statement_params=None):
+        return self._execute(statement_params).result("row")
+
+    def collect_nowait(self, statement_params=None):
+        return self._execute(statement_params)
+
+    def to_pandas(self, statement_params=None):
+        return self._execute(statement_params).result("pandas")
+
+    def to_pandas_batches(self, statement_params=None):
+        return self._execute(statement_params).result("pandas_batches")
+
+    def count(self):
+        return len(self.to_pandas())
+
+    @property
+    def write(self):
+        return LocalDataFrameWriter(self._session, self.to_pandas())
+
+
+class LocalDataFrameWriter:
+    def __init__(self, session, frame):
+        self._session = session
+        self._frame = frame
+        self._mode = "errorifexists"
+
+    def mode(self, save_mode):
+        self._mode = save_mode
+        return self
+
+    def save_as_table(self, table_name, column_order="index", statement_params=None, **kwargs):
+        self._session._save_frame(self._frame, table_name, overwrite=self._mode == "overwrite",
+                                  by_name=column_order == "name")
+
+
+LocalQueryRecord = namedtuple("LocalQueryRecord", ["query_id", "sql_text", "is_describe", "thread_id"])
+
+
+class LocalQueryHistory:
+    """Snowpark QueryHistory look-alike: records the statements run while open."""
+
+    def __init__(self, session, include_thread_id=False):
+        self._session = session
+        self.include_thread_id = include_thread_id
+        self.queries = []
+
+    def __enter__(self):
+        with self._session._lock:
+            self._session._histories.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        with self._session._lock:
+            self._session._histories.remove(self)
+
+
+class LocalFileOperation:
+    def get_stream(self, stage_location, **kwargs):
+        raise FileNotFoundError(f"Stages are not available in the local backend: {stage_location}")
+
+    def put_stream(self, input_stream, stage_location, **kwargs):
+        raise FileNotFoundError(f"Stages are not available in the local backend: {stage_location}")
+
+
+class LocalSession:
+    """DuckDB-backed stand-in for snowflake.snowpark.Session."""
+
+    def __init__(self, rows=DEFAULT_ROWS, seed=DEFAULT_SEED, database=":memory:"):
+        self.conn = duckdb.connect(database)
+        self.file = LocalFileOperation()
+        self._lock = threading.Lock()
+        self.query_log = []
+        self._histories = []
+        build_local_database(self.conn, rows=rows, seed=seed)
+
+    # -- Snowpark surface ---------------------------------------------------
+
+    def sql(self, query):
+        return LocalDataFrame(self, sql=query)
+
+    def table(self, name):
+        return LocalDataFrame(self, sql=f"SELECT * FROM {name}")
+
+    def query_history(self, include_thread_id=False, **kwargs):
+        return LocalQueryHistory(self, include_thread_id)
+
+    def create_dataframe(self, data, schema=None):
+        if isinstance(data, pd.DataFrame):
+            frame = data
+        else:
+            frame = pd.DataFrame([list(r) for r in data], columns=schema)
+        return LocalDataFrame(self, frame=frame)
+
+    def write_pandas(self, df, table_name, database=None, schema=None, auto_create_table=False,
+                     overwrite=False, table_type="", quote_identifiers=True, **kwargs):
+        name = ".".join(part for part in (database, schema, table_name) if part)
+        self._save_frame(df, name, overwrite=overwrite, by_name=True)
+
+    def close(self):
+        self.conn.close()
+
+    # -- Execution ----------------------------------------------------------
+
+    def _execute(self, query, statement_params=None):
+        query_id = str(uuid.uuid4())
+        tag = (statement_params or {}).get("QUERY_TAG")
+        start = time.perf_counter()
+        error = None
+        try:
+            # One cursor per statement so concurrent submit_queries() calls
+            # and the query-log flush thread do not share result state
+            cursor = self._cursor()
+            call = CALL_PATTERN.match(query)
+            if call and call.group(1).upper() in LOCAL_PROCEDURES:
+                procedure = call.group(1).upper()
+                args = ast.literal_eval(f"({call.group(2)},)") if call.group(2).strip() else ()
+                message = LOCAL_PROCEDURES[procedure](cursor, *args)
+                frame = pd.DataFrame({procedure.split(".")[-1]: [message]})
+            else:
+                frame = cursor.execute(translate(query)).df()
+            frame.columns = [str(c).upper() for c in frame.columns]
+            cursor.close()
+            return LocalAsyncJob(query_id, frame)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            with self._lock:
+                self.query_log.append({
+                    'QUERY_ID': query_id,
+                    'QUERY_TAG': tag,
+                    'MS': round((time.perf_counter() - start) * 1000, 2),
+                    'ERROR': error,
+                    'SQL': query
+                })
+                for history in self._histories:
+                    history.queries.append(LocalQueryRecord(
+                        query_id, query, False, threading.get_ident() if history.include_thread_id else None
+                    ))
+
+    def _cursor(self):
+        # Cursors start in DuckDB's default catalog; the macros and
+        # schema-qualified names live in LIFEARC_POC
+        with self._lock:
+            cursor = self.conn.cursor()
+        cursor.execute("USE LIFEARC_POC")
+        cursor.execute("SET enable_progress_bar = false")
+        return cursor
+
+    def _save_frame(self, df, table_name, overwrite=False, by_name=False):
+        frame = df.copy()
+        frame.columns = [str(c).upper() for c in frame.columns]
+        cursor = self._cursor()
+        try:
+            cursor.register("_local_frame", frame)
+            exists = cursor.execute(
+                "SELECT COUNT(*) FROM duckdb_tables() WHERE database_name || '.' || schema_name || '.' || table_name = ?",
+                [qualify(table_name)]
+            ).fetchone()[0]
+            if overwrite or not exists:
+                cursor.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM _local_frame")
+            elif by_name:
+                cursor.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM _local_frame")
+            else:
+                cursor.execute(f"INSERT INTO {table_name} SELECT * FROM _local_frame")
+        finally:
+            cursor.close()
+
+    # -- Instrumentation ----------------------------------------------------
+
+    def reset_query_log(self):
+        with self._lock:
+            self.query_log = []
+
+    def query_count(self):
+        with self._lock:
+            return len(self.query_log)
+
+
+def qualify(table_name):
+    parts = table_name.upper().split(".")
+    return ".".join(["LIFEARC_POC"] * (3 - len(parts)) + parts) if len(parts) == 2 else ".".join(parts)
+
+
+_local_session = None
+_local_session_lock = threading.Lock()
+
+
+def get_local_session(rows=None, seed=DEFAULT_SEED):
+    """Process-wide LocalSession, built on first use."""
+    global _local_session
+    with _local_session_lock:
+        if _local_session is None:
+            _local_session = LocalSession(rows=rows or DEFAULT_ROWS, seed=seed)
+        return _local_session
+
+
+def reset_local_session():
+    global _local_session
+    with _local_session_lock:
+        if _local_session is not None:
+            _local_session.close()
+        _local_session = None
+
+
+# =============================================================================
+# DATABASE BUILD
+# =============================================================================
+
+def build_local_database(conn, rows=DEFAULT_ROWS, seed=DEFAULT_SEED):
+    """Create the LIFEARC_POC catalog and every table the apps read."""
+    conn.execute("SET enable_progress_bar = false")
+    conn.execute("ATTACH ':memory:' AS LIFEARC_POC")
+    conn.execute("USE LIFEARC_POC")
+    for schema in ("BENCHMARK", "ML_DEMO", "AI_DEMO", "UNSTRUCTURED_DATA"):
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    for macro in MACROS:
+        conn.execute(macro)
+
+    build_clinical_results(conn, rows, seed)
+    build_dashboard_aggregates(conn)
+    build_clinical_sample(conn, rows_per_stratum=1000)
+    build_model_metrics(conn)
+    build_model_evaluation(conn)
+    build_survival_tables(conn)
+    build_ai_demo_tables(conn)
+    build_executive_snapshot(conn)
+    build_research_index(conn)
+    build_unstructured_tables(conn)
+    build_research_embeddings(conn)
+    build_cortex_cache(conn)
+    conn.execute("""
+        CREATE TABLE BENCHMARK.APP_QUERY_LOG (
+            QUERY_ID VARCHAR, APP VARCHAR, PAGE VARCHAR, SECTION VARCHAR,
+            CLIENT_MS DOUBLE, ROWS_RETURNED BIGINT, RESULT_BYTES BIGINT, LOGGED_AT TIMESTAMP
+        )
+    """)
+
+
+def build_clinical_results(conn, rows, seed):
+    """Synthetic CLINICAL_TRIAL_RESULTS_1M plus the demo_data patients.
+
+    Every random draw is a hash of (row, column, seed), so the table is
+    identical across runs and thread counts.
+    """
+    if PARQUET_DIR:
+        conn.execute(f"""
+            CREATE TABLE BENCHMARK.CLINICAL_TRIAL_RESULTS_1M AS
+            SELECT * FROM read_parquet('{Path(PARQUET_DIR).as_posix()}/chunk=*/*.parquet')
+        """)
+        return
+
+    trials = list(TRIAL_GENES)
+    trial_case = " ".join(f"WHEN {i} THEN '{t}'" for i, t in enumerate(trials))
+    gene_case = " ".join(f"WHEN '{t}' THEN '{g}'" for t, g in TRIAL_GENES.items())
+    rate_case = " ".join(f"WHEN '{g}' THEN {r}" for g, r in GENE_RESPONSE_RATES.items())
+
+    def u(column):
+        return f"((HASH(i, '{column}', {seed}) % 1000000) / 1000000.0)"
+
+    conn.execute(f"""
+        CREATE TABLE BENCHMARK.CLINICAL_TRIAL_RESULTS_1M AS
+        WITH draws AS (
+            SELECT
+                i,
+                CASE CAST(FLOOR({u('trial')} * {len(trials)}) AS INTEGER) {trial_case} END AS TRIAL_ID,
+                CASE WHEN {u('arm')} < 0.34 THEN 'Combination' WHEN {u('arm')} < 0.67 THEN 'Experimental' ELSE 'Standard' END AS TREATMENT_ARM,
+                CASE WHEN {u('biomarker')} < 0.55 THEN 'POSITIVE' ELSE 'NEGATIVE' END AS BIOMARKER_STATUS,
+                CASE WHEN {u('ctdna')} < 0.45 THEN 'YES' ELSE 'NO' END AS CTDNA_CONFIRMATION,
+                'Cohort_' || CHR(65 + CAST(FLOOR({u('cohort')} * 3) AS INTEGER)) AS COHORT,
+                CAST(30 + FLOOR(({u('age1')} + {u('age2')}) * 25) AS INTEGER) AS PATIENT_AGE,
+                CASE WHEN {u('sex')} < 0.52 THEN 'F' ELSE 'M' END AS PATIENT_SEX,
+                {u('response')} AS R,
+                {u('pfs')} AS S
+            FROM RANGE({rows}) t(i)
+        ),
+        rated AS (
+            SELECT
+                *,
+                CASE TRIAL_ID {gene_case} END AS TARGET_GENE
+            FROM draws
+        ),
+        scored AS (
+            SELECT
+                *,
+                LEAST(0.95, (CASE TARGET_GENE {rate_case} END)
+                    + CASE WHEN BIOMARKER_STATUS = 'POSITIVE' THEN 0.08 ELSE -0.08 END
+                    + CASE WHEN CTDNA_CONFIRMATION = 'YES' THEN 0.05 ELSE 0 END
+                    + CASE TREATMENT_ARM WHEN 'Combination' THEN 0.06 WHEN 'Standard' THEN -0.06 ELSE 0 END) AS P
+            FROM rated
+        )
+        SELECT
+            'PT-' || LPAD(CAST(i AS VARCHAR), 7, '0') AS PATIENT_ID,
+            TRIAL_ID,
+            TARGET_GENE,
+            TREATMENT_ARM,
+            BIOMARKER_STATUS,
+            CTDNA_CONFIRMATION,
+            COHORT,
+            PATIENT_AGE,
+            PATIENT_SEX,
+            CASE
+                WHEN R < P * 0.3 THEN 'Complete_Response'
+                WHEN R < P THEN 'Partial_Response'
+                WHEN R < P + (1 - P) * 0.5 THEN 'Stable_Disease'
+                ELSE 'Progressive_Disease'
+            END AS RESPONSE_CATEGORY,
+            ROUND(CASE WHEN R < P THEN 8 + S * 14 ELSE 2 + S * 8 END, 1) AS PFS_MONTHS,
+            ROUND(CASE WHEN R < P THEN 16 + S * 20 ELSE 6 + S * 14 END, 1) AS OS_MONTHS
+        FROM scored
+    """)
+
+    # The demo_data study is a KRAS G12C trial with two arms; map it onto the
+    # dashboard's trial and arm vocabulary so it lands in existing strata
+    outcomes_csv = DEMO_DATA_DIR / "clinical_outcomes.csv"
+    if outcomes_csv.exists():
+        conn.execute(f"""
+            INSERT INTO BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+            SELECT
+                PATIENT_ID,
+                'TRIAL-KRAS-001' AS TRIAL_ID,
+                SPLIT_PART(BIOMARKER_STATUS, '_', 1) AS TARGET_GENE,
+                CASE TREATMENT_ARM WHEN 'ARM_A' THEN 'Experimental' ELSE 'Standard' END AS TREATMENT_ARM,
+                CASE WHEN BIOMARKER_STATUS LIKE '%POS' THEN 'POSITIVE' ELSE 'NEGATIVE' END AS BIOMARKER_STATUS,
+                'NO' AS CTDNA_CONFIRMATION,
+                'Cohort_' || COHORT AS COHORT,
+                AGE AS PATIENT_AGE,
+                SEX AS PATIENT_SEX,
+                RESPONSE AS RESPONSE_CATEGORY,
+                PFS_MONTHS,
+                OS_MONTHS
+            FROM read_csv_auto('{outcomes_csv.as_posix()}')
+        """)
+
+
+def build_dashboard_aggregates(conn):
+    """DASHBOARD_RESPONSE_CUBE, DASHBOARD_PATIENT_ROWS and PATIENT_STRATUM_RATES,
+    as REFRESH_DASHBOARD_CUBE builds them in dashboard_aggregates.sql."""
+    conn.execute("""
+        CREATE TABLE BENCHMARK.DASHBOARD_RESPONSE_CUBE AS
+        SELECT
+            CASE
+                WHEN GROUPING(TRIAL_ID) = 0 THEN 'TRIAL'
+                WHEN GROUPING(BIOMARKER_STATUS) = 0 THEN 'BIOMARKER_CTDNA'
+                WHEN GROUPING(TARGET_GENE) = 0 THEN 'TARGET_GENE'
+                WHEN GROUPING(TREATMENT_ARM) = 0 THEN 'TREATMENT_ARM'
+                WHEN GROUPING(RESPONSE_CATEGORY) = 0 THEN 'RESPONSE_CATEGORY'
+                ELSE 'ALL'
+            END AS DIMENSION_SET,
+            TRIAL_ID,
+            TARGET_GENE,
+            TREATMENT_ARM,
+            BIOMARKER_STATUS,
+            CTDNA_CONFIRMATION,
+            RESPONSE_CATEGORY,
+            COUNT(*) AS ROW_COUNT,
+            COUNT(RESPONSE_CATEGORY) AS RESPONSE_ROWS,
+            SUM(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') THEN 1 ELSE 0 END) AS RESPONDERS,
+            SUM(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN PFS_MONTHS END) AS PFS_SUM,
+            COUNT(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN PFS_MONTHS END) AS PFS_COUNT,
+            SUM(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN OS_MONTHS END) AS OS_SUM,
+            COUNT(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN OS_MONTHS END) AS OS_COUNT,
+            COUNT(DISTINCT PATIENT_ID) AS DISTINCT_PATIENTS,
+            CURRENT_TIMESTAMP AS REFRESHED_AT
+        FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+        GROUP BY GROUPING SETS (
+            (),
+            (TARGET_GENE),
+            (TREATMENT_ARM),
+            (BIOMARKER_STATUS, CTDNA_CONFIRMATION),
+            (TRIAL_ID, TARGET_GENE),
+            (RESPONSE_CATEGORY)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE BENCHMARK.DASHBOARD_PATIENT_ROWS AS
+        SELECT PATIENT_ID, COUNT(*) AS ROW_COUNT
+        FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+        GROUP BY PATIENT_ID
+    """)
+    conn.execute("""
+        CREATE TABLE BENCHMARK.PATIENT_STRATUM_RATES AS
+        SELECT
+            TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+            COHORT, PATIENT_SEX, FLOOR(PATIENT_AGE / 10) * 10 AS AGE_BAND,
+            COUNT(*) AS ROW_COUNT,
+            COUNT(RESPONSE_CATEGORY) AS RESPONSE_ROWS,
+            SUM(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') THEN 1 ELSE 0 END) AS RESPONDERS,
+            CURRENT_TIMESTAMP AS REFRESHED_AT
+        FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+        GROUP BY ALL
+    """)
+
+
+def build_clinical_sample(conn, rows_per_stratum):
+    """CLINICAL_RESULTS_SAMPLE as REFRESH_CLINICAL_SAMPLE draws it below
+    SYSTEM_SAMPLE_MIN_ROWS (row-level, every stratum filled to its quota)."""
+    conn.execute(f"""
+        CREATE TABLE BENCHMARK.CLINICAL_RESULTS_SAMPLE AS
+        WITH strata AS (
+            SELECT
+                *,
+                HASH(TRIAL_ID, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION) AS STRATUM_ID,
+                COUNT(*) OVER (PARTITION BY TRIAL_ID, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION) AS STRATUM_ROWS
+            FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+        )
+        SELECT
+            STRATUM_ID,
+            PATIENT_ID, TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS,
+            CTDNA_CONFIRMATION, RESPONSE_CATEGORY, PFS_MONTHS, OS_MONTHS,
+            CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') THEN 1 ELSE 0 END AS IS_RESPONDER,
+            STRATUM_ROWS,
+            STRATUM_ROWS / LEAST(STRATUM_ROWS, {rows_per_stratum}) AS SAMPLE_WEIGHT,
+            CURRENT_TIMESTAMP AS SAMPLED_AT
+        FROM strata
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY STRATUM_ID ORDER BY HASH(PATIENT_ID)) <= {rows_per_stratum}
+    """)
+
+
+def build_model_metrics(conn):
+    conn.execute("""
+        CREATE TABLE ML_DEMO.MODEL_METRICS_LOG (
+            MODEL_NAME VARCHAR, MODEL_VERSION VARCHAR, ACCURACY DOUBLE, PRECISION_SCORE DOUBLE,
+            RECALL_SCORE DOUBLE, F1_SCORE DOUBLE, TRAINING_ROWS BIGINT, TEST_ROWS BIGINT,
+            TRUE_POSITIVES BIGINT, TRUE_NEGATIVES BIGINT, FALSE_POSITIVES BIGINT, FALSE_NEGATIVES BIGINT,
+            NOTES VARCHAR, TRAINED_AT TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        INSERT INTO ML_DEMO.MODEL_METRICS_LOG VALUES
+        ('LIFEARC_RESPONSE_PREDICTOR', 'V1_XGBOOST', 0.662, 0.641, 0.598, 0.619,
+         80000, 20000, 5230, 8010, 2930, 3830, 'Local backend fixture', CURRENT_TIMESTAMP)
+    """)
+
+
+def build_model_evaluation(conn, bins=100):
+    """MODEL_EVALUATION_BINS and MODEL_EVALUATION_CURVES as PART 9 of
+    dashboard_aggregates.sql builds them, over stand-in predictions: each
+    patient's stratum responder rate plus noise."""
+    conn.execute(f"""
+        CREATE TABLE ML_DEMO.MODEL_EVALUATION_BINS AS
+        WITH scored AS (
+            SELECT
+                CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') THEN 1 ELSE 0 END AS ACTUAL,
+                LEAST(0.999, GREATEST(0.001,
+                    AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') THEN 1.0 ELSE 0.0 END)
+                        OVER (PARTITION BY TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION)
+                    + ((HASH(PATIENT_ID, 'score') % 1000) / 1000.0 - 0.5) * 0.3)) AS PROBABILITY
+            FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+        )
+        SELECT
+            'CLINICAL_RESPONSE_MODEL' AS MODEL_NAME,
+            'V1' AS MODEL_VERSION,
+            BIN,
+            BIN / {bins} AS PROB_LOWER,
+            (BIN + 1) / {bins} AS PROB_UPPER,
+            COUNT(*) AS ROW_COUNT,
+            SUM(ACTUAL) AS POSITIVES,
+            SUM(PROBABILITY) AS PROBABILITY_SUM,
+            CURRENT_TIMESTAMP AS BUILT_AT
+        FROM (SELECT LEAST(FLOOR(PROBABILITY * {bins}), {bins} - 1) AS BIN, ACTUAL, PROBABILITY FROM scored)
+        GROUP BY BIN
+    """)
+    conn.execute("""
+        CREATE VIEW ML_DEMO.MODEL_EVALUATION_CURVES AS
+        WITH totals AS (
+            SELECT MODEL_NAME, MODEL_VERSION, SUM(ROW_COUNT) AS TOTAL_ROWS, SUM(POSITIVES) AS TOTAL_POSITIVES
+            FROM ML_DEMO.MODEL_EVALUATION_BINS
+            GROUP BY MODEL_NAME, MODEL_VERSION
+        ),
+        cumulative AS (
+            SELECT
+                b.*,
+                SUM(POSITIVES) OVER (PARTITION BY MODEL_NAME, MODEL_VERSION ORDER BY BIN DESC
+                                     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS TP,
+                SUM(ROW_COUNT - POSITIVES) OVER (PARTITION BY MODEL_NAME, MODEL_VERSION ORDER BY BIN DESC
+                                                 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS FP
+            FROM ML_DEMO.MODEL_EVALUATION_BINS b
+        )
+        SELECT
+            c.MODEL_NAME, c.MODEL_VERSION, c.BIN, c.PROB_LOWER AS THRESHOLD,
+            c.ROW_COUNT, c.POSITIVES, c.PROBABILITY_SUM, c.TP, c.FP,
+            t.TOTAL_POSITIVES - c.TP AS FN,
+            t.TOTAL_ROWS - t.TOTAL_POSITIVES - c.FP AS TN,
+            c.TP / NULLIF(t.TOTAL_POSITIVES, 0) AS TPR,
+            c.FP / NULLIF(t.TOTAL_ROWS - t.TOTAL_POSITIVES, 0) AS FPR,
+            c.TP / NULLIF(c.TP + c.FP, 0) AS PRECISION_AT,
+            (c.TP + c.FP) / NULLIF(t.TOTAL_ROWS, 0) AS POPULATION_SHARE,
+            (c.TP / NULLIF(c.TP + c.FP, 0)) / NULLIF(t.TOTAL_POSITIVES / t.TOTAL_ROWS, 0) AS LIFT,
+            t.TOTAL_ROWS,
+            c.BUILT_AT
+        FROM cumulative c
+        JOIN totals t ON t.MODEL_NAME = c.MODEL_NAME AND t.MODEL_VERSION = c.MODEL_VERSION
+    """)
+
+
+# Small fixed fixtures with the columns of sql_scripts/create_semantic_view.sql
+def script_statement(prefix, path=AGGREGATES_SQL):
+    """The statement in a sql_scripts file that starts with ``prefix``, up to its
+    closing semicolon, so views are defined once for both backends."""
+    text = path.read_text()
+    start = text.index(prefix)
+    return text[start:text.index(";\n", start)]
+
+
+SURVIVAL_DIMENSIONS = {
+    "TRIAL_ID": "TRIAL_ID",
+    "TARGET_GENE": "TARGET_GENE",
+    "TREATMENT_ARM": "TREATMENT_ARM",
+    "BIOMARKER_STATUS": "BIOMARKER_STATUS",
+    "CTDNA_CONFIRMATION": "CTDNA_CONFIRMATION",
+    "COHORT": "COHORT",
+    "PATIENT_SEX": "PATIENT_SEX",
+    "AGE_BAND": "CAST(CAST(FLOOR(PATIENT_AGE / 10) * 10 AS INTEGER) AS VARCHAR)",
+}
+
+
+def build_survival_counts(conn, dimension, follow_up_months):
+    """SURVIVAL_EVENT_COUNTS rows for one definition, as BUILD_SURVIVAL_COUNTS
+    in PART 10 of dashboard_aggregates.sql writes them."""
+    if dimension not in SURVIVAL_DIMENSIONS:
+        raise ValueError(f"Unsupported survival dimension: {dimension}")
+    cap = float(follow_up_months)
+    conn.execute(f"""
+        DELETE FROM BENCHMARK.SURVIVAL_EVENT_COUNTS
+        WHERE DIMENSION = '{dimension}' AND FOLLOW_UP_MONTHS = {cap}
+    """)
+    conn.execute(f"""
+        INSERT INTO BENCHMARK.SURVIVAL_EVENT_COUNTS
+        SELECT
+            '{dimension}',
+            {cap},
+            IFF(GROUPING(PFS_TIME) = 0, 'PFS', 'OS'),
+            GROUP_VALUE,
+            IFF(GROUPING(PFS_TIME) = 0, PFS_TIME, OS_TIME),
+            IFF(GROUPING(PFS_TIME) = 0, SUM(PFS_EVENT), SUM(OS_EVENT)),
+            IFF(GROUPING(PFS_TIME) = 0, COUNT(PFS_TIME) - SUM(PFS_EVENT), COUNT(OS_TIME) - SUM(OS_EVENT)),
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT
+                COALESCE({SURVIVAL_DIMENSIONS[dimension]}, 'UNKNOWN') AS GROUP_VALUE,
+                ROUND(LEAST(PFS_MONTHS, {cap}), 1) AS PFS_TIME,
+                IFF(PFS_MONTHS <= {cap}, 1, 0) AS PFS_EVENT,
+                ROUND(LEAST(OS_MONTHS, {cap}), 1) AS OS_TIME,
+                IFF(OS_MONTHS <= {cap}, 1, 0) AS OS_EVENT
+            FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+        )
+        GROUP BY GROUPING SETS ((GROUP_VALUE, PFS_TIME), (GROUP_VALUE, OS_TIME))
+        HAVING IFF(GROUPING(PFS_TIME) = 0, PFS_TIME, OS_TIME) IS NOT NULL
+    """)
+    return f"Survival counts built for {dimension} with {cap:g} months follow-up"
+
+
+def build_survival_tables(conn):
+    """SURVIVAL_EVENT_COUNTS with the script's default definitions, and the
+    SURVIVAL_CURVES / SURVIVAL_LOGRANK views read from the script itself."""
+    conn.execute("""
+        CREATE TABLE BENCHMARK.SURVIVAL_EVENT_COUNTS (
+            DIMENSION VARCHAR, FOLLOW_UP_MONTHS DOUBLE, ENDPOINT VARCHAR, GROUP_VALUE VARCHAR,
+            TIME_MONTHS DOUBLE, EVENTS BIGINT, CENSORED BIGINT, BUILT_AT TIMESTAMP
+        )
+    """)
+    for dimension in ("TREATMENT_ARM", "TARGET_GENE"):
+        build_survival_counts(conn, dimension, 24)
+    for view in ("BENCHMARK.SURVIVAL_CURVES", "BENCHMARK.SURVIVAL_LOGRANK"):
+        conn.execute(translate(script_statement(f"CREATE OR REPLACE VIEW {view} AS")))
+
+
+def build_cortex_cache(conn):
+    """Empty CORTEX_RESPONSE_CACHE, the CORTEX_CACHE_STATS view and an empty
+    ANALYST_SQL_CACHE. COMPLETE and Cortex Analyst are not available locally,
+    so only cache entries seeded by hand are served."""
+    conn.execute("""
+        CREATE TABLE BENCHMARK.CORTEX_RESPONSE_CACHE (
+            MODEL VARCHAR, PROMPT_HASH VARCHAR, PARAMS VARCHAR, DATA_VERSION VARCHAR, RESPONSE VARCHAR,
+            APP VARCHAR, SECTION VARCHAR, GENERATION_MS DOUBLE, CREATED_AT TIMESTAMP, EXPIRES_AT TIMESTAMP,
+            HIT_COUNT BIGINT DEFAULT 0, MISS_COUNT BIGINT DEFAULT 0, LAST_HIT_AT TIMESTAMP
+        )
+    """)
+    conn.execute(translate(script_statement("CREATE OR REPLACE VIEW BENCHMARK.CORTEX_CACHE_STATS AS")))
+    conn.execute("""
+        CREATE TABLE BENCHMARK.ANALYST_SQL_CACHE (
+            SEMANTIC_VIEW VARCHAR, QUESTION_HASH VARCHAR, NORMALIZED_QUESTION VARCHAR, QUESTION VARCHAR,
+            SQL_TEXT VARCHAR, INTERPRETATION VARCHAR, GENERATION_MS DOUBLE, CREATED_AT TIMESTAMP,
+            HIT_COUNT BIGINT DEFAULT 0, LAST_HIT_AT TIMESTAMP
+        )
+    """)
+
+
+def build_executive_snapshot(conn):
+    """One AI_DEMO.EXECUTIVE_SNAPSHOT row, as BUILD_EXECUTIVE_SNAPSHOT in
+    sql_scripts/executive_snapshot.sql builds it, with the dashboard tables
+    as JSON text instead of VARIANT arrays."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS AI_DEMO.EXECUTIVE_SNAPSHOT (
+            SNAPSHOT_ID BIGINT, SOURCE_VERSION VARCHAR, BUILT_AT TIMESTAMP, TOTAL_COMPOUNDS BIGINT,
+            ACTIVE_TRIALS BIGINT, TOTAL_INVESTMENT DOUBLE, AVG_ROI DOUBLE,
+            DRUG_LIKENESS VARCHAR, PROGRAM_ROI VARCHAR, BOARD_PRIORITIES VARCHAR
+        )
+    """)
+    conn.execute("""
+        INSERT INTO AI_DEMO.EXECUTIVE_SNAPSHOT
+        WITH drug_likeness AS (
+            SELECT therapeutic_area, drug_likeness, COUNT(*) AS COMPOUNDS
+            FROM AI_DEMO.COMPOUND_PIPELINE_ANALYSIS
+            GROUP BY therapeutic_area, drug_likeness
+        ),
+        compounds AS (
+            SELECT
+                COALESCE(SUM(COMPOUNDS), 0) AS TOTAL_COMPOUNDS,
+                CAST(to_json(list(json_object(
+                    'THERAPEUTIC_AREA', therapeutic_area, 'DRUG_LIKENESS', drug_likeness, 'COUNT', COMPOUNDS
+                ) ORDER BY therapeutic_area, drug_likeness)) AS VARCHAR) AS DRUG_LIKENESS
+            FROM drug_likeness
+        ),
+        trials AS (
+            SELECT COUNT(*) FILTER (WHERE status = 'Active') AS ACTIVE_TRIALS
+            FROM AI_DEMO.CLINICAL_TRIAL_PERFORMANCE
+        ),
+        programs AS (
+            SELECT
+                ROUND(SUM(total_investment_millions), 0) AS TOTAL_INVESTMENT,
+                ROUND(AVG(roi_multiple), 1) AS AVG_ROI,
+                CAST(to_json(list(json_object(
+                    'PROGRAM_NAME', program_name, 'THERAPEUTIC_AREA', therapeutic_area,
+                    'ROI_MULTIPLE', roi_multiple, 'RECOMMENDATION', recommendation
+                ) ORDER BY roi_multiple DESC)) AS VARCHAR) AS PROGRAM_ROI
+            FROM AI_DEMO.PROGRAM_ROI_SUMMARY
+        ),
+        priorities AS (
+            SELECT CAST(to_json(list(json_object(
+                'BOARD_RECOMMENDATION', board_recommendation, 'COMPOUND_NAME', compound_name,
+                'TARGET_GENE', target_gene, 'PREDICTED_SUCCESS_PCT', predicted_success_pct,
+                'COMPETITIVE_POSITION', competitive_position, 'PEAK_SALES_MILLIONS', peak_sales_millions,
+                'INVESTMENT_REQUIRED_MILLIONS', investment_required_millions
+            ) ORDER BY board_recommendation)) AS VARCHAR) AS BOARD_PRIORITIES
+            FROM AI_DEMO.BOARD_CANDIDATE_SCORECARD
+            WHERE board_recommendation IN ('Priority 1', 'Priority 2', 'Priority 3')
+        )
+        SELECT
+            (SELECT COALESCE(MAX(SNAPSHOT_ID), 0) + 1 FROM AI_DEMO.EXECUTIVE_SNAPSHOT),
+            CAST(CURRENT_TIMESTAMP AS VARCHAR), CURRENT_TIMESTAMP,
+            c.TOTAL_COMPOUNDS, t.ACTIVE_TRIALS, p.TOTAL_INVESTMENT, p.AVG_ROI,
+            c.DRUG_LIKENESS, p.PROGRAM_ROI, b.BOARD_PRIORITIES
+        FROM compounds c, trials t, programs p, priorities b
+    """)
+    return "Executive snapshot built"
+
+
+# Stored procedures the apps CALL, emulated in Python against the same tables
+LOCAL_PROCEDURES = {
+    "BENCHMARK.BUILD_SURVIVAL_COUNTS": build_survival_counts,
+    "AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT": build_executive_snapshot,
+}
+
+
+AI_DEMO_FIXTURES = {
+    "COMPOUND_PIPELINE_ANALYSIS": (
+        ["COMPOUND_ID", "COMPOUND_NAME", "TARGET_GENE", "THERAPEUTIC_AREA", "PROGRAM_NAME", "PHASE",
+         "DRUG_LIKENESS", "FAILURE_REASON", "MOLECULAR_WEIGHT", "LOGP", "TPSA", "HBD", "HBA",
+         "PREDICTED_SUCCESS_PCT", "R_AND_D_SPEND_MILLIONS", "CREATED_DATE"],
+        [
+            ("CPD-001", "LA-BRCA1-101", "BRCA1", "Oncology", "DNA Repair", "Phase II", "drug_like", None, 412.5, 2.8, 88.1, 2, 6, 72, 45.0, "2023-02-14"),
+            ("CPD-002", "LA-BRCA2-117", "BRCA2", "Oncology", "DNA Repair", "Phase I", "drug_like", None, 455.2, 3.4, 92.3, 1, 7, 64, 31.5, "2023-05-02"),
+            ("CPD-003", "LA-KRAS-204", "KRAS", "Oncology", "RAS Pathway", "Preclinical", "borderline", "LogP above 4.5", 498.7, 4.9, 71.0, 1, 8, 41, 22.0, "2023-08-21"),
+            ("CPD-004", "LA-EGFR-311", "EGFR", "Oncology", "Kinase Inhibitors", "Phase II", "drug_like", None, 438.9, 3.1, 95.6, 2, 7, 58, 38.2, "2022-11-30"),
+            ("CPD-005", "LA-MYC-402", "MYC", "Oncology", "Transcription Factors", "Preclinical", "non_drug_like", "Molecular weight above 500", 611.3, 5.6, 140.2, 4, 11, 28, 12.4, "2024-01-09"),
+            ("CPD-006", "LA-JAK1-515", "JAK1", "Autoimmune", "Immunology", "Phase I", "borderline", "TPSA above 140", 476.0, 2.2, 146.8, 3, 9, 37, 19.8, "2023-03-17"),
+            ("CPD-007", "LA-LRRK2-623", "LRRK2", "CNS", "Neurodegeneration", "Preclinical", "non_drug_like", "LogP above 4.5", 523.4, 5.1, 64.5, 1, 6, 22, 27.3, "2023-10-05"),
+            ("CPD-008", "LA-TP53-708", "TP53", "Oncology", "Tumor Suppressors", "Phase I", "drug_like", None, 401.8, 2.5, 83.4, 2, 5, 49, 16.6, "2024-03-11"),
+        ]
+    ),
+    "CLINICAL_TRIAL_PERFORMANCE": (
+        ["TRIAL_ID", "TRIAL_NAME", "COMPOUND_ID", "COMPOUND_NAME", "TARGET_GENE", "THERAPEUTIC_AREA", "PHASE",
+         "STATUS", "INDICATION", "BIOMARKER_SELECTION", "CTDNA_CONFIRMATION", "ENROLLED_PATIENTS",
+         "COMPLETED_PATIENTS", "RESPONSE_RATE_PCT", "PFS_MONTHS", "OS_MONTHS", "SERIOUS_ADVERSE_EVENTS",
+         "TRIAL_COST_MILLIONS", "START_DATE", "COMPLETION_DATE"],
+        [
+            ("TRIAL-BRCA-001", "BRCA1 PARP Combination", "CPD-001", "LA-BRCA1-101", "BRCA1", "Oncology", "Phase II", "Active", "Ovarian Cancer", "YES", "YES", 240, 198, 52.9, 11.4, 24.8, 12, 38.0, "2023-04-01", None),
+            ("TRIAL-BRCA-002", "BRCA2 Monotherapy", "CPD-002", "LA-BRCA2-117", "BRCA2", "Oncology", "Phase I", "Recruiting", "Breast Cancer", "YES", "NO", 96, 40, 47.5, 9.8, 21.2, 6, 14.5, "2024-01-15", None),
+            ("TRIAL-EGFR-001", "EGFR Resistance Study", "CPD-004", "LA-EGFR-311", "EGFR", "Oncology", "Phase II", "Active", "NSCLC", "YES", "YES", 310, 251, 41.3, 8.9, 19.7, 21, 42.1, "2022-09-12", None),
+            ("TRIAL-KRAS-001", "KRAS G12C Basket", "CPD-003", "LA-KRAS-204", "KRAS", "Oncology", "Phase I", "Completed", "Colorectal Cancer", "NO", "NO", 180, 172, 32.1, 6.2, 14.9, 18, 25.6, "2022-02-01", "2024-06-30"),
+            ("TRIAL-TP53-001", "TP53 Reactivation", "CPD-008", "LA-TP53-708", "TP53", "Oncology", "Phase I", "Terminated", "Solid Tumors", "NO", "NO", 64, 31, 18.4, 4.1, 10.3, 9, 11.2, "2023-01-10", "2024-02-28"),
+        ]
+    ),
+    "PROGRAM_ROI_SUMMARY": (
+        ["PROGRAM_ID", "PROGRAM_NAME", "THERAPEUTIC_AREA", "TARGET_GENE", "TOTAL_COMPOUNDS", "COMPOUNDS_IN_CLINIC",
+         "COMPOUNDS_DRUG_LIKE", "PHASE_TRANSITION_RATE", "HISTORICAL_SUCCESS_RATE", "TOTAL_INVESTMENT_MILLIONS",
+         "PROJECTED_REVENUE_MILLIONS", "ROI_MULTIPLE", "RECOMMENDATION", "RATIONALE"],
+        [
+            ("PRG-001", "DNA Repair", "Oncology", "BRCA1", 6, 2, 5, 42.0, 18.5, 76.5, 1650.0, 21.6, "EXPAND", "Biomarker-selected responses well above benchmark"),
+            ("PRG-002", "RAS Pathway", "Oncology", "KRAS", 4, 1, 2, 25.0, 9.8, 22.0, 310.0, 14.1, "MAINTAIN", "ctDNA enrichment expected to lift response"),
+            ("PRG-003", "Kinase Inhibitors", "Oncology", "EGFR", 5, 1, 4, 30.0, 12.2, 38.2, 420.0, 11.0, "MAINTAIN", "Competitive pressure from third-generation inhibitors"),
+            ("PRG-004", "Immunology", "Autoimmune", "JAK1", 3, 1, 1, 18.0, 8.1, 61.0, 290.0, 4.8, "REDUCE", "Safety class effects limit differentiation"),
+            ("PRG-005", "Neurodegeneration", "CNS", "LRRK2", 3, 0, 1, 12.0, 5.5, 46.0, 129.0, 2.8, "REDUCE", "Low historical success rate in CNS"),
+        ]
+    ),
+    "RESEARCH_INTELLIGENCE": (
+        ["DOC_ID", "DOC_TITLE", "DOC_TYPE", "SOURCE", "PUBLICATION_DATE", "TARGET_GENE", "THERAPEUTIC_AREA",
+         "KEY_FINDING", "COMPETITIVE_IMPACT", "ACTION_REQUIRED", "RECOMMENDED_ACTION", "FULL_TEXT"],
+        [
+            ("DOC-001", "PARP inhibitor resistance in BRCA1 carriers", "Publication", "Nature Oncology", "2024-05-12", "BRCA1", "Oncology", "Reversion mutations drive resistance within 12 months", "High", "YES", "Add ctDNA monitoring for reversion mutations", "Reversion mutations in BRCA1 restore homologous recombination and drive PARP inhibitor resistance."),
+            ("DOC-002", "Third-generation EGFR inhibitors in NSCLC", "Publication", "Journal of Clinical Oncology", "2024-03-02", "EGFR", "Oncology", "Competitor achieves 58% ORR in C797S patients", "High", "YES", "Pivot EGFR program to alternate binding mechanisms", "A competitor third-generation EGFR inhibitor reports 58% objective response in C797S mutant NSCLC."),
+            ("DOC-003", "KRAS G12C ctDNA enrichment", "Internal Report", "LifeArc Translational", "2024-01-20", "KRAS", "Oncology", "ctDNA-confirmed patients respond twice as often", "Medium", "YES", "Mandate ctDNA confirmation for KRAS enrollment", "Patients with ctDNA-confirmed KRAS G12C showed double the response rate of tissue-only selection."),
+            ("DOC-004", "MYC degraders competitive landscape", "Internal Report", "LifeArc Strategy", "2023-11-08", "MYC", "Oncology", "No clinical MYC degrader for 18-24 months", "High", "YES", "Accelerate MYC program to first-in-class", "Landscape review finds no clinical-stage MYC degrader, giving an 18-24 month window."),
+            ("DOC-005", "LRRK2 kinase inhibition safety", "Publication", "Neuron", "2023-07-19", "LRRK2", "CNS", "Lung findings in primate studies at high exposure", "Medium", "NO", "Monitor class safety signals", "High exposure LRRK2 inhibition produced reversible lung findings in primate toxicology studies."),
+        ]
+    ),
+    "BOARD_CANDIDATE_SCORECARD": (
+        ["CANDIDATE_ID", "COMPOUND_ID", "COMPOUND_NAME", "TARGET_GENE", "THERAPEUTIC_AREA", "CURRENT_PHASE",
+         "PREDICTED_SUCCESS_PCT", "TIME_TO_MARKET_YEARS", "PEAK_SALES_MILLIONS", "INVESTMENT_REQUIRED_MILLIONS",
+         "COMPETITIVE_POSITION", "RISK_FACTORS", "STRATEGIC_RATIONALE", "BOARD_RECOMMENDATION"],
+        [
+            ("CAND-001", "CPD-001", "LA-BRCA1-101", "BRCA1", "Oncology", "Phase II", 72, 4.5, 1200.0, 85.0, "Best-in-class", "Resistance via reversion mutations", "Strong biomarker-selected efficacy", "Priority 1"),
+            ("CAND-002", "CPD-005", "LA-MYC-402", "MYC", "Oncology", "Preclinical", 28, 7.0, 2100.0, 140.0, "First-in-class", "Drug-likeness liabilities", "Open competitive window", "Priority 2"),
+            ("CAND-003", "CPD-003", "LA-KRAS-204", "KRAS", "Oncology", "Preclinical", 41, 6.0, 800.0, 95.0, "Fast-follower", "Crowded G12C space", "ctDNA-enriched population", "Priority 3"),
+            ("CAND-004", "CPD-004", "LA-EGFR-311", "EGFR", "Oncology", "Phase II", 58, 5.0, 650.0, 70.0, "Follow-on", "Competitor data in C797S", "Needs differentiated mechanism", "Watch List"),
+        ]
+    ),
+}
+
+
+def build_ai_demo_tables(conn):
+    for table, (columns, rows) in AI_DEMO_FIXTURES.items():
+        frame = pd.DataFrame(rows, columns=columns)
+        for column in columns:
+            if column.endswith("_DATE"):
+                frame[column] = pd.to_datetime(frame[column]).dt.date
+        conn.register("_fixture", frame)
+        conn.execute(f"CREATE TABLE AI_DEMO.{table} AS SELECT * FROM _fixture")
+        conn.unregister("_fixture")
+
+
+def build_research_index(conn):
+    """RESEARCH_TERM_INDEX, _DOC_STATS and _CORPUS_STATS, tokenized like
+    AI_DEMO.TOKENIZE_RESEARCH_DOC in sql_scripts/research_search_index.sql."""
+    conn.execute("""
+        CREATE TABLE AI_DEMO.RESEARCH_TERM_INDEX AS
+        WITH docs AS (
+            SELECT DOC_ID, STRING_SPLIT(TRIM(REGEXP_REPLACE(LOWER(
+                COALESCE(DOC_TITLE, '') || ' ' || COALESCE(TARGET_GENE, '') || ' ' ||
+                COALESCE(KEY_FINDING, '') || ' ' || COALESCE(FULL_TEXT, '')
+            ), '[^a-z0-9]+', ' ', 'g')), ' ') AS TOKENS
+            FROM AI_DEMO.RESEARCH_INTELLIGENCE
+        ),
+        tokens AS (
+            SELECT DOC_ID, UNNEST(TOKENS) AS TERM, GENERATE_SUBSCRIPTS(TOKENS, 1) AS POSITION
+            FROM docs
+        )
+        SELECT TERM, DOC_ID, COUNT(*) AS TF, LIST(POSITION ORDER BY POSITION) AS POSITIONS,
+               CURRENT_TIMESTAMP AS INDEXED_AT
+        FROM tokens
+        WHERE TERM <> ''
+        GROUP BY TERM, DOC_ID
+    """)
+    conn.execute("""
+        CREATE TABLE AI_DEMO.RESEARCH_DOC_STATS AS
+        SELECT DOC_ID, SUM(TF) AS DOC_LENGTH, CURRENT_TIMESTAMP AS INDEXED_AT
+        FROM AI_DEMO.RESEARCH_TERM_INDEX
+        GROUP BY DOC_ID
+    """)
+    conn.execute("""
+        CREATE TABLE AI_DEMO.RESEARCH_CORPUS_STATS AS
+        SELECT COUNT(*) AS DOC_COUNT, AVG(DOC_LENGTH) AS AVG_DOC_LENGTH, CURRENT_TIMESTAMP AS REFRESHED_AT
+        FROM AI_DEMO.RESEARCH_DOC_STATS
+    """)
+
+
+EMBED_DIMENSIONS = 768
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 200
+
+
+def local_embed_text(model, text):
+    """Stand-in for EMBED_TEXT_768: signed feature hashing of words and word
+    pairs, L2-normalized. Lexical rather than semantic, but deterministic, so
+    the embedding pipeline and vector search run end to end locally."""
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    vector = np.zeros(EMBED_DIMENSIONS, dtype=np.float32)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = int(hashlib.md5(feature.encode()).hexdigest(), 16)
+        vector[digest % EMBED_DIMENSIONS] += 1.0 if digest >> 127 else -1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+def split_text(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Fixed-size character chunks with overlap (SPLIT_TEXT_RECURSIVE_CHARACTER
+    also prefers paragraph and sentence boundaries)."""
+    if len(text) <= size:
+        return [text]
+    return [text[start:start + size] for start in range(0, len(text) - overlap, size - overlap)]
+
+
+def build_research_embeddings(conn):
+    """AI_DEMO.RESEARCH_EMBEDDINGS for both research sources, chunked and
+    title-prefixed like the RESEARCH_CHUNKS view in
+    sql_scripts/research_embeddings.sql, embedded with local_embed_text; and
+    an empty RESEARCH_RERANK_CACHE."""
+    conn.create_function("EMBED_TEXT_768", local_embed_text, ["VARCHAR", "VARCHAR"],
+                         conn.type(f"FLOAT[{EMBED_DIMENSIONS}]"))
+    documents = conn.execute("""
+        SELECT 'RESEARCH_INTELLIGENCE' AS SOURCE_TABLE, DOC_ID, DOC_TITLE AS TITLE,
+               COALESCE(KEY_FINDING, '') || chr(10) || chr(10) || COALESCE(FULL_TEXT, '') AS BODY
+        FROM AI_DEMO.RESEARCH_INTELLIGENCE
+        UNION ALL
+        SELECT 'RESEARCH_DOCUMENTS', DOC_ID, TITLE, COALESCE(CONTENT, '')
+        FROM UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS
+    """).fetchall()
+    chunks = pd.DataFrame(
+        [(source, doc_id, index, f"{title}: {chunk}")
+         for source, doc_id, title, body in documents
+         for index, chunk in enumerate(split_text(body))],
+        columns=["SOURCE_TABLE", "DOC_ID", "CHUNK_INDEX", "CHUNK_TEXT"]
+    )
+    conn.register("_chunks", chunks)
+    conn.execute("""
+        CREATE TABLE AI_DEMO.RESEARCH_EMBEDDINGS AS
+        SELECT SOURCE_TABLE, DOC_ID, CHUNK_INDEX, CHUNK_TEXT, SHA256(CHUNK_TEXT) AS CONTENT_HASH,
+               'snowflake-arctic-embed-m-v1.5' AS EMBED_MODEL,
+               EMBED_TEXT_768('snowflake-arctic-embed-m-v1.5', CHUNK_TEXT) AS EMBEDDING,
+               CURRENT_TIMESTAMP AS EMBEDDED_AT
+        FROM _chunks
+    """)
+    conn.unregister("_chunks")
+    conn.execute("""
+        CREATE TABLE AI_DEMO.RESEARCH_RERANK_CACHE (
+            MODEL VARCHAR, QUERY_HASH VARCHAR, QUERY_TEXT VARCHAR, SOURCE_TABLE VARCHAR, DOC_ID VARCHAR,
+            CONTENT_HASH VARCHAR, SCORE DOUBLE, CREATED_AT TIMESTAMP, HIT_COUNT BIGINT DEFAULT 0
+        )
+    """)
+
+
+def build_unstructured_tables(conn):
+    abstract = DEMO_DATA_DIR / "research_abstract.txt"
+    text = abstract.read_text() if abstract.exists() else ""
+    conn.execute("""
+        CREATE TABLE UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS (
+            DOC_ID VARCHAR PRIMARY KEY, DOC_TYPE VARCHAR, TITLE VARCHAR, CONTENT VARCHAR,
+            AUTHORS VARCHAR, CREATED_DATE DATE, TAGS VARCHAR[]
+        )
+    """)
+    conn.execute("""
+        INSERT INTO UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS VALUES
+        ('DOC001', 'Abstract', 'Novel BRCA1 DDR Inhibitors', ?, 'Mitchell S, Chen J, Roberts E',
+         DATE '2024-11-01', ['DDR', 'BRCA1', 'oncology']),
+        ('DOC002', 'Protocol', 'KRAS G12C Phase II Trial',
+         'Phase II clinical trial evaluating novel KRAS G12C inhibitor in NSCLC patients. The study will enroll 120 patients.',
+         'LifeArc Clinical Team', DATE '2024-03-15', ['KRAS', 'NSCLC', 'clinical'])
+    """, [text])
@@ -131,3 +131,8 @@ DIMENSIONS (
 AI_SQL_GENERATION 'For compound failure questions: focus on logp, molecular_weight, drug_likeness. For trial comparisons: highlight biomarker_selection and ctdna_confirmation. For ROI questions: compare roi_multiple across therapeutic areas.'
 
 AI_QUESTION_CATEGORIZATION 'COMPOUND_SCREENING: molecular properties, drug-likeness. CLINICAL_PERFORMANCE: trial outcomes, response rates. PORTFOLIO_ROI: investments, ROI. COMPETITIVE_INTEL: research findings. BOARD_PRIORITIES: candidate prioritization.';
+
+-- SQL generated against the previous definition is cached by the
+-- intelligence demo; drop them so questions are re-translated:
+-- DELETE FROM LIFEARC_POC.BENCHMARK.ANALYST_SQL_CACHE
+-- WHERE SEMANTIC_VIEW = 'LIFEARC_POC.AI_DEMO.DRUG_DISCOVERY_SEMANTIC_VIEW';
@@ -0,0 +1,1122 @@
+/*
+================================================================================
+LifeArc POC - Dashboard Pre-Aggregation Layer
+================================================================================
+Backs the Clinical Response Prediction dashboard
+(streamlit/lifearc_ml_dashboard.py) with compact summary tables so that page
+renders never scan BENCHMARK.CLINICAL_TRIAL_RESULTS_1M directly.
+
+OBJECTS:
+- BENCHMARK.DASHBOARD_RESPONSE_CUBE (Table) - GROUPING SETS aggregate cube
+- BENCHMARK.DASHBOARD_PATIENT_ROWS (Table) - Per-patient row counts for distinct counts
+- BENCHMARK.PATIENT_STRATUM_RATES (Table) - Responder counts per fine-grained patient stratum
+- BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM (Stream) - CDC on the source table
+- BENCHMARK.REFRESH_DASHBOARD_CUBE (Procedure) - Single-scan full rebuild
+- BENCHMARK.APPLY_DASHBOARD_CUBE_DELTA (Procedure) - Merge stream delta into cube
+- BENCHMARK.REFRESH_DASHBOARD_CUBE_TASK (Task) - Runs the delta merge on new data
+- ML_DEMO.RESPONSE_SURFACE (Table) - RESPONSE_CLASSIFIER_CLEAN scored over the full input grid
+- ML_DEMO.BUILD_RESPONSE_SURFACE (Procedure) - One set-based PREDICT over the grid
+- BENCHMARK.APP_QUERY_LOG (Table) - Client-side timings of every tagged Streamlit query
+- BENCHMARK.CLINICAL_RESULTS_SAMPLE (Table) - Fixed-size stratified sample for fast mode
+- BENCHMARK.REFRESH_CLINICAL_SAMPLE (Procedure) - Row- or block-sampled redraw of the sample
+- BENCHMARK.REFRESH_CLINICAL_SAMPLE_TASK (Task) - Nightly redraw
+- ML_DEMO.MODEL_EVALUATION_BINS (Table) - Predicted-probability histogram per model version
+- ML_DEMO.BUILD_MODEL_EVALUATION_BINS (Procedure) - One pass over MODEL_EVALUATION
+- ML_DEMO.MODEL_EVALUATION_CURVES (View) - ROC / PR / calibration / lift points per bin
+- BENCHMARK.SURVIVAL_EVENT_COUNTS (Table) - PFS / OS events and censorings per group and time
+- BENCHMARK.BUILD_SURVIVAL_COUNTS (Procedure) - One scan per cohort dimension + follow-up cutoff
+- BENCHMARK.REFRESH_SURVIVAL_COUNTS (Procedure) - Rebuilds every stored definition
+- BENCHMARK.REFRESH_SURVIVAL_COUNTS_TASK (Task) - Nightly rebuild
+- BENCHMARK.SURVIVAL_CURVES (View) - Kaplan-Meier step points with Greenwood standard errors
+- BENCHMARK.SURVIVAL_LOGRANK (View) - Log-rank observed / expected events and covariances
+- BENCHMARK.CORTEX_RESPONSE_CACHE (Table) - Persistent COMPLETE answers with TTL and hit counts
+- BENCHMARK.CORTEX_CACHE_STATS (View) - Hit rate per app section and model
+- BENCHMARK.PURGE_CORTEX_RESPONSE_CACHE_TASK (Task) - Nightly removal of long-expired entries
+- BENCHMARK.ANALYST_SQL_CACHE (Table) - Validated Cortex Analyst SQL per normalized question
+
+All dashboard response rates are RESPONDERS / RESPONSE_ROWS (charts, which
+exclude NULL responses) or RESPONDERS / ROW_COUNT (headline metrics, which do
+not) - the same ratios the per-page AVG(CASE ...) queries computed.
+================================================================================
+*/
+
+USE DATABASE LIFEARC_POC;
+USE WAREHOUSE COMPUTE_WH;
+
+-- ============================================================================
+-- PART 1: AGGREGATE CUBE
+-- ============================================================================
+
+-- One row per group of every grouping set the dashboard charts on.
+-- DIMENSION_SET names the grouping set; dimensions outside it are NULL.
+CREATE TABLE IF NOT EXISTS BENCHMARK.DASHBOARD_RESPONSE_CUBE (
+    DIMENSION_SET VARCHAR NOT NULL,   -- ALL, TARGET_GENE, TREATMENT_ARM, BIOMARKER_CTDNA, TRIAL, RESPONSE_CATEGORY
+    TRIAL_ID VARCHAR,
+    TARGET_GENE VARCHAR,
+    TREATMENT_ARM VARCHAR,
+    BIOMARKER_STATUS VARCHAR,
+    CTDNA_CONFIRMATION VARCHAR,
+    RESPONSE_CATEGORY VARCHAR,
+
+    -- Additive measures
+    ROW_COUNT NUMBER,                 -- COUNT(*)
+    RESPONSE_ROWS NUMBER,             -- rows with a non-NULL RESPONSE_CATEGORY
+    RESPONDERS NUMBER,                -- Complete_Response + Partial_Response
+    PFS_SUM FLOAT,                    -- over rows with a non-NULL response
+    PFS_COUNT NUMBER,
+    OS_SUM FLOAT,
+    OS_COUNT NUMBER,
+
+    -- Non-additive measure: kept current for the ALL row via DASHBOARD_PATIENT_ROWS,
+    -- recomputed for the other grouping sets on full rebuild only
+    DISTINCT_PATIENTS NUMBER,
+
+    REFRESHED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- Rows per patient; COUNT(*) of this table is the exact distinct patient count
+-- and can be maintained from inserts and deletes alike
+CREATE TABLE IF NOT EXISTS BENCHMARK.DASHBOARD_PATIENT_ROWS (
+    PATIENT_ID VARCHAR NOT NULL,
+    ROW_COUNT NUMBER NOT NULL,
+    PRIMARY KEY (PATIENT_ID)
+);
+
+-- Responder counts at the finest grain the "How Does This Patient Compare?"
+-- chart can filter on. Any marginal or joint stratum (same arm, same gene,
+-- same arm + biomarker, same age band, ...) is a conditional SUM over these
+-- few thousand rows, so all strata come back from one pass of a tiny table.
+CREATE TABLE IF NOT EXISTS BENCHMARK.PATIENT_STRATUM_RATES (
+    TRIAL_ID VARCHAR,
+    TARGET_GENE VARCHAR,
+    TREATMENT_ARM VARCHAR,
+    BIOMARKER_STATUS VARCHAR,
+    CTDNA_CONFIRMATION VARCHAR,
+    COHORT VARCHAR,
+    PATIENT_SEX VARCHAR,
+    AGE_BAND NUMBER,                  -- FLOOR(PATIENT_AGE / 10) * 10
+    ROW_COUNT NUMBER,
+    RESPONSE_ROWS NUMBER,             -- rows with a non-NULL RESPONSE_CATEGORY
+    RESPONDERS NUMBER,
+    REFRESHED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- Tables created before RESPONSE_ROWS existed; filled by the next full rebuild
+ALTER TABLE BENCHMARK.PATIENT_STRATUM_RATES ADD COLUMN IF NOT EXISTS RESPONSE_ROWS NUMBER;
+
+-- ============================================================================
+-- PART 2: CHANGE CAPTURE
+-- ============================================================================
+
+-- Stream to capture new, updated and deleted clinical results
+CREATE STREAM IF NOT EXISTS BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM
+ON TABLE BENCHMARK.CLINICAL_TRIAL_RESULTS_1M;
+
+-- ============================================================================
+-- PART 3: SINGLE-SCAN REBUILD
+-- ============================================================================
+
+-- Full rebuild; also consumes the stream so the next delta merge starts from
+-- the snapshot the cube was built from
+CREATE OR REPLACE PROCEDURE BENCHMARK.REFRESH_DASHBOARD_CUBE()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    INSERT OVERWRITE INTO BENCHMARK.DASHBOARD_RESPONSE_CUBE
+    (DIMENSION_SET, TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS,
+     CTDNA_CONFIRMATION, RESPONSE_CATEGORY, ROW_COUNT, RESPONSE_ROWS, RESPONDERS,
+     PFS_SUM, PFS_COUNT, OS_SUM, OS_COUNT, DISTINCT_PATIENTS, REFRESHED_AT)
+    SELECT
+        CASE
+            WHEN GROUPING(TRIAL_ID) = 0 THEN 'TRIAL'
+            WHEN GROUPING(BIOMARKER_STATUS) = 0 THEN 'BIOMARKER_CTDNA'
+            WHEN GROUPING(TARGET_GENE) = 0 THEN 'TARGET_GENE'
+            WHEN GROUPING(TREATMENT_ARM) = 0 THEN 'TREATMENT_ARM'
+            WHEN GROUPING(RESPONSE_CATEGORY) = 0 THEN 'RESPONSE_CATEGORY'
+            ELSE 'ALL'
+        END AS DIMENSION_SET,
+        TRIAL_ID,
+        TARGET_GENE,
+        TREATMENT_ARM,
+        BIOMARKER_STATUS,
+        CTDNA_CONFIRMATION,
+        RESPONSE_CATEGORY,
+        COUNT(*),
+        COUNT(RESPONSE_CATEGORY),
+        SUM(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response')
+                 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN PFS_MONTHS END),
+        COUNT(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN PFS_MONTHS END),
+        SUM(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN OS_MONTHS END),
+        COUNT(CASE WHEN RESPONSE_CATEGORY IS NOT NULL THEN OS_MONTHS END),
+        COUNT(DISTINCT PATIENT_ID),
+        CURRENT_TIMESTAMP()
+    FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+    GROUP BY GROUPING SETS (
+        (),
+        (TARGET_GENE),
+        (TREATMENT_ARM),
+        (BIOMARKER_STATUS, CTDNA_CONFIRMATION),
+        (TRIAL_ID, TARGET_GENE),
+        (RESPONSE_CATEGORY)
+    );
+
+    INSERT OVERWRITE INTO BENCHMARK.DASHBOARD_PATIENT_ROWS (PATIENT_ID, ROW_COUNT)
+    SELECT PATIENT_ID, COUNT(*)
+    FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+    WHERE PATIENT_ID IS NOT NULL
+    GROUP BY PATIENT_ID;
+
+    INSERT OVERWRITE INTO BENCHMARK.PATIENT_STRATUM_RATES
+    (TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+     COHORT, PATIENT_SEX, AGE_BAND, ROW_COUNT, RESPONSE_ROWS, RESPONDERS, REFRESHED_AT)
+    SELECT
+        TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+        COHORT, PATIENT_SEX, FLOOR(PATIENT_AGE / 10) * 10,
+        COUNT(*),
+        COUNT(RESPONSE_CATEGORY),
+        SUM(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response')
+                 THEN 1 ELSE 0 END),
+        CURRENT_TIMESTAMP()
+    FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+    GROUP BY 1, 2, 3, 4, 5, 6, 7, 8;
+
+    -- Advance the stream offset without applying its contents
+    INSERT INTO BENCHMARK.DASHBOARD_PATIENT_ROWS (PATIENT_ID, ROW_COUNT)
+    SELECT PATIENT_ID, 0
+    FROM BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM
+    WHERE 1 = 0;
+
+    COMMIT;
+
+    RETURN 'Dashboard cube refreshed';
+END;
+$$;
+
+-- ============================================================================
+-- PART 4: INCREMENTAL REFRESH
+-- ============================================================================
+
+-- Merges only the rows captured by the stream. Every change row is weighted
+-- +1 (INSERT) or -1 (DELETE; an UPDATE arrives as a DELETE/INSERT pair), so
+-- the additive measures stay exact and the work is proportional to the delta.
+CREATE OR REPLACE PROCEDURE BENCHMARK.APPLY_DASHBOARD_CUBE_DELTA()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    MERGE INTO BENCHMARK.DASHBOARD_RESPONSE_CUBE c
+    USING (
+        SELECT
+            CASE
+                WHEN GROUPING(TRIAL_ID) = 0 THEN 'TRIAL'
+                WHEN GROUPING(BIOMARKER_STATUS) = 0 THEN 'BIOMARKER_CTDNA'
+                WHEN GROUPING(TARGET_GENE) = 0 THEN 'TARGET_GENE'
+                WHEN GROUPING(TREATMENT_ARM) = 0 THEN 'TREATMENT_ARM'
+                WHEN GROUPING(RESPONSE_CATEGORY) = 0 THEN 'RESPONSE_CATEGORY'
+                ELSE 'ALL'
+            END AS DIMENSION_SET,
+            TRIAL_ID,
+            TARGET_GENE,
+            TREATMENT_ARM,
+            BIOMARKER_STATUS,
+            CTDNA_CONFIRMATION,
+            RESPONSE_CATEGORY,
+            SUM(CHANGE_SIGN) AS ROW_COUNT,
+            SUM(IFF(RESPONSE_CATEGORY IS NOT NULL, CHANGE_SIGN, 0)) AS RESPONSE_ROWS,
+            SUM(IFF(RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response'),
+                    CHANGE_SIGN, 0)) AS RESPONDERS,
+            SUM(IFF(RESPONSE_CATEGORY IS NOT NULL, CHANGE_SIGN * PFS_MONTHS, NULL)) AS PFS_SUM,
+            SUM(IFF(RESPONSE_CATEGORY IS NOT NULL AND PFS_MONTHS IS NOT NULL,
+                    CHANGE_SIGN, 0)) AS PFS_COUNT,
+            SUM(IFF(RESPONSE_CATEGORY IS NOT NULL, CHANGE_SIGN * OS_MONTHS, NULL)) AS OS_SUM,
+            SUM(IFF(RESPONSE_CATEGORY IS NOT NULL AND OS_MONTHS IS NOT NULL,
+                    CHANGE_SIGN, 0)) AS OS_COUNT
+        FROM (
+            SELECT
+                TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS,
+                CTDNA_CONFIRMATION, RESPONSE_CATEGORY, PFS_MONTHS, OS_MONTHS,
+                IFF(METADATA$ACTION = 'INSERT', 1, -1) AS CHANGE_SIGN
+            FROM BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM
+        )
+        GROUP BY GROUPING SETS (
+            (),
+            (TARGET_GENE),
+            (TREATMENT_ARM),
+            (BIOMARKER_STATUS, CTDNA_CONFIRMATION),
+            (TRIAL_ID, TARGET_GENE),
+            (RESPONSE_CATEGORY)
+        )
+        HAVING COUNT(*) > 0
+    ) d
+    ON c.DIMENSION_SET = d.DIMENSION_SET
+       AND EQUAL_NULL(c.TRIAL_ID, d.TRIAL_ID)
+       AND EQUAL_NULL(c.TARGET_GENE, d.TARGET_GENE)
+       AND EQUAL_NULL(c.TREATMENT_ARM, d.TREATMENT_ARM)
+       AND EQUAL_NULL(c.BIOMARKER_STATUS, d.BIOMARKER_STATUS)
+       AND EQUAL_NULL(c.CTDNA_CONFIRMATION, d.CTDNA_CONFIRMATION)
+       AND EQUAL_NULL(c.RESPONSE_CATEGORY, d.RESPONSE_CATEGORY)
+    WHEN MATCHED THEN UPDATE SET
+        ROW_COUNT = c.ROW_COUNT + d.ROW_COUNT,
+        RESPONSE_ROWS = c.RESPONSE_ROWS + d.RESPONSE_ROWS,
+        RESPONDERS = c.RESPONDERS + d.RESPONDERS,
+        PFS_SUM = COALESCE(c.PFS_SUM, 0) + COALESCE(d.PFS_SUM, 0),
+        PFS_COUNT = c.PFS_COUNT + d.PFS_COUNT,
+        OS_SUM = COALESCE(c.OS_SUM, 0) + COALESCE(d.OS_SUM, 0),
+        OS_COUNT = c.OS_COUNT + d.OS_COUNT,
+        REFRESHED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+        (DIMENSION_SET, TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS,
+         CTDNA_CONFIRMATION, RESPONSE_CATEGORY, ROW_COUNT, RESPONSE_ROWS, RESPONDERS,
+         PFS_SUM, PFS_COUNT, OS_SUM, OS_COUNT, DISTINCT_PATIENTS, REFRESHED_AT)
+    VALUES
+        (d.DIMENSION_SET, d.TRIAL_ID, d.TARGET_GENE, d.TREATMENT_ARM, d.BIOMARKER_STATUS,
+         d.CTDNA_CONFIRMATION, d.RESPONSE_CATEGORY, d.ROW_COUNT, d.RESPONSE_ROWS, d.RESPONDERS,
+         d.PFS_SUM, d.PFS_COUNT, d.OS_SUM, d.OS_COUNT, NULL, CURRENT_TIMESTAMP());
+
+    MERGE INTO BENCHMARK.DASHBOARD_PATIENT_ROWS p
+    USING (
+        SELECT PATIENT_ID, SUM(IFF(METADATA$ACTION = 'INSERT', 1, -1)) AS ROW_DELTA
+        FROM BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM
+        WHERE PATIENT_ID IS NOT NULL
+        GROUP BY PATIENT_ID
+    ) d
+    ON p.PATIENT_ID = d.PATIENT_ID
+    WHEN MATCHED THEN UPDATE SET ROW_COUNT = p.ROW_COUNT + d.ROW_DELTA
+    WHEN NOT MATCHED THEN INSERT (PATIENT_ID, ROW_COUNT) VALUES (d.PATIENT_ID, d.ROW_DELTA);
+
+    DELETE FROM BENCHMARK.DASHBOARD_PATIENT_ROWS WHERE ROW_COUNT <= 0;
+
+    MERGE INTO BENCHMARK.PATIENT_STRATUM_RATES r
+    USING (
+        SELECT
+            TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+            COHORT, PATIENT_SEX, FLOOR(PATIENT_AGE / 10) * 10 AS AGE_BAND,
+            SUM(IFF(METADATA$ACTION = 'INSERT', 1, -1)) AS ROW_COUNT,
+            SUM(IFF(RESPONSE_CATEGORY IS NOT NULL,
+                    IFF(METADATA$ACTION = 'INSERT', 1, -1), 0)) AS RESPONSE_ROWS,
+            SUM(IFF(RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response'),
+                    IFF(METADATA$ACTION = 'INSERT', 1, -1), 0)) AS RESPONDERS
+        FROM BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM
+        GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+    ) d
+    ON EQUAL_NULL(r.TRIAL_ID, d.TRIAL_ID)
+       AND EQUAL_NULL(r.TARGET_GENE, d.TARGET_GENE)
+       AND EQUAL_NULL(r.TREATMENT_ARM, d.TREATMENT_ARM)
+       AND EQUAL_NULL(r.BIOMARKER_STATUS, d.BIOMARKER_STATUS)
+       AND EQUAL_NULL(r.CTDNA_CONFIRMATION, d.CTDNA_CONFIRMATION)
+       AND EQUAL_NULL(r.COHORT, d.COHORT)
+       AND EQUAL_NULL(r.PATIENT_SEX, d.PATIENT_SEX)
+       AND EQUAL_NULL(r.AGE_BAND, d.AGE_BAND)
+    WHEN MATCHED THEN UPDATE SET
+        ROW_COUNT = r.ROW_COUNT + d.ROW_COUNT,
+        RESPONSE_ROWS = r.RESPONSE_ROWS + d.RESPONSE_ROWS,
+        RESPONDERS = r.RESPONDERS + d.RESPONDERS,
+        REFRESHED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+        (TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+         COHORT, PATIENT_SEX, AGE_BAND, ROW_COUNT, RESPONSE_ROWS, RESPONDERS, REFRESHED_AT)
+    VALUES
+        (d.TRIAL_ID, d.TARGET_GENE, d.TREATMENT_ARM, d.BIOMARKER_STATUS, d.CTDNA_CONFIRMATION,
+         d.COHORT, d.PATIENT_SEX, d.AGE_BAND, d.ROW_COUNT, d.RESPONSE_ROWS, d.RESPONDERS,
+         CURRENT_TIMESTAMP());
+
+    DELETE FROM BENCHMARK.PATIENT_STRATUM_RATES WHERE ROW_COUNT <= 0;
+
+    -- Groups whose last row was deleted
+    DELETE FROM BENCHMARK.DASHBOARD_RESPONSE_CUBE
+    WHERE ROW_COUNT <= 0 AND DIMENSION_SET <> 'ALL';
+
+    UPDATE BENCHMARK.DASHBOARD_RESPONSE_CUBE
+    SET DISTINCT_PATIENTS = (SELECT COUNT(*) FROM BENCHMARK.DASHBOARD_PATIENT_ROWS)
+    WHERE DIMENSION_SET = 'ALL';
+
+    COMMIT;
+
+    RETURN 'Dashboard cube delta applied';
+END;
+$$;
+
+-- Initial build
+CALL BENCHMARK.REFRESH_DASHBOARD_CUBE();
+
+-- Parity check: cube rates vs. the original per-page query (expect 0 rows)
+SELECT c.TARGET_GENE, c.RESPONSE_RATE AS CUBE_RATE, d.RESPONSE_RATE AS DIRECT_RATE
+FROM (
+    SELECT TARGET_GENE, ROUND(RESPONDERS * 100 / RESPONSE_ROWS, 1) AS RESPONSE_RATE
+    FROM BENCHMARK.DASHBOARD_RESPONSE_CUBE
+    WHERE DIMENSION_SET = 'TARGET_GENE'
+) c
+JOIN (
+    SELECT
+        TARGET_GENE,
+        ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response')
+                       THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE
+    FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+    WHERE RESPONSE_CATEGORY IS NOT NULL
+    GROUP BY TARGET_GENE
+) d ON c.TARGET_GENE = d.TARGET_GENE
+WHERE c.RESPONSE_RATE <> d.RESPONSE_RATE;
+
+-- ============================================================================
+-- PART 5: SCHEDULED DELTA TASK
+-- ============================================================================
+
+-- Same stream-gated pattern as ML_FEATURES.REFRESH_FEATURES_TASK: the task is
+-- skipped (no warehouse time) whenever the stream is empty
+CREATE OR REPLACE TASK BENCHMARK.REFRESH_DASHBOARD_CUBE_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = '5 MINUTE'
+    WHEN SYSTEM$STREAM_HAS_DATA('LIFEARC_POC.BENCHMARK.CLINICAL_RESULTS_DASHBOARD_STREAM')
+AS
+    CALL BENCHMARK.APPLY_DASHBOARD_CUBE_DELTA();
+
+-- Start the task
+ALTER TASK BENCHMARK.REFRESH_DASHBOARD_CUBE_TASK RESUME;
+
+-- ============================================================================
+-- PART 6: PATIENT PREDICTION RESPONSE SURFACE
+-- ============================================================================
+
+-- The Patient Prediction form has a finite input space:
+-- 5 trials x 5 genes x 2 biomarker x 2 ctDNA x 3 arms x 3 cohorts x 73 ages x 2 sexes
+-- = 131,400 profiles. Scoring all of them once per model version turns every
+-- interactive prediction into a key lookup.
+CREATE TABLE IF NOT EXISTS ML_DEMO.RESPONSE_SURFACE (
+    MODEL_VERSION VARCHAR NOT NULL,
+    TRIAL_ID VARCHAR NOT NULL,
+    TARGET_GENE VARCHAR NOT NULL,
+    BIOMARKER_STATUS VARCHAR NOT NULL,
+    CTDNA_CONFIRMATION VARCHAR NOT NULL,
+    TREATMENT_ARM VARCHAR NOT NULL,
+    COHORT VARCHAR NOT NULL,
+    PATIENT_AGE NUMBER NOT NULL,
+    PATIENT_SEX VARCHAR NOT NULL,
+    PREDICTED_CLASS NUMBER,
+    PROB_RESPONDER FLOAT,
+    PROB_NON_RESPONDER FLOAT,
+    SCORED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (MODEL_VERSION, TRIAL_ID, TARGET_GENE, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+                 TREATMENT_ARM, COHORT, PATIENT_AGE, PATIENT_SEX)
+)
+CLUSTER BY (MODEL_VERSION);
+
+CREATE OR REPLACE PROCEDURE ML_DEMO.BUILD_RESPONSE_SURFACE(MODEL_VERSION VARCHAR)
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    DELETE FROM ML_DEMO.RESPONSE_SURFACE WHERE MODEL_VERSION = :MODEL_VERSION;
+
+    INSERT INTO ML_DEMO.RESPONSE_SURFACE
+    (MODEL_VERSION, TRIAL_ID, TARGET_GENE, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+     TREATMENT_ARM, COHORT, PATIENT_AGE, PATIENT_SEX,
+     PREDICTED_CLASS, PROB_RESPONDER, PROB_NON_RESPONDER, SCORED_AT)
+    WITH grid AS (
+        SELECT t.TRIAL_ID, g.TARGET_GENE, b.BIOMARKER_STATUS, c.CTDNA_CONFIRMATION,
+               a.TREATMENT_ARM, h.COHORT, ages.PATIENT_AGE, s.PATIENT_SEX
+        FROM (SELECT column1 AS TRIAL_ID FROM VALUES
+                ('TRIAL-BRCA-001'), ('TRIAL-BRCA-002'), ('TRIAL-EGFR-001'),
+                ('TRIAL-KRAS-001'), ('TRIAL-TP53-001')) t
+        CROSS JOIN (SELECT column1 AS TARGET_GENE FROM VALUES
+                ('BRCA1'), ('BRCA2'), ('EGFR'), ('KRAS'), ('TP53')) g
+        CROSS JOIN (SELECT column1 AS BIOMARKER_STATUS FROM VALUES ('POSITIVE'), ('NEGATIVE')) b
+        CROSS JOIN (SELECT column1 AS CTDNA_CONFIRMATION FROM VALUES ('YES'), ('NO')) c
+        CROSS JOIN (SELECT column1 AS TREATMENT_ARM FROM VALUES
+                ('Combination'), ('Experimental'), ('Standard')) a
+        CROSS JOIN (SELECT column1 AS COHORT FROM VALUES
+                ('Cohort_A'), ('Cohort_B'), ('Cohort_C')) h
+        CROSS JOIN (SELECT 17 + ROW_NUMBER() OVER (ORDER BY SEQ4()) AS PATIENT_AGE
+                    FROM TABLE(GENERATOR(ROWCOUNT => 73))) ages
+        CROSS JOIN (SELECT column1 AS PATIENT_SEX FROM VALUES ('F'), ('M')) s
+    ),
+    scored AS (
+        SELECT
+            grid.*,
+            LIFEARC_POC.ML_DEMO.RESPONSE_CLASSIFIER_CLEAN!PREDICT(
+                INPUT_DATA => OBJECT_CONSTRUCT(
+                    'TRIAL_ID', TRIAL_ID,
+                    'TREATMENT_ARM', TREATMENT_ARM,
+                    'BIOMARKER_STATUS', BIOMARKER_STATUS,
+                    'CTDNA_CONFIRMATION', CTDNA_CONFIRMATION,
+                    'TARGET_GENE', TARGET_GENE,
+                    'PATIENT_AGE', PATIENT_AGE,
+                    'PATIENT_SEX', PATIENT_SEX,
+                    'COHORT', COHORT,
+                    'BIOMARKER_POSITIVE', IFF(BIOMARKER_STATUS = 'POSITIVE', 1, 0),
+                    'CTDNA_CONFIRMED', IFF(CTDNA_CONFIRMATION = 'YES', 1, 0),
+                    'TREATMENT_INTENSITY', CASE TREATMENT_ARM
+                        WHEN 'Combination' THEN 3
+                        WHEN 'Experimental' THEN 2
+                        ELSE 1 END
+                )
+            ) AS PREDICTION
+        FROM grid
+    )
+    SELECT
+        :MODEL_VERSION,
+        TRIAL_ID, TARGET_GENE, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+        TREATMENT_ARM, COHORT, PATIENT_AGE, PATIENT_SEX,
+        PREDICTION:class::INT,
+        PREDICTION:probability:"1"::FLOAT,
+        PREDICTION:probability:"0"::FLOAT,
+        CURRENT_TIMESTAMP()
+    FROM scored;
+
+    COMMIT;
+
+    RETURN 'Response surface built for model version ' || :MODEL_VERSION;
+END;
+$$;
+
+-- Rebuild after every retrain of RESPONSE_CLASSIFIER_CLEAN, using the
+-- MODEL_VERSION recorded in ML_DEMO.MODEL_METRICS_LOG
+CALL ML_DEMO.BUILD_RESPONSE_SURFACE('SNOWFLAKE_NOTEBOOK_RUN');
+
+-- ============================================================================
+-- PART 7: STREAMLIT QUERY INSTRUMENTATION
+-- ============================================================================
+
+-- All three Streamlit apps tag each statement with
+-- QUERY_TAG = {"app": ..., "page": ..., "section": ...} and append their
+-- client-side measurements here in batches. QUERY_ID joins to QUERY_HISTORY
+-- for warehouse time, bytes scanned, partitions pruned and cache use.
+CREATE TABLE IF NOT EXISTS BENCHMARK.APP_QUERY_LOG (
+    QUERY_ID VARCHAR NOT NULL,
+    APP VARCHAR,
+    PAGE VARCHAR,
+    SECTION VARCHAR,
+    CLIENT_MS FLOAT,                  -- submit to result in the app, incl. transfer
+    ROWS_RETURNED NUMBER,
+    RESULT_BYTES NUMBER,              -- in-memory size of the fetched result
+    LOGGED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+CLUSTER BY (TO_DATE(LOGGED_AT));
+
+-- Hot spots over the last day (same join as the dashboard Performance page)
+SELECT
+    l.APP, l.PAGE, l.SECTION,
+    COUNT(*) AS QUERIES,
+    ROUND(AVG(l.CLIENT_MS)) AS AVG_CLIENT_MS,
+    ROUND(AVG(h.TOTAL_ELAPSED_TIME)) AS AVG_WAREHOUSE_MS,
+    SUM(h.BYTES_SCANNED) AS BYTES_SCANNED
+FROM BENCHMARK.APP_QUERY_LOG l
+LEFT JOIN TABLE(INFORMATION_SCHEMA.QUERY_HISTORY(
+    END_TIME_RANGE_START => DATEADD('hour', -24, CURRENT_TIMESTAMP()),
+    RESULT_LIMIT => 10000
+)) h ON h.QUERY_ID = l.QUERY_ID
+WHERE l.LOGGED_AT >= DATEADD('hour', -24, CURRENT_TIMESTAMP())
+GROUP BY 1, 2, 3
+ORDER BY AVG_CLIENT_MS DESC;
+
+-- ============================================================================
+-- PART 8: STRATIFIED SAMPLE FOR FAST MODE
+-- ============================================================================
+
+-- A fixed number of rows per trial/gene/arm/biomarker/ctDNA stratum, so the
+-- dashboard's fast mode reads the same few tens of thousands of rows whether
+-- the source holds 1M or 100M+. SAMPLE_WEIGHT = stratum rows / sampled rows;
+-- weighted rates are unbiased and the per-stratum variances give the
+-- confidence intervals drawn as error bars.
+CREATE TABLE IF NOT EXISTS BENCHMARK.CLINICAL_RESULTS_SAMPLE (
+    STRATUM_ID NUMBER,                -- HASH of the stratification columns
+    PATIENT_ID VARCHAR,
+    TRIAL_ID VARCHAR,
+    TARGET_GENE VARCHAR,
+    TREATMENT_ARM VARCHAR,
+    BIOMARKER_STATUS VARCHAR,
+    CTDNA_CONFIRMATION VARCHAR,
+    RESPONSE_CATEGORY VARCHAR,
+    PFS_MONTHS FLOAT,
+    OS_MONTHS FLOAT,
+    IS_RESPONDER NUMBER,
+    STRATUM_ROWS NUMBER,              -- population rows in the stratum
+    SAMPLE_WEIGHT FLOAT,
+    SAMPLED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- Stratum sizes come from PATIENT_STRATUM_RATES, so only the draw touches the
+-- source table. SAMPLE SYSTEM keeps or skips whole micro-partitions (each
+-- holds roughly 0.5-1M rows of this table), so it only prunes once the table
+-- spans a few hundred of them - about 100M rows. Below SYSTEM_SAMPLE_MIN_ROWS
+-- the draw is a row-level SAMPLE BERNOULLI sized so the smallest stratum still
+-- yields about three times its quota; the scan is cheap at that size and
+-- every stratum fills. At or above it, SAMPLE SYSTEM reads about three times
+-- the total target (quota x strata) of the table's blocks; strata too small
+-- to fill their quota from that keep fewer rows, and SAMPLE_WEIGHT accounts
+-- for it.
+CREATE OR REPLACE PROCEDURE BENCHMARK.REFRESH_CLINICAL_SAMPLE(ROWS_PER_STRATUM NUMBER)
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    SYSTEM_SAMPLE_MIN_ROWS NUMBER DEFAULT 100000000;
+    total_rows NUMBER;
+    strata_count NUMBER;
+    smallest_stratum NUMBER;
+    sample_method VARCHAR;
+    sample_pct FLOAT;
+BEGIN
+    SELECT SUM(STRATUM_ROWS), COUNT(*), MIN(STRATUM_ROWS)
+    INTO :total_rows, :strata_count, :smallest_stratum
+    FROM (
+        SELECT SUM(ROW_COUNT) AS STRATUM_ROWS
+        FROM BENCHMARK.PATIENT_STRATUM_RATES
+        GROUP BY TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION
+    );
+
+    IF (total_rows >= SYSTEM_SAMPLE_MIN_ROWS) THEN
+        sample_method := 'SYSTEM';
+        sample_pct := LEAST(100, ROUND(300 * ROWS_PER_STRATUM * strata_count / total_rows, 4));
+    ELSE
+        sample_method := 'BERNOULLI';
+        sample_pct := LEAST(100, ROUND(300 * ROWS_PER_STRATUM / GREATEST(smallest_stratum, 1), 4));
+    END IF;
+
+    EXECUTE IMMEDIATE '
+        INSERT OVERWRITE INTO BENCHMARK.CLINICAL_RESULTS_SAMPLE
+        (STRATUM_ID, PATIENT_ID, TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS,
+         CTDNA_CONFIRMATION, RESPONSE_CATEGORY, PFS_MONTHS, OS_MONTHS, IS_RESPONDER,
+         STRATUM_ROWS, SAMPLE_WEIGHT, SAMPLED_AT)
+        WITH strata AS (
+            SELECT TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION,
+                   SUM(ROW_COUNT) AS STRATUM_ROWS
+            FROM BENCHMARK.PATIENT_STRATUM_RATES
+            GROUP BY 1, 2, 3, 4, 5
+        ),
+        drawn AS (
+            SELECT
+                HASH(TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS, CTDNA_CONFIRMATION) AS STRATUM_ID,
+                PATIENT_ID, TRIAL_ID, TARGET_GENE, TREATMENT_ARM, BIOMARKER_STATUS,
+                CTDNA_CONFIRMATION, RESPONSE_CATEGORY, PFS_MONTHS, OS_MONTHS,
+                IFF(RESPONSE_CATEGORY IN (''Complete_Response'', ''Partial_Response''), 1, 0) AS IS_RESPONDER
+            FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M SAMPLE ' || sample_method || ' (' || sample_pct || ')
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY STRATUM_ID ORDER BY RANDOM()) <= ' || ROWS_PER_STRATUM || '
+        )
+        SELECT
+            d.*,
+            s.STRATUM_ROWS,
+            s.STRATUM_ROWS / COUNT(*) OVER (PARTITION BY d.STRATUM_ID),
+            CURRENT_TIMESTAMP()
+        FROM drawn d
+        JOIN strata s
+          ON EQUAL_NULL(d.TRIAL_ID, s.TRIAL_ID)
+         AND EQUAL_NULL(d.TARGET_GENE, s.TARGET_GENE)
+         AND EQUAL_NULL(d.TREATMENT_ARM, s.TREATMENT_ARM)
+         AND EQUAL_NULL(d.BIOMARKER_STATUS, s.BIOMARKER_STATUS)
+         AND EQUAL_NULL(d.CTDNA_CONFIRMATION, s.CTDNA_CONFIRMATION)';
+
+    RETURN 'Clinical sample refreshed from a ' || sample_pct || '% ' || sample_method || ' sample';
+END;
+$$;
+
+CALL BENCHMARK.REFRESH_CLINICAL_SAMPLE(1000);
+
+-- Redraw nightly so the sample tracks the delta-merged stratum sizes
+CREATE OR REPLACE TASK BENCHMARK.REFRESH_CLINICAL_SAMPLE_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = 'USING CRON 0 2 * * * UTC'
+AS
+    CALL BENCHMARK.REFRESH_CLINICAL_SAMPLE(1000);
+
+ALTER TASK BENCHMARK.REFRESH_CLINICAL_SAMPLE_TASK RESUME;
+
+-- ============================================================================
+-- PART 9: THRESHOLD CURVES FOR MODEL ANALYTICS
+-- ============================================================================
+
+-- ML_DEMO.MODEL_EVALUATION (sql_scripts/ml_pipeline_production.sql) holds one
+-- scored row per patient. Histogramming PROBABILITY into fixed bins keeps
+-- every curve the dashboard draws: sweeping the threshold down from 1 and
+-- cumulating positives / negatives per bin gives TP and FP at each bin edge.
+-- The page then reads ~100 rows per model version instead of 1M predictions.
+CREATE TABLE IF NOT EXISTS ML_DEMO.MODEL_EVALUATION_BINS (
+    MODEL_NAME VARCHAR NOT NULL,
+    MODEL_VERSION VARCHAR NOT NULL,
+    BIN NUMBER NOT NULL,              -- FLOOR(PROBABILITY * BINS), top edge folded into the last bin
+    PROB_LOWER FLOAT,
+    PROB_UPPER FLOAT,
+    ROW_COUNT NUMBER,
+    POSITIVES NUMBER,                 -- ACTUAL = 1
+    PROBABILITY_SUM FLOAT,            -- for mean predicted probability (calibration)
+    BUILT_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+CREATE OR REPLACE PROCEDURE ML_DEMO.BUILD_MODEL_EVALUATION_BINS(MODEL_NAME VARCHAR, MODEL_VERSION VARCHAR, BINS NUMBER)
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    DELETE FROM ML_DEMO.MODEL_EVALUATION_BINS
+    WHERE MODEL_NAME = :MODEL_NAME AND MODEL_VERSION = :MODEL_VERSION;
+
+    INSERT INTO ML_DEMO.MODEL_EVALUATION_BINS
+    (MODEL_NAME, MODEL_VERSION, BIN, PROB_LOWER, PROB_UPPER, ROW_COUNT, POSITIVES, PROBABILITY_SUM, BUILT_AT)
+    SELECT
+        :MODEL_NAME,
+        :MODEL_VERSION,
+        BIN,
+        BIN / :BINS,
+        (BIN + 1) / :BINS,
+        COUNT(*),
+        SUM(ACTUAL),
+        SUM(PROBABILITY),
+        CURRENT_TIMESTAMP()
+    FROM (
+        SELECT
+            LEAST(FLOOR(PROBABILITY * :BINS), :BINS - 1) AS BIN,
+            ACTUAL,
+            PROBABILITY
+        FROM ML_DEMO.MODEL_EVALUATION
+        WHERE PROBABILITY IS NOT NULL
+    )
+    GROUP BY BIN;
+
+    COMMIT;
+
+    RETURN 'Evaluation bins built for ' || :MODEL_NAME || ' ' || :MODEL_VERSION;
+END;
+$$;
+
+-- One row per (model version, bin); the threshold is the bin's lower edge,
+-- so each row is the operating point "predict responder when p >= THRESHOLD"
+CREATE OR REPLACE VIEW ML_DEMO.MODEL_EVALUATION_CURVES AS
+WITH totals AS (
+    SELECT MODEL_NAME, MODEL_VERSION, SUM(ROW_COUNT) AS TOTAL_ROWS, SUM(POSITIVES) AS TOTAL_POSITIVES
+    FROM ML_DEMO.MODEL_EVALUATION_BINS
+    GROUP BY MODEL_NAME, MODEL_VERSION
+),
+cumulative AS (
+    SELECT
+        b.*,
+        SUM(POSITIVES) OVER (
+            PARTITION BY MODEL_NAME, MODEL_VERSION ORDER BY BIN DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS TP,
+        SUM(ROW_COUNT - POSITIVES) OVER (
+            PARTITION BY MODEL_NAME, MODEL_VERSION ORDER BY BIN DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS FP
+    FROM ML_DEMO.MODEL_EVALUATION_BINS b
+)
+SELECT
+    c.MODEL_NAME,
+    c.MODEL_VERSION,
+    c.BIN,
+    c.PROB_LOWER AS THRESHOLD,
+    c.ROW_COUNT,
+    c.POSITIVES,
+    c.PROBABILITY_SUM,
+    c.TP,
+    c.FP,
+    t.TOTAL_POSITIVES - c.TP AS FN,
+    t.TOTAL_ROWS - t.TOTAL_POSITIVES - c.FP AS TN,
+    c.TP / NULLIF(t.TOTAL_POSITIVES, 0) AS TPR,
+    c.FP / NULLIF(t.TOTAL_ROWS - t.TOTAL_POSITIVES, 0) AS FPR,
+    c.TP / NULLIF(c.TP + c.FP, 0) AS PRECISION_AT,
+    (c.TP + c.FP) / NULLIF(t.TOTAL_ROWS, 0) AS POPULATION_SHARE,
+    (c.TP / NULLIF(c.TP + c.FP, 0)) / NULLIF(t.TOTAL_POSITIVES / t.TOTAL_ROWS, 0) AS LIFT,
+    t.TOTAL_ROWS,
+    c.BUILT_AT
+FROM cumulative c
+JOIN totals t
+  ON t.MODEL_NAME = c.MODEL_NAME
+ AND t.MODEL_VERSION = c.MODEL_VERSION;
+
+-- Rebuild after each retrain / re-run of ml_pipeline_production.sql
+CALL ML_DEMO.BUILD_MODEL_EVALUATION_BINS('CLINICAL_RESPONSE_MODEL', 'V1', 100);
+
+-- ============================================================================
+-- PART 10: KAPLAN-MEIER SURVIVAL CURVES
+-- ============================================================================
+
+-- Mean PFS / OS ignores censoring. CLINICAL_TRIAL_RESULTS_1M carries no event
+-- flags, so follow-up is censored administratively: a time beyond
+-- FOLLOW_UP_MONTHS is recorded as censored at the cutoff, anything at or
+-- before it as an event. Times are rounded to 0.1 month, so one definition
+-- (dimension + cutoff) is a few hundred rows per group however large the
+-- source is; the curves and log-rank statistics are window functions over
+-- these counts, not over patients.
+CREATE TABLE IF NOT EXISTS BENCHMARK.SURVIVAL_EVENT_COUNTS (
+    DIMENSION VARCHAR NOT NULL,       -- cohort column the groups come from (AGE_BAND = decade)
+    FOLLOW_UP_MONTHS FLOAT NOT NULL,  -- administrative censoring cutoff
+    ENDPOINT VARCHAR NOT NULL,        -- 'PFS' or 'OS'
+    GROUP_VALUE VARCHAR NOT NULL,
+    TIME_MONTHS FLOAT NOT NULL,
+    EVENTS NUMBER,
+    CENSORED NUMBER,
+    BUILT_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- One scan of the source per definition: the two GROUPING SETS count PFS and
+-- OS times side by side
+CREATE OR REPLACE PROCEDURE BENCHMARK.BUILD_SURVIVAL_COUNTS(DIMENSION VARCHAR, FOLLOW_UP_MONTHS FLOAT)
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    unsupported_dimension EXCEPTION (-20001, 'Unsupported survival dimension');
+BEGIN
+    IF (DIMENSION NOT IN ('TRIAL_ID', 'TARGET_GENE', 'TREATMENT_ARM', 'BIOMARKER_STATUS',
+                          'CTDNA_CONFIRMATION', 'COHORT', 'PATIENT_SEX', 'AGE_BAND')) THEN
+        RAISE unsupported_dimension;
+    END IF;
+
+    BEGIN TRANSACTION;
+
+    DELETE FROM BENCHMARK.SURVIVAL_EVENT_COUNTS
+    WHERE DIMENSION = :DIMENSION AND FOLLOW_UP_MONTHS = :FOLLOW_UP_MONTHS;
+
+    INSERT INTO BENCHMARK.SURVIVAL_EVENT_COUNTS
+    (DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE, TIME_MONTHS, EVENTS, CENSORED, BUILT_AT)
+    SELECT
+        :DIMENSION,
+        :FOLLOW_UP_MONTHS,
+        IFF(GROUPING(PFS_TIME) = 0, 'PFS', 'OS'),
+        GROUP_VALUE,
+        IFF(GROUPING(PFS_TIME) = 0, PFS_TIME, OS_TIME),
+        IFF(GROUPING(PFS_TIME) = 0, SUM(PFS_EVENT), SUM(OS_EVENT)),
+        IFF(GROUPING(PFS_TIME) = 0, COUNT(PFS_TIME) - SUM(PFS_EVENT), COUNT(OS_TIME) - SUM(OS_EVENT)),
+        CURRENT_TIMESTAMP()
+    FROM (
+        SELECT
+            COALESCE(CASE :DIMENSION
+                WHEN 'TRIAL_ID' THEN TRIAL_ID
+                WHEN 'TARGET_GENE' THEN TARGET_GENE
+                WHEN 'TREATMENT_ARM' THEN TREATMENT_ARM
+                WHEN 'BIOMARKER_STATUS' THEN BIOMARKER_STATUS
+                WHEN 'CTDNA_CONFIRMATION' THEN CTDNA_CONFIRMATION
+                WHEN 'COHORT' THEN COHORT
+                WHEN 'PATIENT_SEX' THEN PATIENT_SEX
+                WHEN 'AGE_BAND' THEN TO_VARCHAR(FLOOR(PATIENT_AGE / 10) * 10)
+            END, 'UNKNOWN') AS GROUP_VALUE,
+            ROUND(LEAST(PFS_MONTHS, :FOLLOW_UP_MONTHS), 1) AS PFS_TIME,
+            IFF(PFS_MONTHS <= :FOLLOW_UP_MONTHS, 1, 0) AS PFS_EVENT,
+            ROUND(LEAST(OS_MONTHS, :FOLLOW_UP_MONTHS), 1) AS OS_TIME,
+            IFF(OS_MONTHS <= :FOLLOW_UP_MONTHS, 1, 0) AS OS_EVENT
+        FROM BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
+    )
+    GROUP BY GROUPING SETS ((GROUP_VALUE, PFS_TIME), (GROUP_VALUE, OS_TIME))
+    HAVING IFF(GROUPING(PFS_TIME) = 0, PFS_TIME, OS_TIME) IS NOT NULL;
+
+    COMMIT;
+
+    RETURN 'Survival counts built for ' || :DIMENSION || ' with ' || :FOLLOW_UP_MONTHS || ' months follow-up';
+END;
+$$;
+
+-- Rebuild every definition the dashboard has asked for
+CREATE OR REPLACE PROCEDURE BENCHMARK.REFRESH_SURVIVAL_COUNTS()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    definitions CURSOR FOR
+        SELECT DISTINCT DIMENSION, FOLLOW_UP_MONTHS FROM BENCHMARK.SURVIVAL_EVENT_COUNTS;
+    rebuilt NUMBER DEFAULT 0;
+BEGIN
+    FOR definition IN definitions DO
+        LET dimension VARCHAR := definition.DIMENSION;
+        LET follow_up FLOAT := definition.FOLLOW_UP_MONTHS;
+        CALL BENCHMARK.BUILD_SURVIVAL_COUNTS(:dimension, :follow_up);
+        rebuilt := rebuilt + 1;
+    END FOR;
+    RETURN rebuilt || ' survival definitions rebuilt';
+END;
+$$;
+
+-- Product-limit estimate per group: S(t) = PRODUCT(1 - EVENTS / AT_RISK),
+-- accumulated as a running sum of logs, with Greenwood's standard error.
+-- Only times with events (the steps) and each group's last time are kept.
+CREATE OR REPLACE VIEW BENCHMARK.SURVIVAL_CURVES AS
+WITH at_risk AS (
+    SELECT
+        c.*,
+        SUM(EVENTS + CENSORED) OVER (
+            PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE ORDER BY TIME_MONTHS DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS AT_RISK
+    FROM BENCHMARK.SURVIVAL_EVENT_COUNTS c
+),
+product_limit AS (
+    SELECT
+        a.*,
+        -- A time where everyone still at risk has the event takes S to 0 for good
+        MAX(IFF(EVENTS = AT_RISK, 1, 0)) OVER (
+            PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE ORDER BY TIME_MONTHS
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS EXHAUSTED,
+        SUM(IFF(EVENTS < AT_RISK, LN(1 - EVENTS / AT_RISK), 0)) OVER (
+            PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE ORDER BY TIME_MONTHS
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS LOG_SURVIVAL,
+        SUM(IFF(EVENTS < AT_RISK, EVENTS / (AT_RISK * (AT_RISK - EVENTS)), 0)) OVER (
+            PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE ORDER BY TIME_MONTHS
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS GREENWOOD_SUM,
+        MAX(TIME_MONTHS) OVER (PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE) AS LAST_TIME
+    FROM at_risk a
+)
+SELECT
+    DIMENSION,
+    FOLLOW_UP_MONTHS,
+    ENDPOINT,
+    GROUP_VALUE,
+    TIME_MONTHS,
+    AT_RISK,
+    EVENTS,
+    CENSORED,
+    IFF(EXHAUSTED = 1, 0, EXP(LOG_SURVIVAL)) AS SURVIVAL,
+    IFF(EXHAUSTED = 1, 0, EXP(LOG_SURVIVAL) * SQRT(GREENWOOD_SUM)) AS STD_ERR,
+    BUILT_AT
+FROM product_limit
+WHERE EVENTS > 0 OR TIME_MONTHS = LAST_TIME;
+
+-- Log-rank inputs per group: observed and expected events, and the row of the
+-- covariance matrix of (observed - expected) against every other group. The
+-- dashboard solves the (groups - 1) x (groups - 1) system for the chi-square.
+-- Groups are expanded onto the definition's full time grid so every group has
+-- an at-risk count at every event time.
+CREATE OR REPLACE VIEW BENCHMARK.SURVIVAL_LOGRANK AS
+WITH times AS (
+    SELECT DISTINCT DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, TIME_MONTHS
+    FROM BENCHMARK.SURVIVAL_EVENT_COUNTS
+),
+groups AS (
+    SELECT DISTINCT DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE
+    FROM BENCHMARK.SURVIVAL_EVENT_COUNTS
+),
+grid AS (
+    SELECT
+        t.DIMENSION, t.FOLLOW_UP_MONTHS, t.ENDPOINT, g.GROUP_VALUE, t.TIME_MONTHS,
+        COALESCE(c.EVENTS, 0) AS EVENTS,
+        COALESCE(c.EVENTS + c.CENSORED, 0) AS LEAVING
+    FROM times t
+    JOIN groups g
+      ON g.DIMENSION = t.DIMENSION
+     AND g.FOLLOW_UP_MONTHS = t.FOLLOW_UP_MONTHS
+     AND g.ENDPOINT = t.ENDPOINT
+    LEFT JOIN BENCHMARK.SURVIVAL_EVENT_COUNTS c
+      ON c.DIMENSION = t.DIMENSION
+     AND c.FOLLOW_UP_MONTHS = t.FOLLOW_UP_MONTHS
+     AND c.ENDPOINT = t.ENDPOINT
+     AND c.GROUP_VALUE = g.GROUP_VALUE
+     AND c.TIME_MONTHS = t.TIME_MONTHS
+),
+at_risk AS (
+    SELECT
+        grid.*,
+        SUM(LEAVING) OVER (
+            PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE ORDER BY TIME_MONTHS DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS AT_RISK
+    FROM grid
+),
+pooled AS (
+    SELECT
+        a.*,
+        SUM(AT_RISK) OVER (PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, TIME_MONTHS) AS TOTAL_AT_RISK,
+        SUM(EVENTS) OVER (PARTITION BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, TIME_MONTHS) AS TOTAL_EVENTS
+    FROM at_risk a
+),
+event_times AS (
+    SELECT
+        p.*,
+        -- hypergeometric variance factor d (n - d) / (n^2 (n - 1))
+        TOTAL_EVENTS * (TOTAL_AT_RISK - TOTAL_EVENTS)
+            / (TOTAL_AT_RISK * TOTAL_AT_RISK * (TOTAL_AT_RISK - 1)) AS VARIANCE_FACTOR
+    FROM pooled p
+    WHERE TOTAL_EVENTS > 0 AND TOTAL_AT_RISK > 1
+),
+expected AS (
+    SELECT
+        DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE,
+        SUM(EVENTS) AS OBSERVED,
+        SUM(AT_RISK * TOTAL_EVENTS / TOTAL_AT_RISK) AS EXPECTED
+    FROM event_times
+    GROUP BY DIMENSION, FOLLOW_UP_MONTHS, ENDPOINT, GROUP_VALUE
+),
+covariance AS (
+    SELECT
+        a.DIMENSION, a.FOLLOW_UP_MONTHS, a.ENDPOINT,
+        a.GROUP_VALUE,
+        b.GROUP_VALUE AS OTHER_GROUP,
+        SUM(a.VARIANCE_FACTOR * a.AT_RISK
+            * (IFF(a.GROUP_VALUE = b.GROUP_VALUE, a.TOTAL_AT_RISK, 0) - b.AT_RISK)) AS COVARIANCE
+    FROM event_times a
+    JOIN event_times b
+      ON b.DIMENSION = a.DIMENSION
+     AND b.FOLLOW_UP_MONTHS = a.FOLLOW_UP_MONTHS
+     AND b.ENDPOINT = a.ENDPOINT
+     AND b.TIME_MONTHS = a.TIME_MONTHS
+    GROUP BY a.DIMENSION, a.FOLLOW_UP_MONTHS, a.ENDPOINT, a.GROUP_VALUE, b.GROUP_VALUE
+)
+SELECT
+    v.DIMENSION,
+    v.FOLLOW_UP_MONTHS,
+    v.ENDPOINT,
+    v.GROUP_VALUE,
+    v.OTHER_GROUP,
+    e.OBSERVED,
+    e.EXPECTED,
+    v.COVARIANCE
+FROM covariance v
+JOIN expected e
+  ON e.DIMENSION = v.DIMENSION
+ AND e.FOLLOW_UP_MONTHS = v.FOLLOW_UP_MONTHS
+ AND e.ENDPOINT = v.ENDPOINT
+ AND e.GROUP_VALUE = v.GROUP_VALUE;
+
+-- The Cohort Analysis page's default definitions; others are built on first use
+CALL BENCHMARK.BUILD_SURVIVAL_COUNTS('TREATMENT_ARM', 24);
+CALL BENCHMARK.BUILD_SURVIVAL_COUNTS('TARGET_GENE', 24);
+
+-- Nightly, after the clinical sample redraw
+CREATE OR REPLACE TASK BENCHMARK.REFRESH_SURVIVAL_COUNTS_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = 'USING CRON 30 2 * * * UTC'
+AS
+    CALL BENCHMARK.REFRESH_SURVIVAL_COUNTS();
+
+ALTER TASK BENCHMARK.REFRESH_SURVIVAL_COUNTS_TASK RESUME;
+
+-- ============================================================================
+-- PART 11: CORTEX RESPONSE CACHE
+-- ============================================================================
+
+-- COMPLETE calls from all three Streamlit apps go through this table first.
+-- An entry is keyed on the model, a SHA-256 of the prompt, the COMPLETE
+-- options (canonical JSON) and DATA_VERSION - the LAST_ALTERED of the table
+-- the prompt summarises, or '' for prompts that carry their own text - so a
+-- data reload is a new key and a stale answer is never served. Apps count
+-- hits in memory and add them to HIT_COUNT in batches, so the counts (rolled
+-- up by CORTEX_CACHE_STATS) trail live traffic by up to one batch.
+CREATE TABLE IF NOT EXISTS BENCHMARK.CORTEX_RESPONSE_CACHE (
+    MODEL VARCHAR NOT NULL,
+    PROMPT_HASH VARCHAR NOT NULL,     -- SHA-256 hex of the prompt text
+    PARAMS VARCHAR NOT NULL,          -- COMPLETE options as sorted JSON, '{}' for none
+    DATA_VERSION VARCHAR NOT NULL,
+    RESPONSE VARCHAR,
+    APP VARCHAR,
+    SECTION VARCHAR,
+    GENERATION_MS FLOAT,              -- client time of the COMPLETE call that filled the entry
+    CREATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    EXPIRES_AT TIMESTAMP_NTZ,
+    HIT_COUNT NUMBER DEFAULT 0,
+    MISS_COUNT NUMBER DEFAULT 0,      -- COMPLETE calls made for this key (first fill and refills after expiry)
+    LAST_HIT_AT TIMESTAMP_NTZ
+);
+
+-- Hit rate per app section and model
+CREATE OR REPLACE VIEW BENCHMARK.CORTEX_CACHE_STATS AS
+SELECT
+    APP,
+    SECTION,
+    MODEL,
+    COUNT(*) AS ENTRIES,
+    SUM(IFF(EXPIRES_AT > CURRENT_TIMESTAMP(), 1, 0)) AS LIVE_ENTRIES,
+    SUM(HIT_COUNT) AS HITS,
+    SUM(MISS_COUNT) AS MISSES,
+    ROUND(SUM(HIT_COUNT) * 100 / NULLIF(SUM(HIT_COUNT + MISS_COUNT), 0), 1) AS HIT_RATE_PCT,
+    ROUND(AVG(GENERATION_MS)) AS AVG_GENERATION_MS,
+    ROUND(SUM(HIT_COUNT * GENERATION_MS) / 1000) AS GENERATION_SECONDS_SAVED,
+    MAX(LAST_HIT_AT) AS LAST_HIT_AT
+FROM BENCHMARK.CORTEX_RESPONSE_CACHE
+GROUP BY APP, SECTION, MODEL;
+
+-- Entries expired for a week are only history; drop them nightly
+CREATE OR REPLACE TASK BENCHMARK.PURGE_CORTEX_RESPONSE_CACHE_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = 'USING CRON 0 3 * * * UTC'
+AS
+    DELETE FROM BENCHMARK.CORTEX_RESPONSE_CACHE
+    WHERE EXPIRES_AT < DATEADD('day', -7, CURRENT_TIMESTAMP());
+
+ALTER TASK BENCHMARK.PURGE_CORTEX_RESPONSE_CACHE_TASK RESUME;
+
+-- Invalidate by hand, e.g. after a prompt or model change:
+-- DELETE FROM BENCHMARK.CORTEX_RESPONSE_CACHE WHERE APP = 'LIFEARC_ML_DASHBOARD';
+
+-- ============================================================================
+-- PART 12: CORTEX ANALYST SQL CACHE
+-- ============================================================================
+
+-- The intelligence demo's Ask Any Question sends text-to-SQL requests to
+-- Cortex Analyst over AI_DEMO.DRUG_DISCOVERY_SEMANTIC_VIEW. SQL that ran
+-- successfully is kept here under a SHA-256 of the semantic view and the
+-- normalized question (lower case, punctuation, filler words and plural 's'
+-- dropped), so a repeated or reworded question skips generation. The SQL
+-- reads live tables, so entries do not depend on the data version.
+CREATE TABLE IF NOT EXISTS BENCHMARK.ANALYST_SQL_CACHE (
+    SEMANTIC_VIEW VARCHAR NOT NULL,
+    QUESTION_HASH VARCHAR NOT NULL,   -- SHA-256 hex of semantic view + normalized question
+    NORMALIZED_QUESTION VARCHAR,
+    QUESTION VARCHAR,                 -- wording that filled the entry
+    SQL_TEXT VARCHAR NOT NULL,
+    INTERPRETATION VARCHAR,           -- Analyst's restatement of the question
+    GENERATION_MS FLOAT,              -- client time of the Analyst request
+    CREATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    HIT_COUNT NUMBER DEFAULT 0,
+    LAST_HIT_AT TIMESTAMP_NTZ
+);
+
+-- An entry whose SQL fails is deleted by the app and the question is sent to
+-- the Analyst again. Recreating the semantic view can also change SQL that
+-- still runs; clear its entries after running create_semantic_view.sql:
+-- DELETE FROM BENCHMARK.ANALYST_SQL_CACHE
+-- WHERE SEMANTIC_VIEW = 'LIFEARC_POC.AI_DEMO.DRUG_DISCOVERY_SEMANTIC_VIEW';
+
+-- ============================================================================
+-- SUMMARY: Objects Created
+-- ============================================================================
+
+/*
+BENCHMARK schema:
+├── DASHBOARD_RESPONSE_CUBE (Table) - Counts, responder and PFS/OS sums per grouping set
+├── DASHBOARD_PATIENT_ROWS (Table) - Row count per patient (exact distinct patients)
+├── PATIENT_STRATUM_RATES (Table) - Rows, response rows and responders per trial/gene/arm/biomarker/ctDNA/cohort/sex/age band
+├── CLINICAL_RESULTS_DASHBOARD_STREAM (Stream) - Changes to CLINICAL_TRIAL_RESULTS_1M
+├── REFRESH_DASHBOARD_CUBE (Procedure) - One GROUPING SETS scan of CLINICAL_TRIAL_RESULTS_1M
+├── APPLY_DASHBOARD_CUBE_DELTA (Procedure) - Signed MERGE of the stream delta
+├── REFRESH_DASHBOARD_CUBE_TASK (Task) - Every 5 minutes when the stream has data
+├── APP_QUERY_LOG (Table) - Per-query app/page/section, client time, rows and bytes
+├── CLINICAL_RESULTS_SAMPLE (Table) - 1,000 rows per trial/gene/arm/biomarker/ctDNA stratum
+├── REFRESH_CLINICAL_SAMPLE (Procedure) - BERNOULLI, or SYSTEM at 100M+ rows, capped per stratum
+├── REFRESH_CLINICAL_SAMPLE_TASK (Task) - Nightly at 02:00 UTC
+├── SURVIVAL_EVENT_COUNTS (Table) - Events / censorings per dimension, cutoff, endpoint, group and time
+├── BUILD_SURVIVAL_COUNTS (Procedure) - GROUPING SETS scan for PFS and OS in one pass
+├── REFRESH_SURVIVAL_COUNTS (Procedure) - Rebuilds every stored definition
+├── REFRESH_SURVIVAL_COUNTS_TASK (Task) - Nightly at 02:30 UTC
+├── SURVIVAL_CURVES (View) - Kaplan-Meier S(t) and Greenwood SE at each event time
+├── SURVIVAL_LOGRANK (View) - Observed, expected and covariance per group pair
+├── CORTEX_RESPONSE_CACHE (Table) - COMPLETE answers by model, prompt hash, options and data version
+├── CORTEX_CACHE_STATS (View) - Entries, hits, misses and hit rate per app section
+├── PURGE_CORTEX_RESPONSE_CACHE_TASK (Task) - Nightly at 03:00 UTC
+└── ANALYST_SQL_CACHE (Table) - Cortex Analyst SQL by semantic view and normalized question
+
+ML_DEMO schema:
+├── RESPONSE_SURFACE (Table) - Class and probabilities for all 131,400 form profiles
+├── BUILD_RESPONSE_SURFACE (Procedure) - Scores the grid for one model version
+├── MODEL_EVALUATION_BINS (Table) - Rows, positives and probability sum per probability bin
+├── BUILD_MODEL_EVALUATION_BINS (Procedure) - Histograms MODEL_EVALUATION for one model version
+└── MODEL_EVALUATION_CURVES (View) - Cumulative TP/FP, TPR, FPR, precision and lift per threshold
+
+Run REFRESH_DASHBOARD_CUBE() after bulk reloads or schema changes; the task
+keeps the cube current between rebuilds.
+*/
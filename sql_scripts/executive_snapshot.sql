@@ -0,0 +1,172 @@
+/*
+================================================================================
+LifeArc POC - Executive Dashboard Snapshot
+================================================================================
+Everything the intelligence demo's Executive Dashboard shows, materialized as
+one row: the four KPIs plus the drug-likeness, program ROI and board priority
+tables as arrays of objects. The page reads the latest row with a single
+query instead of a KPI statement and three table queries against
+COMPOUND_PIPELINE_ANALYSIS, CLINICAL_TRIAL_PERFORMANCE, PROGRAM_ROI_SUMMARY and
+BOARD_CANDIDATE_SCORECARD on every render.
+
+OBJECTS:
+- AI_DEMO.EXECUTIVE_SNAPSHOT (Table) - One versioned row per build of the dashboard
+- AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT (Procedure) - Builds a new snapshot when a source table changed
+- AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT_TASK (Task) - Runs the build every 15 minutes
+
+Snapshots are versioned by SOURCE_VERSION, the latest LAST_ALTERED of the four
+source tables: a build with no source change adds nothing. The last 24
+snapshots are kept so a board pack can be traced to the numbers it showed.
+================================================================================
+*/
+
+USE DATABASE LIFEARC_POC;
+USE WAREHOUSE COMPUTE_WH;
+
+-- ============================================================================
+-- PART 1: SNAPSHOT TABLE
+-- ============================================================================
+
+-- Table columns are VARIANT arrays of objects, one object per dashboard row.
+-- OBJECT_CONSTRUCT does not keep key order, so the app orders the columns.
+CREATE TABLE IF NOT EXISTS AI_DEMO.EXECUTIVE_SNAPSHOT (
+    SNAPSHOT_ID NUMBER AUTOINCREMENT,
+    SOURCE_VERSION VARCHAR NOT NULL,  -- latest LAST_ALTERED of the source tables
+    BUILT_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    TOTAL_COMPOUNDS NUMBER,
+    ACTIVE_TRIALS NUMBER,
+    TOTAL_INVESTMENT NUMBER,          -- millions, rounded
+    AVG_ROI NUMBER(10, 1),
+    DRUG_LIKENESS VARIANT,            -- THERAPEUTIC_AREA, DRUG_LIKENESS, COUNT
+    PROGRAM_ROI VARIANT,              -- PROGRAM_NAME, THERAPEUTIC_AREA, ROI_MULTIPLE, RECOMMENDATION
+    BOARD_PRIORITIES VARIANT          -- Priority 1-3 rows of BOARD_CANDIDATE_SCORECARD
+);
+
+-- ============================================================================
+-- PART 2: SNAPSHOT BUILD
+-- ============================================================================
+
+-- Same queries the page used to run live; each source table is read once
+CREATE OR REPLACE PROCEDURE AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    source_version VARCHAR;
+    latest_version VARCHAR;
+BEGIN
+    SELECT TO_VARCHAR(MAX(LAST_ALTERED)) INTO :source_version
+    FROM LIFEARC_POC.INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_SCHEMA = 'AI_DEMO'
+      AND TABLE_NAME IN ('COMPOUND_PIPELINE_ANALYSIS', 'CLINICAL_TRIAL_PERFORMANCE',
+                         'PROGRAM_ROI_SUMMARY', 'BOARD_CANDIDATE_SCORECARD');
+
+    SELECT MAX_BY(SOURCE_VERSION, SNAPSHOT_ID) INTO :latest_version
+    FROM AI_DEMO.EXECUTIVE_SNAPSHOT;
+
+    IF (latest_version = source_version) THEN
+        RETURN 'Executive snapshot unchanged';
+    END IF;
+
+    BEGIN TRANSACTION;
+
+    INSERT INTO AI_DEMO.EXECUTIVE_SNAPSHOT
+        (SOURCE_VERSION, BUILT_AT, TOTAL_COMPOUNDS, ACTIVE_TRIALS, TOTAL_INVESTMENT, AVG_ROI,
+         DRUG_LIKENESS, PROGRAM_ROI, BOARD_PRIORITIES)
+    WITH drug_likeness AS (
+        SELECT therapeutic_area, drug_likeness, COUNT(*) AS COMPOUNDS
+        FROM AI_DEMO.COMPOUND_PIPELINE_ANALYSIS
+        GROUP BY therapeutic_area, drug_likeness
+    ),
+    compounds AS (
+        SELECT
+            COALESCE(SUM(COMPOUNDS), 0) AS TOTAL_COMPOUNDS,
+            ARRAY_AGG(OBJECT_CONSTRUCT(
+                'THERAPEUTIC_AREA', therapeutic_area, 'DRUG_LIKENESS', drug_likeness, 'COUNT', COMPOUNDS
+            )) WITHIN GROUP (ORDER BY therapeutic_area, drug_likeness) AS DRUG_LIKENESS
+        FROM drug_likeness
+    ),
+    trials AS (
+        SELECT COUNT_IF(status = 'Active') AS ACTIVE_TRIALS
+        FROM AI_DEMO.CLINICAL_TRIAL_PERFORMANCE
+    ),
+    programs AS (
+        SELECT
+            ROUND(SUM(total_investment_millions), 0) AS TOTAL_INVESTMENT,
+            ROUND(AVG(roi_multiple), 1) AS AVG_ROI,
+            ARRAY_AGG(OBJECT_CONSTRUCT(
+                'PROGRAM_NAME', program_name, 'THERAPEUTIC_AREA', therapeutic_area,
+                'ROI_MULTIPLE', roi_multiple, 'RECOMMENDATION', recommendation
+            )) WITHIN GROUP (ORDER BY roi_multiple DESC) AS PROGRAM_ROI
+        FROM AI_DEMO.PROGRAM_ROI_SUMMARY
+    ),
+    priorities AS (
+        SELECT ARRAY_AGG(OBJECT_CONSTRUCT(
+            'BOARD_RECOMMENDATION', board_recommendation, 'COMPOUND_NAME', compound_name,
+            'TARGET_GENE', target_gene, 'PREDICTED_SUCCESS_PCT', predicted_success_pct,
+            'COMPETITIVE_POSITION', competitive_position, 'PEAK_SALES_MILLIONS', peak_sales_millions,
+            'INVESTMENT_REQUIRED_MILLIONS', investment_required_millions
+        )) WITHIN GROUP (ORDER BY board_recommendation) AS BOARD_PRIORITIES
+        FROM AI_DEMO.BOARD_CANDIDATE_SCORECARD
+        WHERE board_recommendation IN ('Priority 1', 'Priority 2', 'Priority 3')
+    )
+    SELECT
+        :source_version, CURRENT_TIMESTAMP(),
+        c.TOTAL_COMPOUNDS, t.ACTIVE_TRIALS, p.TOTAL_INVESTMENT, p.AVG_ROI,
+        c.DRUG_LIKENESS, p.PROGRAM_ROI, b.BOARD_PRIORITIES
+    FROM compounds c, trials t, programs p, priorities b;
+
+    DELETE FROM AI_DEMO.EXECUTIVE_SNAPSHOT
+    WHERE SNAPSHOT_ID NOT IN (
+        SELECT SNAPSHOT_ID FROM AI_DEMO.EXECUTIVE_SNAPSHOT
+        ORDER BY SNAPSHOT_ID DESC
+        LIMIT 24
+    );
+
+    COMMIT;
+    RETURN 'Executive snapshot built for ' || source_version;
+END;
+$$;
+
+CALL AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT();
+
+-- Cheap when nothing changed: one metadata query and one MAX_BY
+CREATE OR REPLACE TASK AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = '15 MINUTE'
+AS
+    CALL AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT();
+
+ALTER TASK AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT_TASK RESUME;
+
+-- ============================================================================
+-- PART 3: VERIFICATION
+-- ============================================================================
+
+-- The row the Executive Dashboard reads
+SELECT *
+FROM AI_DEMO.EXECUTIVE_SNAPSHOT
+ORDER BY SNAPSHOT_ID DESC
+LIMIT 1;
+
+-- Snapshot history
+SELECT SNAPSHOT_ID, SOURCE_VERSION, BUILT_AT, TOTAL_COMPOUNDS, ACTIVE_TRIALS,
+       TOTAL_INVESTMENT, AVG_ROI, ARRAY_SIZE(BOARD_PRIORITIES) AS PRIORITIES
+FROM AI_DEMO.EXECUTIVE_SNAPSHOT
+ORDER BY SNAPSHOT_ID DESC;
+
+-- ============================================================================
+-- SUMMARY: Objects Created
+-- ============================================================================
+
+/*
+AI_DEMO schema:
+├── EXECUTIVE_SNAPSHOT (Table) - KPIs and dashboard tables, one row per source version
+├── BUILD_EXECUTIVE_SNAPSHOT (Procedure) - New snapshot only when a source table changed
+└── BUILD_EXECUTIVE_SNAPSHOT_TASK (Task) - Every 15 minutes
+
+The dashboard caches the latest snapshot for 5 minutes, so a source change
+reaches it within about 20 minutes. CALL BUILD_EXECUTIVE_SNAPSHOT() after a
+manual data load to pick it up at once.
+*/
@@ -0,0 +1,190 @@
+/*
+================================================================================
+LifeArc POC - Research Document Embeddings
+================================================================================
+Chunk-level EMBED_TEXT_768 vectors for semantic search in the intelligence
+demo (Research Intelligence, semantic mode) and the unstructured data demo
+(Cortex Search). Each chunk is embedded once; re-running the pipeline only
+embeds chunks that are new or whose text changed.
+
+OBJECTS:
+- AI_DEMO.RESEARCH_CHUNKS (View) - Research text split into overlapping chunks
+- AI_DEMO.RESEARCH_EMBEDDINGS (Table) - One VECTOR(FLOAT, 768) per chunk
+- AI_DEMO.EMBED_RESEARCH_CHUNKS (Procedure) - Embeds new / changed chunks, drops stale ones
+- AI_DEMO.EMBED_RESEARCH_CHUNKS_TASK (Task) - Hourly incremental run
+- AI_DEMO.RESEARCH_RERANK_CACHE (Table) - LLM relevance scores per (query, document chunk)
+
+Sources: AI_DEMO.RESEARCH_INTELLIGENCE (title, key finding and full text) and
+UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS (title and content). Every chunk is
+prefixed with its document title so short chunks keep their context.
+
+The apps embed the query with the same model and rank chunks by cosine
+similarity: in process over a snapshot of this table when it is small enough
+to hold in memory, otherwise with VECTOR_COSINE_SIMILARITY here.
+================================================================================
+*/
+
+USE DATABASE LIFEARC_POC;
+USE WAREHOUSE COMPUTE_WH;
+
+-- ============================================================================
+-- PART 1: CHUNKS
+-- ============================================================================
+
+-- 1,500-character chunks with 200 characters of overlap, split on paragraph,
+-- line and sentence boundaries first
+CREATE OR REPLACE VIEW AI_DEMO.RESEARCH_CHUNKS AS
+WITH documents AS (
+    SELECT
+        'RESEARCH_INTELLIGENCE' AS SOURCE_TABLE,
+        DOC_ID,
+        DOC_TITLE AS TITLE,
+        COALESCE(KEY_FINDING, '') || '\n\n' || COALESCE(FULL_TEXT, '') AS BODY
+    FROM AI_DEMO.RESEARCH_INTELLIGENCE
+    UNION ALL
+    SELECT 'RESEARCH_DOCUMENTS', DOC_ID, TITLE, COALESCE(CONTENT, '')
+    FROM UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS
+)
+SELECT
+    d.SOURCE_TABLE,
+    d.DOC_ID,
+    c.INDEX AS CHUNK_INDEX,
+    d.TITLE || ': ' || c.VALUE::VARCHAR AS CHUNK_TEXT,
+    SHA2(d.TITLE || ': ' || c.VALUE::VARCHAR) AS CONTENT_HASH
+FROM documents d,
+    LATERAL FLATTEN(SNOWFLAKE.CORTEX.SPLIT_TEXT_RECURSIVE_CHARACTER(d.BODY, 'none', 1500, 200)) c;
+
+-- ============================================================================
+-- PART 2: EMBEDDINGS
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS AI_DEMO.RESEARCH_EMBEDDINGS (
+    SOURCE_TABLE VARCHAR NOT NULL,    -- RESEARCH_INTELLIGENCE or RESEARCH_DOCUMENTS
+    DOC_ID VARCHAR NOT NULL,
+    CHUNK_INDEX NUMBER NOT NULL,
+    CHUNK_TEXT VARCHAR,
+    CONTENT_HASH VARCHAR NOT NULL,    -- SHA-256 of CHUNK_TEXT; a change re-embeds the chunk
+    EMBED_MODEL VARCHAR NOT NULL,
+    EMBEDDING VECTOR(FLOAT, 768),
+    EMBEDDED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+CLUSTER BY (SOURCE_TABLE);
+
+-- Chunks are materialized once per run so SPLIT_TEXT_RECURSIVE_CHARACTER is
+-- not evaluated twice. Stale rows (document gone, text changed or embedded
+-- with another model) are deleted, then only chunks without a row are
+-- embedded.
+CREATE OR REPLACE PROCEDURE AI_DEMO.EMBED_RESEARCH_CHUNKS()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    embed_model VARCHAR DEFAULT 'snowflake-arctic-embed-m-v1.5';
+    embedded INTEGER;
+BEGIN
+    CREATE OR REPLACE TEMPORARY TABLE AI_DEMO.RESEARCH_CHUNKS_RUN AS
+    SELECT * FROM AI_DEMO.RESEARCH_CHUNKS;
+
+    BEGIN TRANSACTION;
+
+    DELETE FROM AI_DEMO.RESEARCH_EMBEDDINGS e
+    WHERE e.EMBED_MODEL <> :embed_model
+       OR NOT EXISTS (
+            SELECT 1 FROM AI_DEMO.RESEARCH_CHUNKS_RUN c
+            WHERE c.SOURCE_TABLE = e.SOURCE_TABLE
+              AND c.DOC_ID = e.DOC_ID
+              AND c.CHUNK_INDEX = e.CHUNK_INDEX
+              AND c.CONTENT_HASH = e.CONTENT_HASH
+        );
+
+    INSERT INTO AI_DEMO.RESEARCH_EMBEDDINGS
+        (SOURCE_TABLE, DOC_ID, CHUNK_INDEX, CHUNK_TEXT, CONTENT_HASH, EMBED_MODEL, EMBEDDING, EMBEDDED_AT)
+    SELECT
+        c.SOURCE_TABLE, c.DOC_ID, c.CHUNK_INDEX, c.CHUNK_TEXT, c.CONTENT_HASH, :embed_model,
+        SNOWFLAKE.CORTEX.EMBED_TEXT_768(:embed_model, c.CHUNK_TEXT), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_CHUNKS_RUN c
+    WHERE NOT EXISTS (
+        SELECT 1 FROM AI_DEMO.RESEARCH_EMBEDDINGS e
+        WHERE e.SOURCE_TABLE = c.SOURCE_TABLE
+          AND e.DOC_ID = c.DOC_ID
+          AND e.CHUNK_INDEX = c.CHUNK_INDEX
+    );
+    embedded := SQLROWCOUNT;
+
+    COMMIT;
+    RETURN 'Embedded ' || embedded || ' chunks';
+END;
+$$;
+
+CALL AI_DEMO.EMBED_RESEARCH_CHUNKS();
+
+-- A run with no new or changed documents embeds nothing
+CREATE OR REPLACE TASK AI_DEMO.EMBED_RESEARCH_CHUNKS_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = '60 MINUTE'
+AS
+    CALL AI_DEMO.EMBED_RESEARCH_CHUNKS();
+
+ALTER TASK AI_DEMO.EMBED_RESEARCH_CHUNKS_TASK RESUME;
+
+-- ============================================================================
+-- PART 3: RERANK SCORE CACHE
+-- ============================================================================
+
+-- The unstructured demo's semantic search can rerank its top vector
+-- candidates with one COMPLETE relevance score each (0-10). Scores are kept
+-- per model, normalized query (SHA-256) and chunk, so a repeated search only
+-- scores candidates it has not seen. CONTENT_HASH matches
+-- RESEARCH_EMBEDDINGS.CONTENT_HASH: a re-embedded chunk is scored afresh.
+CREATE TABLE IF NOT EXISTS AI_DEMO.RESEARCH_RERANK_CACHE (
+    MODEL VARCHAR NOT NULL,
+    QUERY_HASH VARCHAR NOT NULL,      -- SHA-256 hex of the lower-cased, whitespace-collapsed query
+    QUERY_TEXT VARCHAR,
+    SOURCE_TABLE VARCHAR NOT NULL,
+    DOC_ID VARCHAR NOT NULL,
+    CONTENT_HASH VARCHAR NOT NULL,
+    SCORE FLOAT,                      -- parsed 0-10 relevance; NULL when the reply had no number
+    CREATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+    HIT_COUNT NUMBER DEFAULT 0
+);
+
+-- ============================================================================
+-- PART 4: VERIFICATION
+-- ============================================================================
+
+-- Chunks per source and model
+SELECT SOURCE_TABLE, EMBED_MODEL, COUNT(*) AS CHUNKS, COUNT(DISTINCT DOC_ID) AS DOCUMENTS
+FROM AI_DEMO.RESEARCH_EMBEDDINGS
+GROUP BY SOURCE_TABLE, EMBED_MODEL;
+
+-- Warehouse-side top-k: the best chunk per document, as the apps run it for
+-- corpora too large to search in process
+SELECT
+    DOC_ID,
+    CHUNK_TEXT,
+    VECTOR_COSINE_SIMILARITY(
+        EMBEDDING,
+        SNOWFLAKE.CORTEX.EMBED_TEXT_768('snowflake-arctic-embed-m-v1.5', 'DNA repair pathway inhibitors')
+    ) AS SIMILARITY
+FROM AI_DEMO.RESEARCH_EMBEDDINGS
+WHERE SOURCE_TABLE = 'RESEARCH_DOCUMENTS'
+QUALIFY ROW_NUMBER() OVER (PARTITION BY DOC_ID ORDER BY SIMILARITY DESC) = 1
+ORDER BY SIMILARITY DESC
+LIMIT 5;
+
+-- ============================================================================
+-- SUMMARY: Objects Created
+-- ============================================================================
+
+/*
+AI_DEMO schema:
+├── RESEARCH_CHUNKS (View) - Title-prefixed chunks of both research sources
+├── RESEARCH_EMBEDDINGS (Table) - EMBED_TEXT_768 vector per chunk, with content hash and model
+├── EMBED_RESEARCH_CHUNKS (Procedure) - Incremental: embeds new / changed chunks only
+├── EMBED_RESEARCH_CHUNKS_TASK (Task) - Hourly
+└── RESEARCH_RERANK_CACHE (Table) - Cached LLM rerank scores by model, query and chunk
+
+Changing the embedding model in EMBED_RESEARCH_CHUNKS re-embeds every chunk
+on the next run; update EMBED_MODEL in both apps at the same time.
+*/
@@ -0,0 +1,214 @@
+/*
+================================================================================
+LifeArc POC - Research Intelligence Keyword Index
+================================================================================
+Inverted index over AI_DEMO.RESEARCH_INTELLIGENCE for the intelligence demo's
+Research Intelligence search (streamlit_apps/intelligence_demo.py). Searches
+read only the postings of the query terms, ranked with BM25, instead of
+scanning every document body with LOWER(...) LIKE '%q%'.
+
+OBJECTS:
+- AI_DEMO.RESEARCH_TERM_INDEX (Table) - Term -> document postings with term frequency and positions
+- AI_DEMO.RESEARCH_DOC_STATS (Table) - Indexed length (terms) per document
+- AI_DEMO.RESEARCH_CORPUS_STATS (Table) - Document count and average length for BM25
+- AI_DEMO.TOKENIZE_RESEARCH_DOC (Function) - Shared tokenizer: lower case, split on non-alphanumerics
+- AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM (Stream) - Documents added, changed or removed
+- AI_DEMO.REBUILD_RESEARCH_INDEX (Procedure) - Full rebuild from RESEARCH_INTELLIGENCE
+- AI_DEMO.APPLY_RESEARCH_INDEX_DELTA (Procedure) - Re-indexes only the documents in the stream
+- AI_DEMO.APPLY_RESEARCH_INDEX_DELTA_TASK (Task) - Runs the delta when documents land
+
+Indexed text is DOC_TITLE, TARGET_GENE, KEY_FINDING and FULL_TEXT, in that
+order, as one token sequence. Positions are 1-based token offsets, so a
+phrase matches where its k-th word sits at its first word's position + k.
+================================================================================
+*/
+
+USE DATABASE LIFEARC_POC;
+USE WAREHOUSE COMPUTE_WH;
+
+-- ============================================================================
+-- PART 1: INDEX TABLES
+-- ============================================================================
+
+-- Clustered on TERM so a query term prunes to the micro-partitions holding
+-- its postings, however large the corpus grows
+CREATE TABLE IF NOT EXISTS AI_DEMO.RESEARCH_TERM_INDEX (
+    TERM VARCHAR NOT NULL,
+    DOC_ID VARCHAR NOT NULL,
+    TF NUMBER NOT NULL,               -- occurrences of TERM in the document
+    POSITIONS ARRAY,                  -- ascending token offsets of each occurrence
+    INDEXED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+CLUSTER BY (TERM);
+
+CREATE TABLE IF NOT EXISTS AI_DEMO.RESEARCH_DOC_STATS (
+    DOC_ID VARCHAR NOT NULL,
+    DOC_LENGTH NUMBER NOT NULL,       -- tokens indexed for the document
+    INDEXED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- One row, rewritten by every index update, so a search never aggregates
+-- RESEARCH_DOC_STATS
+CREATE TABLE IF NOT EXISTS AI_DEMO.RESEARCH_CORPUS_STATS (
+    DOC_COUNT NUMBER,
+    AVG_DOC_LENGTH FLOAT,
+    REFRESHED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ============================================================================
+-- PART 2: TOKENIZER
+-- ============================================================================
+
+-- The app tokenizes search text the same way (re.findall('[a-z0-9]+') on the
+-- lower-cased query), so index terms and query terms always agree
+CREATE OR REPLACE FUNCTION AI_DEMO.TOKENIZE_RESEARCH_DOC(
+    DOC_TITLE VARCHAR, TARGET_GENE VARCHAR, KEY_FINDING VARCHAR, FULL_TEXT VARCHAR
+)
+RETURNS TABLE (POSITION NUMBER, TERM VARCHAR)
+AS
+$$
+    SELECT t.INDEX AS POSITION, t.VALUE AS TERM
+    FROM TABLE(SPLIT_TO_TABLE(
+        TRIM(REGEXP_REPLACE(
+            LOWER(COALESCE(DOC_TITLE, '') || ' ' || COALESCE(TARGET_GENE, '') || ' ' ||
+                  COALESCE(KEY_FINDING, '') || ' ' || COALESCE(FULL_TEXT, '')),
+            '[^a-z0-9]+', ' ')),
+        ' ')) t
+    WHERE t.VALUE <> ''
+$$;
+
+-- ============================================================================
+-- PART 3: FULL REBUILD
+-- ============================================================================
+
+-- Created before the first build so documents landing during it are picked
+-- up by the next delta (re-indexing a document is idempotent)
+CREATE STREAM IF NOT EXISTS AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM
+    ON TABLE AI_DEMO.RESEARCH_INTELLIGENCE;
+
+CREATE OR REPLACE PROCEDURE AI_DEMO.REBUILD_RESEARCH_INDEX()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    DELETE FROM AI_DEMO.RESEARCH_TERM_INDEX;
+    DELETE FROM AI_DEMO.RESEARCH_DOC_STATS;
+
+    INSERT INTO AI_DEMO.RESEARCH_TERM_INDEX (TERM, DOC_ID, TF, POSITIONS, INDEXED_AT)
+    SELECT t.TERM, r.DOC_ID, COUNT(*),
+           ARRAY_AGG(t.POSITION) WITHIN GROUP (ORDER BY t.POSITION), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_INTELLIGENCE r,
+         TABLE(AI_DEMO.TOKENIZE_RESEARCH_DOC(r.DOC_TITLE, r.TARGET_GENE, r.KEY_FINDING, r.FULL_TEXT)) t
+    GROUP BY t.TERM, r.DOC_ID;
+
+    INSERT INTO AI_DEMO.RESEARCH_DOC_STATS (DOC_ID, DOC_LENGTH, INDEXED_AT)
+    SELECT DOC_ID, SUM(TF), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_TERM_INDEX
+    GROUP BY DOC_ID;
+
+    DELETE FROM AI_DEMO.RESEARCH_CORPUS_STATS;
+    INSERT INTO AI_DEMO.RESEARCH_CORPUS_STATS (DOC_COUNT, AVG_DOC_LENGTH, REFRESHED_AT)
+    SELECT COUNT(*), AVG(DOC_LENGTH), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_DOC_STATS;
+
+    COMMIT;
+    RETURN 'Research index rebuilt';
+END;
+$$;
+
+CALL AI_DEMO.REBUILD_RESEARCH_INDEX();
+
+-- ============================================================================
+-- PART 4: INCREMENTAL MAINTENANCE
+-- ============================================================================
+
+-- Every document in the stream (inserted, updated or deleted) has its
+-- postings dropped; the current version of inserted and updated documents
+-- (METADATA$ACTION = 'INSERT') is tokenized again. Work is proportional to
+-- the documents that changed, and all reads of the stream share one
+-- transaction so they see the same delta.
+CREATE OR REPLACE PROCEDURE AI_DEMO.APPLY_RESEARCH_INDEX_DELTA()
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    DELETE FROM AI_DEMO.RESEARCH_TERM_INDEX
+    WHERE DOC_ID IN (SELECT DOC_ID FROM AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM);
+
+    DELETE FROM AI_DEMO.RESEARCH_DOC_STATS
+    WHERE DOC_ID IN (SELECT DOC_ID FROM AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM);
+
+    INSERT INTO AI_DEMO.RESEARCH_TERM_INDEX (TERM, DOC_ID, TF, POSITIONS, INDEXED_AT)
+    SELECT t.TERM, s.DOC_ID, COUNT(*),
+           ARRAY_AGG(t.POSITION) WITHIN GROUP (ORDER BY t.POSITION), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM s,
+         TABLE(AI_DEMO.TOKENIZE_RESEARCH_DOC(s.DOC_TITLE, s.TARGET_GENE, s.KEY_FINDING, s.FULL_TEXT)) t
+    WHERE s.METADATA$ACTION = 'INSERT'
+    GROUP BY t.TERM, s.DOC_ID;
+
+    INSERT INTO AI_DEMO.RESEARCH_DOC_STATS (DOC_ID, DOC_LENGTH, INDEXED_AT)
+    SELECT s.DOC_ID, COUNT(*), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM s,
+         TABLE(AI_DEMO.TOKENIZE_RESEARCH_DOC(s.DOC_TITLE, s.TARGET_GENE, s.KEY_FINDING, s.FULL_TEXT)) t
+    WHERE s.METADATA$ACTION = 'INSERT'
+    GROUP BY s.DOC_ID;
+
+    DELETE FROM AI_DEMO.RESEARCH_CORPUS_STATS;
+    INSERT INTO AI_DEMO.RESEARCH_CORPUS_STATS (DOC_COUNT, AVG_DOC_LENGTH, REFRESHED_AT)
+    SELECT COUNT(*), AVG(DOC_LENGTH), CURRENT_TIMESTAMP()
+    FROM AI_DEMO.RESEARCH_DOC_STATS;
+
+    COMMIT;
+    RETURN 'Research index delta applied';
+END;
+$$;
+
+CREATE OR REPLACE TASK AI_DEMO.APPLY_RESEARCH_INDEX_DELTA_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = '5 MINUTE'
+    WHEN SYSTEM$STREAM_HAS_DATA('LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE_INDEX_STREAM')
+AS
+    CALL AI_DEMO.APPLY_RESEARCH_INDEX_DELTA();
+
+ALTER TASK AI_DEMO.APPLY_RESEARCH_INDEX_DELTA_TASK RESUME;
+
+-- ============================================================================
+-- PART 5: VERIFICATION
+-- ============================================================================
+
+-- Postings for a term, most frequent first
+SELECT TERM, DOC_ID, TF, POSITIONS
+FROM AI_DEMO.RESEARCH_TERM_INDEX
+WHERE TERM = 'egfr'
+ORDER BY TF DESC;
+
+-- Every document is indexed
+SELECT
+    (SELECT COUNT(*) FROM AI_DEMO.RESEARCH_INTELLIGENCE) AS DOCUMENTS,
+    (SELECT DOC_COUNT FROM AI_DEMO.RESEARCH_CORPUS_STATS) AS INDEXED_DOCUMENTS,
+    (SELECT AVG_DOC_LENGTH FROM AI_DEMO.RESEARCH_CORPUS_STATS) AS AVG_DOC_LENGTH;
+
+-- ============================================================================
+-- SUMMARY: Objects Created
+-- ============================================================================
+
+/*
+AI_DEMO schema:
+├── RESEARCH_TERM_INDEX (Table) - TERM, DOC_ID, TF, POSITIONS; clustered by TERM
+├── RESEARCH_DOC_STATS (Table) - Tokens per document
+├── RESEARCH_CORPUS_STATS (Table) - Document count and average length
+├── TOKENIZE_RESEARCH_DOC (Function) - Position and term per token of a document
+├── RESEARCH_INTELLIGENCE_INDEX_STREAM (Stream) - Changes to RESEARCH_INTELLIGENCE
+├── REBUILD_RESEARCH_INDEX (Procedure) - Full rebuild
+├── APPLY_RESEARCH_INDEX_DELTA (Procedure) - Re-indexes changed documents only
+└── APPLY_RESEARCH_INDEX_DELTA_TASK (Task) - Every 5 minutes when the stream has data
+
+Run REBUILD_RESEARCH_INDEX() after changing the tokenizer; the task keeps
+the index current as documents land.
+*/
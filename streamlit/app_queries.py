@@ -0,0 +1,354 @@
+"""
+LifeArc App Queries - Shared Query Instrumentation and Cortex Response Cache
+============================================================================
+Imported by the ML dashboard and both streamlit_apps demos, which call
+configure_app() with their session and app name once per script run.
+
+- tracked_sql(): drop-in for session.sql() that sets a QUERY_TAG naming the
+  app, page and section and logs client-side wall time, row count and result
+  size to BENCHMARK.APP_QUERY_LOG. The dashboard's hidden Performance page
+  (?perf=1) joins that log with QUERY_HISTORY.
+- cortex_complete() and friends: COMPLETE answers persisted in
+  BENCHMARK.CORTEX_RESPONSE_CACHE (PART 11 of
+  sql_scripts/dashboard_aggregates.sql), keyed on the model, a SHA-256 of the
+  prompt, the COMPLETE options and the version of the data the prompt
+  describes, and kept for CORTEX_CACHE_TTL_HOURS. A repeated request is a
+  point lookup instead of an LLM call, and answers this app process has
+  already seen come straight from memory. Hits and misses are counted per
+  entry for the CORTEX_CACHE_STATS view.
+
+Deploy this file next to each app (on Streamlit in Snowflake, add it to the
+app's stage); locally, put streamlit/ on PYTHONPATH.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+QUERY_LOG_TABLE = "LIFEARC_POC.BENCHMARK.APP_QUERY_LOG"
+QUERY_LOG_FLUSH_SIZE = 20
+QUERY_LOG_COLUMNS = [
+    'QUERY_ID', 'APP', 'PAGE', 'SECTION', 'CLIENT_MS', 'ROWS_RETURNED', 'RESULT_BYTES', 'LOGGED_AT'
+]
+
+CORTEX_CACHE_TABLE = "LIFEARC_POC.BENCHMARK.CORTEX_RESPONSE_CACHE"
+CORTEX_CACHE_TTL_HOURS = 24
+CORTEX_MEMO_MAX_ENTRIES = 128
+
+_app = {'session': None, 'name': ''}
+
+
+def configure_app(session, app_name):
+    """Bind the helpers to the running app's session and APP name."""
+    _app['session'] = session
+    _app['name'] = app_name
+
+
+def sql_string(text):
+    """Quote text as a Snowflake string literal."""
+    return "'" + str(text).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def sql_value(value):
+    """A Python value as a Snowflake literal for a VALUES list."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, datetime):
+        return f"CAST('{value.isoformat(sep=' ')}' AS TIMESTAMP)"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return sql_string(value)
+
+
+# =============================================================================
+# QUERY INSTRUMENTATION
+# =============================================================================
+
+@st.cache_resource
+def get_query_log():
+    """Client-side query records not yet written to APP_QUERY_LOG."""
+    return {'lock': threading.Lock(), 'records': []}
+
+
+def flush_query_log(force=False):
+    """Append buffered records to APP_QUERY_LOG in one batched insert.
+
+    The insert is submitted without waiting, so the script run that fills
+    the batch does not pay for the write; ``force`` flushes a partial batch
+    and waits for it, for the Performance page to read its own queries.
+    """
+    log = get_query_log()
+    with log['lock']:
+        if not log['records'] or (len(log['records']) < QUERY_LOG_FLUSH_SIZE and not force):
+            return
+        records, log['records'] = log['records'], []
+    flush_cache_hits(force=True)
+    try:
+        tag = json.dumps({'app': _app['name'], 'page': '', 'section': 'query_log'})
+        values = ",\n".join("(" + ", ".join(sql_value(value) for value in record) + ")" for record in records)
+        job = _app['session'].sql(
+            f"INSERT INTO {QUERY_LOG_TABLE} ({', '.join(QUERY_LOG_COLUMNS)}) VALUES\n{values}"
+        ).collect_nowait(statement_params={'QUERY_TAG': tag})
+        if force:
+            job.result()
+    except Exception:
+        pass  # Instrumentation must never take a page down
+
+
+def record_client_timing(query_id, page, section, ms, rows, size):
+    """Buffer one APP_QUERY_LOG record, flushing when the batch is full."""
+    log = get_query_log()
+    with log['lock']:
+        log['records'].append((query_id, _app['name'], page, section, round(ms, 1), rows, size, datetime.now()))
+    flush_query_log()
+
+
+class TrackedQuery:
+    """Tagged, timed stand-in for session.sql(sql).
+
+    collect(), to_pandas() and batches() run the statement synchronously;
+    its query id comes from a thread-scoped query history listener, so no
+    extra statement is issued. submit() starts it with collect_nowait for
+    callers that run several queries concurrently or do not wait for a
+    write, and result() then fetches the finished job.
+    """
+
+    def __init__(self, sql, section):
+        self.sql = sql
+        self.section = section
+        self.page = st.session_state.get('query_page', '')
+        self.job = None
+        self.query_id = None
+        self.started = None
+
+    def _statement_params(self):
+        return {'QUERY_TAG': json.dumps({'app': _app['name'], 'page': self.page, 'section': self.section})}
+
+    def _run(self, fetch):
+        """Return ``fetch(dataframe, statement_params)`` and remember its query id."""
+        session = _app['session']
+        thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        with session.query_history(include_thread_id=True) as history:
+            data = fetch(session.sql(self.sql), self._statement_params())
+        self.query_id = next((q.query_id for q in reversed(history.queries) if q.thread_id == thread_id), None)
+        return data
+
+    def _record(self, rows, size):
+        record_client_timing(self.query_id, self.page, self.section,
+                             (time.perf_counter() - self.started) * 1000, rows, size)
+
+    def submit(self):
+        self.started = time.perf_counter()
+        self.job = _app['session'].sql(self.sql).collect_nowait(statement_params=self._statement_params())
+        self.query_id = self.job.query_id
+        return self
+
+    def result(self, result_type="row"):
+        return self._measured(self.job.result(result_type=result_type))
+
+    def _measured(self, data):
+        if isinstance(data, pd.DataFrame):
+            size = int(data.memory_usage(deep=True).sum())
+        else:
+            size = sum(len(str(value)) for row in data for value in row)
+        self._record(len(data), size)
+        return data
+
+    def collect(self):
+        return self._measured(self._run(lambda df, params: df.collect(statement_params=params)))
+
+    def to_pandas(self):
+        return self._measured(self._run(lambda df, params: df.to_pandas(statement_params=params)))
+
+    def batches(self):
+        """Yield the result as pandas DataFrames, one Arrow record batch at a time.
+
+        Only one batch is held in memory, so callers that aggregate as they go
+        keep a bounded footprint however many rows the query returns. Select
+        just the columns you need; every one crosses the wire.
+        """
+        rows = size = 0
+        try:
+            for batch in self._run(lambda df, params: df.to_pandas_batches(statement_params=params)):
+                rows += len(batch)
+                size += int(batch.memory_usage(deep=True).sum())
+                yield batch
+        finally:
+            self._record(rows, size)
+
+
+def tracked_sql(sql, section):
+    return TrackedQuery(sql, section)
+
+
+# =============================================================================
+# CACHE HIT COUNTS
+# =============================================================================
+# Hits on the persistent caches (Cortex responses, Analyst SQL, rerank scores)
+# are counted in memory and added to each table's HIT_COUNT in one MERGE per
+# table, alongside the query log flush, so a cache hit costs no warehouse DML.
+
+@st.cache_resource
+def get_cache_hits():
+    """{(table, key columns, last-hit column): {key literals: [hits, last hit]}} not yet written."""
+    return {'lock': threading.Lock(), 'hits': {}}
+
+
+def count_cache_hit(table, key, last_hit_column="LAST_HIT_AT"):
+    """Count a hit on the ``table`` row matching ``key`` ({column: SQL literal}).
+
+    ``last_hit_column`` is set to the time of the latest hit; None for
+    tables without one.
+    """
+    cache_hits = get_cache_hits()
+    with cache_hits['lock']:
+        entries = cache_hits['hits'].setdefault((table, tuple(key), last_hit_column), {})
+        entry = entries.setdefault(tuple(key.values()), [0, None])
+        entry[0] += 1
+        entry[1] = datetime.now()
+    flush_cache_hits()
+
+
+def flush_cache_hits(force=False):
+    """Add the counted hits to their tables once QUERY_LOG_FLUSH_SIZE rows are pending (not awaited)."""
+    cache_hits = get_cache_hits()
+    with cache_hits['lock']:
+        pending = sum(len(entries) for entries in cache_hits['hits'].values())
+        if not pending or (pending < QUERY_LOG_FLUSH_SIZE and not force):
+            return
+        batches, cache_hits['hits'] = cache_hits['hits'], {}
+    tag = json.dumps({'app': _app['name'], 'page': '', 'section': 'cache_hits'})
+    for (table, columns, last_hit_column), entries in batches.items():
+        values = ", ".join(
+            "(" + ", ".join(literals) + f", {hits}, {sql_value(last_hit)})"
+            for literals, (hits, last_hit) in entries.items()
+        )
+        last_hit = f", {last_hit_column} = s.LAST_HIT" if last_hit_column else ""
+        try:
+            _app['session'].sql(f"""
+                MERGE INTO {table} t
+                USING (SELECT * FROM (VALUES {values}) AS v({', '.join(columns)}, HITS, LAST_HIT)) s
+                ON {' AND '.join(f't.{column} = s.{column}' for column in columns)}
+                WHEN MATCHED THEN UPDATE SET HIT_COUNT = t.HIT_COUNT + s.HITS{last_hit}
+            """).collect_nowait(statement_params={'QUERY_TAG': tag})
+        except Exception:
+            pass  # Hit counts are statistics; never fail a page over them
+
+
+# =============================================================================
+# CORTEX RESPONSE CACHE
+# =============================================================================
+
+@st.cache_resource
+def get_cortex_memo():
+    """{cache key: (expiry epoch seconds, response)} for this app process."""
+    return {'lock': threading.Lock(), 'entries': {}}
+
+
+def cortex_cache_key(model, prompt, data_version="", options=None):
+    """Key columns of a CORTEX_RESPONSE_CACHE entry, as SQL literals.
+
+    ``data_version`` names the data snapshot the prompt was built from ('' when
+    the prompt carries all its input).
+    """
+    return {
+        'MODEL': sql_string(model),
+        'PROMPT_HASH': sql_string(hashlib.sha256(prompt.encode("utf-8")).hexdigest()),
+        'PARAMS': sql_string(json.dumps(options or {}, sort_keys=True)),
+        'DATA_VERSION': sql_string(data_version)
+    }
+
+
+def cortex_memo_put(memo_key, response, ttl_seconds):
+    memo = get_cortex_memo()
+    with memo['lock']:
+        memo['entries'][memo_key] = (time.time() + ttl_seconds, response)
+        while len(memo['entries']) > CORTEX_MEMO_MAX_ENTRIES:
+            memo['entries'].pop(next(iter(memo['entries'])))
+
+
+def cortex_cache_lookup(key, section):
+    """Return (response, source) from memory or the cache table, or (None, None).
+
+    A hit is counted with count_cache_hit(); lookup errors count as a miss.
+    """
+    memo = get_cortex_memo()
+    memo_key = tuple(key.values())
+    match = " AND ".join(f"{column} = {value}" for column, value in key.items())
+    with memo['lock']:
+        entry = memo['entries'].get(memo_key)
+    if entry is not None and entry[0] > time.time():
+        response, source = entry[1], 'memory'
+    else:
+        try:
+            rows = tracked_sql(f"""
+                SELECT RESPONSE, DATEDIFF('second', CURRENT_TIMESTAMP(), EXPIRES_AT) AS TTL_SECONDS
+                FROM {CORTEX_CACHE_TABLE}
+                WHERE {match} AND EXPIRES_AT > CURRENT_TIMESTAMP()
+            """, f"{section}_cache").collect()
+        except Exception:
+            rows = []
+        if not rows:
+            return None, None
+        response, source = rows[0]['RESPONSE'], 'cache'
+        cortex_memo_put(memo_key, response, rows[0]['TTL_SECONDS'])
+    count_cache_hit(CORTEX_CACHE_TABLE, key)
+    return response, source
+
+
+def cortex_cache_store(key, response, section, generation_ms, ttl_hours=CORTEX_CACHE_TTL_HOURS):
+    """Remember a fresh answer and upsert it into the cache table (not awaited)."""
+    cortex_memo_put(tuple(key.values()), response, ttl_hours * 3600)
+    try:
+        tracked_sql(f"""
+            MERGE INTO {CORTEX_CACHE_TABLE} t
+            USING (SELECT {sql_string(response)} AS RESPONSE) s
+            ON {' AND '.join(f't.{column} = {value}' for column, value in key.items())}
+            WHEN MATCHED THEN UPDATE SET
+                RESPONSE = s.RESPONSE, GENERATION_MS = {generation_ms:.1f}, CREATED_AT = CURRENT_TIMESTAMP(),
+                EXPIRES_AT = DATEADD('hour', {ttl_hours}, CURRENT_TIMESTAMP()), MISS_COUNT = t.MISS_COUNT + 1
+            WHEN NOT MATCHED THEN INSERT
+                (MODEL, PROMPT_HASH, PARAMS, DATA_VERSION, RESPONSE, APP, SECTION, GENERATION_MS,
+                 CREATED_AT, EXPIRES_AT, HIT_COUNT, MISS_COUNT)
+            VALUES
+                ({', '.join(key.values())}, s.RESPONSE, '{_app['name']}', '{section}', {generation_ms:.1f},
+                 CURRENT_TIMESTAMP(), DATEADD('hour', {ttl_hours}, CURRENT_TIMESTAMP()), 0, 1)
+        """, f"{section}_cache_fill").submit()
+    except Exception:
+        pass
+
+
+def cortex_complete(model, prompt, section, data_version="", options=None, ttl_hours=CORTEX_CACHE_TTL_HOURS):
+    """SNOWFLAKE.CORTEX.COMPLETE through the persistent response cache.
+
+    Returns (response, source, ms) where source is 'memory', 'cache' or
+    'model'. Cache failures fall through to the model; model failures raise.
+    """
+    started = time.perf_counter()
+    key = cortex_cache_key(model, prompt, data_version, options)
+    response, source = cortex_cache_lookup(key, section)
+    if response is not None:
+        return response, source, (time.perf_counter() - started) * 1000
+
+    if options:
+        completion = (f"SNOWFLAKE.CORTEX.COMPLETE({key['MODEL']}, "
+                      f"[{{'role': 'user', 'content': {sql_string(prompt)}}}], "
+                      f"PARSE_JSON({key['PARAMS']})):choices[0]:messages::VARCHAR")
+    else:
+        completion = f"SNOWFLAKE.CORTEX.COMPLETE({key['MODEL']}, {sql_string(prompt)})"
+    response = tracked_sql(f"SELECT {completion} AS RESPONSE", section).collect()[0]['RESPONSE']
+    ms = (time.perf_counter() - started) * 1000
+    cortex_cache_store(key, response, section, ms, ttl_hours)
+    return response, 'model', ms
+
+
+def cortex_source_caption(source, ms):
+    if source == 'model':
+        return f"Generated in {ms / 1000:.1f}s · cached for {CORTEX_CACHE_TTL_HOURS}h"
+    return f"Served from the {'in-memory' if source == 'memory' else 'response'} cache in {ms:,.0f} ms"
@@ -9,12 +9,28 @@ Design Theme: LifeArc Brand Guidelines
 - Visual: Arc shapes, gradient transitions, clean modern typography
 """
 
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from snowflake.snowpark import functions as F
 import pandas as pd
+import numpy as np
 import altair as alt
 
+from app_queries import (
+    QUERY_LOG_TABLE, configure_app, cortex_complete, cortex_source_caption, flush_query_log, sql_string,
+    tracked_sql
+)
+from response_scorer import ResponseScorer
+
 # =============================================================================
 # LIFEARC BRAND CONFIGURATION
 # =============================================================================
@@ -372,10 +388,1056 @@ st.markdown(f"""
 # =============================================================================
 @st.cache_resource
 def get_session():
+    # LIFEARC_DATA_BACKEND=local runs against the DuckDB backend in local_dev/
+    if os.environ.get("LIFEARC_DATA_BACKEND") == "local":
+        from local_backend import get_local_session
+        return get_local_session()
     return get_active_session()
 
 session = get_session()
 
+# Fragments rerun on their own widget changes without re-executing the page,
+# the sidebar or the branding CSS (st.experimental_fragment before 1.37)
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+# =============================================================================
+# QUERY INSTRUMENTATION & CORTEX RESPONSE CACHE
+# =============================================================================
+# tracked_sql() tags and times every statement into BENCHMARK.APP_QUERY_LOG,
+# which the hidden Performance page (?perf=1) joins with QUERY_HISTORY, and
+# cortex_complete() answers COMPLETE through BENCHMARK.CORTEX_RESPONSE_CACHE.
+# Both live in app_queries.py, shared with the two apps in streamlit_apps/.
+APP_NAME = "LIFEARC_ML_DASHBOARD"
+configure_app(session, APP_NAME)
+
+
+# =============================================================================
+# QUERY CACHE
+# =============================================================================
+# Results are shared across all sessions of the app and keyed on the SQL text
+# plus the LAST_ALTERED timestamp of every table the query reads, so a reload
+# of the source data invalidates dependent entries without waiting for the TTL.
+# Chart aggregates read DASHBOARD_RESPONSE_CUBE (sql_scripts/dashboard_aggregates.sql),
+# built by one GROUPING SETS scan and kept current by a stream/task delta merge.
+CLINICAL_TABLE = "LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M"
+CUBE_TABLE = "LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE"
+METRICS_TABLE = "LIFEARC_POC.ML_DEMO.MODEL_METRICS_LOG"
+SURFACE_TABLE = "LIFEARC_POC.ML_DEMO.RESPONSE_SURFACE"
+STRATUM_TABLE = "LIFEARC_POC.BENCHMARK.PATIENT_STRATUM_RATES"
+SAMPLE_TABLE = "LIFEARC_POC.BENCHMARK.CLINICAL_RESULTS_SAMPLE"
+SCORER_ARTIFACT_PATH = "@LIFEARC_POC.ML_DEMO.MODEL_ARTIFACTS/response_scorer/V1_XGBOOST.json"
+EVAL_BINS_TABLE = "LIFEARC_POC.ML_DEMO.MODEL_EVALUATION_BINS"
+EVAL_CURVES_VIEW = "LIFEARC_POC.ML_DEMO.MODEL_EVALUATION_CURVES"
+
+QUERY_CACHE_TTL_SECONDS = 900
+QUERY_CACHE_MAX_ENTRIES = 256
+DATA_VERSION_TTL_SECONDS = 60
+QUERY_POOL_WORKERS = 8
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(self, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0
+            }
+
+
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(QUERY_CACHE_TTL_SECONDS, QUERY_CACHE_MAX_ENTRIES)
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL_SECONDS, show_spinner=False)
+def get_data_version(table_name):
+    """Return the table's LAST_ALTERED timestamp, read from metadata only."""
+    database, schema, table = table_name.split('.')
+    try:
+        row = tracked_sql(f"""
+            SELECT LAST_ALTERED
+            FROM {database}.INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = '{schema}' AND TABLE_NAME = '{table}'
+        """, "data_version").collect()
+        return str(row[0]['LAST_ALTERED']) if row else None
+    except Exception:
+        return None
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL_SECONDS, show_spinner=False)
+def get_classifier_version():
+    """CREATED_ON of RESPONSE_CLASSIFIER_CLEAN, or None when it cannot be read.
+
+    Retraining replaces the classifier instance, so this changes with every
+    new model, like LAST_ALTERED does for a table.
+    """
+    try:
+        rows = tracked_sql("""
+            SHOW SNOWFLAKE.ML.CLASSIFICATION LIKE 'RESPONSE_CLASSIFIER_CLEAN' IN SCHEMA LIFEARC_POC.ML_DEMO
+        """, "classifier_version").collect()
+        return str(rows[0]['created_on']) if rows else None
+    except Exception:
+        return None
+
+
+def run_query(sql, tables=(CUBE_TABLE,), section="query", refresh=False, versions=()):
+    """Run a query through the shared result cache and return a DataFrame.
+
+    ``tables`` lists the tables the query depends on; their data versions are
+    part of the cache key. Pass an empty tuple for queries with no table input.
+    ``versions`` adds the versions of non-table inputs, such as a model, to
+    the key. ``section`` names the page section in the query's QUERY_TAG.
+    ``refresh`` skips the lookup and replaces the entry, for callers that
+    just wrote to one of ``tables``.
+    """
+    cache = get_query_cache()
+    key = (" ".join(sql.split()), tuple(get_data_version(t) for t in tables), tuple(versions))
+    result = None if refresh else cache.get(key)
+    if result is None:
+        result = tracked_sql(sql, section).to_pandas()
+        cache.put(key, result)
+    return result.copy()
+
+
+@st.cache_resource
+def get_query_pool():
+    """Threads that run a page's independent queries side by side, shared across sessions."""
+    return ThreadPoolExecutor(max_workers=QUERY_POOL_WORKERS, thread_name_prefix="dashboard_query")
+
+
+def run_in_script_context(ctx, fn):
+    """Call ``fn`` on a pool thread with the page's ScriptRunContext attached."""
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return fn()
+
+
+class PendingQuery:
+    """A query running on the query pool; result() blocks until it finishes.
+
+    Submission and execution errors are held and re-raised from result(), so
+    each page section keeps its own try/except around the query it renders.
+    """
+
+    def __init__(self, key, future=None, result=None, error=None):
+        self.key = key
+        self.future = future
+        self._result = result
+        self._error = error
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        if self._result is None:
+            try:
+                self._result = self.future.result()
+            except Exception as e:
+                self._error = e
+                raise
+            get_query_cache().put(self.key, self._result)
+        return self._result.copy()
+
+
+def submit_queries(queries):
+    """Start every uncached query at once and return {name: PendingQuery}.
+
+    ``queries`` maps a section name (also used in the QUERY_TAG) to ``sql``
+    or ``(sql, tables)``. Each runs synchronously on its own pool thread, so
+    a page waits for its slowest query instead of the sum of all of them,
+    without the result polling and RESULT_SCAN of collect_nowait.
+    """
+    cache = get_query_cache()
+    pool = get_query_pool()
+    ctx = get_script_run_ctx()
+    pending = {}
+    for name, query in queries.items():
+        sql, tables = (query, (CUBE_TABLE,)) if isinstance(query, str) else query
+        try:
+            key = (" ".join(sql.split()), tuple(get_data_version(t) for t in tables), ())
+            cached = cache.get(key)
+            if cached is not None:
+                pending[name] = PendingQuery(key, result=cached)
+            else:
+                fetch = tracked_sql(sql, name).to_pandas
+                pending[name] = PendingQuery(key, future=pool.submit(run_in_script_context, ctx, fetch))
+        except Exception as e:
+            pending[name] = PendingQuery(None, error=e)
+    return pending
+
+# =============================================================================
+# FAST MODE
+# =============================================================================
+# Sidebar toggle that answers chart queries from CLINICAL_RESULTS_SAMPLE, a
+# fixed-size stratified sample, instead of exact aggregates, so latency stays
+# flat as the trial tables grow. Estimates are SAMPLE_WEIGHT-weighted; the
+# 95% CI combines per-(stratum, group) binomial variances. The patient count
+# is not estimated: distinct counts don't scale from a sample, and the cube's
+# ALL row already keeps the exact one current.
+def sampled_rate_query(group_expr, label, survival=False):
+    """Weighted response rate and 95% CI half-width per group from the sample."""
+    survival_cells = """,
+            SUM(IFF(PFS_MONTHS IS NOT NULL, SAMPLE_WEIGHT * PFS_MONTHS, 0)) AS PFS_SUM,
+            SUM(IFF(PFS_MONTHS IS NOT NULL, SAMPLE_WEIGHT, 0)) AS PFS_WEIGHT,
+            SUM(IFF(OS_MONTHS IS NOT NULL, SAMPLE_WEIGHT * OS_MONTHS, 0)) AS OS_SUM,
+            SUM(IFF(OS_MONTHS IS NOT NULL, SAMPLE_WEIGHT, 0)) AS OS_WEIGHT""" if survival else ""
+    survival_columns = """,
+        ROUND(SUM(PFS_SUM) / NULLIF(SUM(PFS_WEIGHT), 0), 1) AS AVG_PFS,
+        ROUND(SUM(OS_SUM) / NULLIF(SUM(OS_WEIGHT), 0), 1) AS AVG_OS""" if survival else ""
+    return f"""
+    WITH cells AS (
+        SELECT 
+            {group_expr} AS GROUP_KEY,
+            SUM(SAMPLE_WEIGHT) AS N_HAT,
+            COUNT(*) AS N_SAMPLED,
+            AVG(IS_RESPONDER) AS P{survival_cells}
+        FROM {SAMPLE_TABLE}
+        WHERE RESPONSE_CATEGORY IS NOT NULL
+        GROUP BY GROUP_KEY, STRATUM_ID
+    )
+    SELECT 
+        GROUP_KEY AS {label},
+        ROUND(SUM(N_HAT)) AS PATIENTS,
+        ROUND(SUM(N_HAT * P) / SUM(N_HAT) * 100, 1) AS RESPONSE_RATE,
+        ROUND(1.96 * SQRT(SUM(N_HAT * N_HAT * P * (1 - P) / N_SAMPLED)) / SUM(N_HAT) * 100, 1) AS CI_95{survival_columns}
+    FROM cells
+    GROUP BY GROUP_KEY
+    ORDER BY RESPONSE_RATE DESC
+    """
+
+
+SAMPLED_METRICS_QUERY = f"""
+    WITH cells AS (
+        SELECT 
+            SUM(SAMPLE_WEIGHT) AS N_HAT,
+            COUNT(*) AS N_SAMPLED,
+            AVG(IS_RESPONDER) AS P
+        FROM {SAMPLE_TABLE}
+        GROUP BY STRATUM_ID
+    )
+    SELECT 
+        (SELECT DISTINCT_PATIENTS FROM {CUBE_TABLE} WHERE DIMENSION_SET = 'ALL') AS PATIENTS,
+        (SELECT APPROX_COUNT_DISTINCT(TRIAL_ID) FROM {SAMPLE_TABLE}) AS TRIALS,
+        ROUND(SUM(N_HAT * P) / SUM(N_HAT) * 100, 1) AS RESPONSE_RATE,
+        ROUND(1.96 * SQRT(SUM(N_HAT * N_HAT * P * (1 - P) / N_SAMPLED)) / SUM(N_HAT) * 100, 1) AS CI_95,
+        27 AS SITES
+    FROM cells
+"""
+
+
+def error_bars(df, x_field):
+    """95% CI rules to layer over a bar chart of RESPONSE_RATE by ``x_field``."""
+    bounds = df.assign(CI_LOW=df['RESPONSE_RATE'] - df['CI_95'], CI_HIGH=df['RESPONSE_RATE'] + df['CI_95'])
+    return alt.Chart(bounds).mark_rule(
+        color=LIFEARC_COLORS['text_dark'],
+        strokeWidth=2
+    ).encode(
+        x=alt.X(f'{x_field}:N', sort=list(df[x_field])),
+        y='CI_LOW:Q',
+        y2='CI_HIGH:Q',
+        tooltip=[x_field, 'RESPONSE_RATE', 'CI_95']
+    )
+
+# =============================================================================
+# RESPONSE SURFACE
+# =============================================================================
+# RESPONSE_CLASSIFIER_CLEAN scored once over every profile the prediction form
+# can produce (ML_DEMO.BUILD_RESPONSE_SURFACE). Loaded into an in-process dict
+# so predictions and what-if sweeps are key lookups rather than PREDICT calls.
+SURFACE_KEY_COLUMNS = [
+    'TRIAL_ID', 'TARGET_GENE', 'BIOMARKER_STATUS', 'CTDNA_CONFIRMATION',
+    'TREATMENT_ARM', 'COHORT', 'PATIENT_AGE', 'PATIENT_SEX'
+]
+
+
+@st.cache_resource(show_spinner=False)
+def load_response_surface(model_version):
+    """Return {profile key: (class, P(responder), P(non-responder))} for a model version."""
+    lookup = {}
+    for batch in tracked_sql(f"""
+        SELECT {', '.join(SURFACE_KEY_COLUMNS)}, PREDICTED_CLASS, PROB_RESPONDER, PROB_NON_RESPONDER
+        FROM {SURFACE_TABLE}
+        WHERE MODEL_VERSION = '{model_version}'
+    """, "response_surface").batches():
+        batch['PATIENT_AGE'] = batch['PATIENT_AGE'].astype(int)
+        keys = zip(*(batch[c].tolist() for c in SURFACE_KEY_COLUMNS))
+        values = zip(batch['PREDICTED_CLASS'].astype(int).tolist(),
+                     batch['PROB_RESPONDER'].tolist(),
+                     batch['PROB_NON_RESPONDER'].tolist())
+        lookup.update(zip(keys, values))
+    return lookup
+
+
+def get_response_surface():
+    """Return the lookup for the most recently scored model version, or {}."""
+    try:
+        latest = run_query(f"""
+            SELECT MODEL_VERSION
+            FROM {SURFACE_TABLE}
+            ORDER BY SCORED_AT DESC
+            LIMIT 1
+        """, tables=(SURFACE_TABLE,), section="response_surface_version")
+        if latest.empty:
+            return {}
+        return load_response_surface(latest.iloc[0]['MODEL_VERSION'])
+    except Exception:
+        return {}
+
+
+# =============================================================================
+# HISTORICAL COMPARISON
+# =============================================================================
+# Each comparison stratum is the set of stratum dimensions a historical patient
+# must share with the profile being predicted. Every stratum is a conditional
+# SUM over PATIENT_STRATUM_RATES, so adding strata adds columns, not scans.
+COMPARISON_STRATA = {
+    'Same Biomarker Profile': ('BIOMARKER_STATUS', 'CTDNA_CONFIRMATION'),
+    'Same Treatment Arm': ('TREATMENT_ARM',),
+    'Same Target Gene': ('TARGET_GENE',),
+    'Same Age Band': ('AGE_BAND',),
+    'Same Cohort': ('COHORT',),
+    'Same Sex': ('PATIENT_SEX',),
+    'Same Arm + Biomarker': ('TREATMENT_ARM', 'BIOMARKER_STATUS', 'CTDNA_CONFIRMATION'),
+    'Same Trial + Arm': ('TRIAL_ID', 'TREATMENT_ARM'),
+    'Overall Population': ()
+}
+DEFAULT_COMPARISON_STRATA = [
+    'Same Biomarker Profile', 'Same Treatment Arm', 'Same Target Gene', 'Overall Population'
+]
+
+
+def get_historical_comparison(profile, strata):
+    """Historical response rate and sample size for each stratum, in one query."""
+    measures = []
+    for i, label in enumerate(strata):
+        dims = COMPARISON_STRATA[label]
+        condition = " AND ".join(
+            f"{dim} = {profile[dim]}" if isinstance(profile[dim], int) else f"{dim} = '{profile[dim]}'"
+            for dim in dims
+        ) or "TRUE"
+        measures.append(f"""
+            ROUND(SUM(IFF({condition}, RESPONDERS, 0)) * 100
+                  / NULLIF(SUM(IFF({condition}, ROW_COUNT, 0)), 0), 1) AS RATE_{i},
+            SUM(IFF({condition}, ROW_COUNT, 0)) AS SIZE_{i}""")
+    
+    row = run_query(f"""
+        SELECT {','.join(measures)}
+        FROM {STRATUM_TABLE}
+    """, tables=(STRATUM_TABLE,), section="historical_comparison").iloc[0]
+    
+    return pd.DataFrame({
+        'COMPARISON': list(strata),
+        'HISTORICAL_RATE': [row[f'RATE_{i}'] for i in range(len(strata))],
+        'SAMPLE_SIZE': [row[f'SIZE_{i}'] for i in range(len(strata))]
+    })
+
+
+@fragment
+def render_historical_comparison(profile, prob_responder):
+    """Historical rates for the chosen strata next to this patient's prediction."""
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<p class="section-header">How Does This Patient Compare?</p>', unsafe_allow_html=True)
+    
+    comparison_strata = st.multiselect(
+        "Compare against",
+        list(COMPARISON_STRATA),
+        default=DEFAULT_COMPARISON_STRATA,
+        key="comparison_strata"
+    )
+    
+    try:
+        comparison_df = get_historical_comparison(profile, comparison_strata or ['Overall Population'])
+        comparison_df['PREDICTED'] = prob_responder * 100
+        
+        # Create comparison chart
+        chart_data = comparison_df.melt(
+            id_vars=['COMPARISON'], 
+            value_vars=['HISTORICAL_RATE', 'PREDICTED'],
+            var_name='Type',
+            value_name='Rate'
+        )
+        chart_data['Type'] = chart_data['Type'].replace({
+            'HISTORICAL_RATE': 'Historical',
+            'PREDICTED': 'This Patient'
+        })
+        
+        comparison_chart = alt.Chart(chart_data).mark_bar(
+            cornerRadiusTopLeft=4,
+            cornerRadiusTopRight=4
+        ).encode(
+            x=alt.X('COMPARISON:N', title='', sort=None),
+            y=alt.Y('Rate:Q', title='Response Rate (%)', scale=alt.Scale(domain=[0, 100])),
+            color=alt.Color('Type:N', scale=alt.Scale(
+                domain=['Historical', 'This Patient'],
+                range=[LIFEARC_COLORS['text_muted'], LIFEARC_COLORS['primary_teal']]
+            )),
+            xOffset='Type:N',
+            tooltip=['COMPARISON', 'Type', 'Rate']
+        ).properties(height=300)
+        
+        st.altair_chart(comparison_chart, use_container_width=True)
+    except Exception:
+        st.info("Historical comparison data not available")
+
+# =============================================================================
+# IN-PROCESS SCORER
+# =============================================================================
+# LIFEARC_RESPONSE_PREDICTOR exported by notebooks/lifearc_ml_production.ipynb
+# as a NumPy artifact (streamlit/response_scorer.py). Scores any profile,
+# including ones outside the precomputed surface, without a warehouse call.
+@st.cache_resource(show_spinner=False)
+def load_response_scorer(artifact_path):
+    """Return a ResponseScorer for the staged artifact, or None if unavailable."""
+    try:
+        with session.file.get_stream(artifact_path) as f:
+            return ResponseScorer.from_json(f.read().decode("utf-8"))
+    except Exception:
+        return None
+
+
+# =============================================================================
+# THRESHOLD CURVES
+# =============================================================================
+# ROC, precision-recall, calibration and lift all derive from the per-bin
+# operating points in MODEL_EVALUATION_CURVES (sql_scripts/dashboard_aggregates.sql),
+# which the warehouse builds by histogramming MODEL_EVALUATION probabilities.
+# A model version is ~100 rows; the version is in the SQL text, so each one is
+# its own cache entry and invalidates when the bins are rebuilt.
+def get_evaluation_versions():
+    return run_query(f"""
+        SELECT MODEL_NAME, MODEL_VERSION, MAX(BUILT_AT) AS BUILT_AT, SUM(ROW_COUNT) AS PREDICTIONS
+        FROM {EVAL_BINS_TABLE}
+        GROUP BY MODEL_NAME, MODEL_VERSION
+        ORDER BY BUILT_AT DESC
+    """, tables=(EVAL_BINS_TABLE,), section="evaluation_versions")
+
+
+def get_evaluation_curves(model_name, model_version):
+    """Operating points for one model version, highest threshold first."""
+    curves = run_query(f"""
+        SELECT THRESHOLD, ROW_COUNT, POSITIVES, PROBABILITY_SUM,
+               TPR, FPR, PRECISION_AT, POPULATION_SHARE, LIFT
+        FROM {EVAL_CURVES_VIEW}
+        WHERE MODEL_NAME = '{model_name}' AND MODEL_VERSION = '{model_version}'
+        ORDER BY THRESHOLD DESC
+    """, tables=(EVAL_BINS_TABLE,), section="evaluation_curves")
+    return curves.astype(float)
+
+
+def roc_auc(curves):
+    """Trapezoidal area under the binned ROC curve, starting from (0, 0)."""
+    fpr = pd.concat([pd.Series([0.0]), curves['FPR']], ignore_index=True)
+    tpr = pd.concat([pd.Series([0.0]), curves['TPR']], ignore_index=True)
+    return float((fpr.diff() * (tpr + tpr.shift()) / 2).sum())
+
+
+def calibration_deciles(curves):
+    """Roll the fine bins up to probability deciles for the reliability plot."""
+    decile = (curves['THRESHOLD'] * 10 + 1e-9).astype(int).clip(upper=9)
+    grouped = curves.groupby(decile)[['ROW_COUNT', 'POSITIVES', 'PROBABILITY_SUM']].sum()
+    grouped = grouped[grouped['ROW_COUNT'] > 0]
+    return pd.DataFrame({
+        'MEAN_PREDICTED': grouped['PROBABILITY_SUM'] / grouped['ROW_COUNT'],
+        'OBSERVED_RATE': grouped['POSITIVES'] / grouped['ROW_COUNT'],
+        'PATIENTS': grouped['ROW_COUNT']
+    })
+
+
+def diagonal(x_field, y_field, y_value=None):
+    """Reference line: y = x, or y = ``y_value`` when given."""
+    points = pd.DataFrame({x_field: [0.0, 1.0], y_field: [0.0, 1.0] if y_value is None else [y_value, y_value]})
+    return alt.Chart(points).mark_line(strokeDash=[4, 4], color=LIFEARC_COLORS['text_muted']).encode(
+        x=f'{x_field}:Q', y=f'{y_field}:Q'
+    )
+
+
+@fragment
+def render_threshold_curves():
+    st.markdown('<p class="section-header">Threshold Curves</p>', unsafe_allow_html=True)
+    try:
+        versions = get_evaluation_versions()
+    except Exception as e:
+        st.info(f"Threshold curves unavailable - run PART 9 of sql_scripts/dashboard_aggregates.sql ({e})")
+        return
+    if versions.empty:
+        st.info("No evaluation bins yet - CALL ML_DEMO.BUILD_MODEL_EVALUATION_BINS(...)")
+        return
+
+    labels = [f"{r.MODEL_NAME} {r.MODEL_VERSION}" for r in versions.itertuples()]
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        choice = st.selectbox("Model version", range(len(labels)), format_func=labels.__getitem__)
+    with col2:
+        threshold = st.slider("Decision threshold", 0.05, 0.95, 0.5, 0.05)
+    selected = versions.iloc[choice]
+    curves = get_evaluation_curves(selected['MODEL_NAME'], selected['MODEL_VERSION'])
+
+    # Operating point: the lowest bin edge still at or above the threshold
+    point = curves[curves['THRESHOLD'] >= threshold - 1e-9].tail(1)
+    base_rate = curves['POSITIVES'].sum() / curves['ROW_COUNT'].sum()
+    st.caption(
+        f"AUC {roc_auc(curves):.3f} · {int(selected['PREDICTIONS']):,} predictions in {len(curves)} bins · "
+        f"base responder rate {base_rate:.1%}"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        roc = alt.Chart(curves).mark_line(color=LIFEARC_COLORS['primary_teal'], strokeWidth=3).encode(
+            x=alt.X('FPR:Q', title='False Positive Rate', scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y('TPR:Q', title='True Positive Rate', scale=alt.Scale(domain=[0, 1])),
+            tooltip=['THRESHOLD', 'TPR', 'FPR']
+        )
+        marker = alt.Chart(point).mark_point(size=120, filled=True, color=LIFEARC_COLORS['accent_coral']).encode(
+            x='FPR:Q', y='TPR:Q'
+        )
+        st.altair_chart((diagonal('FPR', 'TPR') + roc + marker).properties(title='ROC', height=280),
+                        use_container_width=True)
+    with col2:
+        pr = alt.Chart(curves).mark_line(color=LIFEARC_COLORS['secondary_purple'], strokeWidth=3).encode(
+            x=alt.X('TPR:Q', title='Recall', scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y('PRECISION_AT:Q', title='Precision', scale=alt.Scale(domain=[0, 1])),
+            tooltip=['THRESHOLD', 'TPR', 'PRECISION_AT']
+        )
+        marker = alt.Chart(point).mark_point(size=120, filled=True, color=LIFEARC_COLORS['accent_coral']).encode(
+            x='TPR:Q', y='PRECISION_AT:Q'
+        )
+        st.altair_chart((diagonal('TPR', 'PRECISION_AT', base_rate) + pr + marker).properties(
+            title='Precision-Recall', height=280), use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        calibration = alt.Chart(calibration_deciles(curves)).mark_line(
+            point=True, color=LIFEARC_COLORS['navy'], strokeWidth=3
+        ).encode(
+            x=alt.X('MEAN_PREDICTED:Q', title='Mean Predicted Probability', scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y('OBSERVED_RATE:Q', title='Observed Responder Rate', scale=alt.Scale(domain=[0, 1])),
+            tooltip=['MEAN_PREDICTED', 'OBSERVED_RATE', 'PATIENTS']
+        )
+        st.altair_chart((diagonal('MEAN_PREDICTED', 'OBSERVED_RATE') + calibration).properties(
+            title='Calibration', height=280), use_container_width=True)
+    with col2:
+        lift = alt.Chart(curves).mark_line(color=LIFEARC_COLORS['light_teal'], strokeWidth=3).encode(
+            x=alt.X('POPULATION_SHARE:Q', title='Share of Patients Targeted', scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y('LIFT:Q', title='Lift over Base Rate'),
+            tooltip=['THRESHOLD', 'POPULATION_SHARE', 'LIFT']
+        )
+        st.altair_chart((diagonal('POPULATION_SHARE', 'LIFT', 1.0) + lift).properties(
+            title='Cumulative Lift', height=280), use_container_width=True)
+
+    if not point.empty:
+        op = point.iloc[0]
+        st.caption(
+            f"At p ≥ {op['THRESHOLD']:.2f}: recall {op['TPR']:.1%}, precision {op['PRECISION_AT']:.1%}, "
+            f"false positive rate {op['FPR']:.1%}, {op['POPULATION_SHARE']:.1%} of patients flagged"
+        )
+
+
+# =============================================================================
+# SURVIVAL CURVES
+# =============================================================================
+# Kaplan-Meier curves and log-rank inputs are window functions over
+# SURVIVAL_EVENT_COUNTS (PART 10 of sql_scripts/dashboard_aggregates.sql):
+# events and censorings per group and 0.1-month time, so a cohort definition
+# is a few hundred rows per group whatever the size of the source. Definitions
+# not built yet are built by the first page view that asks for them.
+SURVIVAL_COUNTS_TABLE = "LIFEARC_POC.BENCHMARK.SURVIVAL_EVENT_COUNTS"
+SURVIVAL_CURVES_VIEW = "LIFEARC_POC.BENCHMARK.SURVIVAL_CURVES"
+SURVIVAL_LOGRANK_VIEW = "LIFEARC_POC.BENCHMARK.SURVIVAL_LOGRANK"
+SURVIVAL_FOLLOW_UP_MONTHS = 24
+SURVIVAL_DIMENSIONS = {
+    'Treatment Arm': 'TREATMENT_ARM',
+    'Target Gene': 'TARGET_GENE',
+    'Trial': 'TRIAL_ID',
+    'Biomarker Status': 'BIOMARKER_STATUS',
+    'ctDNA Confirmation': 'CTDNA_CONFIRMATION',
+    'Cohort': 'COHORT',
+    'Sex': 'PATIENT_SEX',
+    'Age Band': 'AGE_BAND'
+}
+
+
+def survival_filter(dimension, endpoint):
+    return (f"DIMENSION = '{dimension}' AND FOLLOW_UP_MONTHS = {SURVIVAL_FOLLOW_UP_MONTHS} "
+            f"AND ENDPOINT = '{endpoint}'")
+
+
+def get_survival_curves(dimension, endpoint):
+    """Kaplan-Meier step points per group, building the definition if needed."""
+    sql = f"""
+        SELECT GROUP_VALUE, TIME_MONTHS, AT_RISK, EVENTS, CENSORED, SURVIVAL, STD_ERR
+        FROM {SURVIVAL_CURVES_VIEW}
+        WHERE {survival_filter(dimension, endpoint)}
+        ORDER BY GROUP_VALUE, TIME_MONTHS
+    """
+    curves = run_query(sql, tables=(SURVIVAL_COUNTS_TABLE,), section="survival_curves")
+    if curves.empty:
+        tracked_sql(f"""
+            CALL LIFEARC_POC.BENCHMARK.BUILD_SURVIVAL_COUNTS('{dimension}', {SURVIVAL_FOLLOW_UP_MONTHS})
+        """, "survival_build").collect()
+        get_data_version.clear()
+        curves = run_query(sql, tables=(SURVIVAL_COUNTS_TABLE,), section="survival_curves", refresh=True)
+    return curves
+
+
+def get_logrank_inputs(dimension, endpoint):
+    return run_query(f"""
+        SELECT GROUP_VALUE, OTHER_GROUP, OBSERVED, EXPECTED, COVARIANCE
+        FROM {SURVIVAL_LOGRANK_VIEW}
+        WHERE {survival_filter(dimension, endpoint)}
+    """, tables=(SURVIVAL_COUNTS_TABLE,), section="survival_logrank")
+
+
+def chi2_sf(x, df):
+    """Upper tail probability of the chi-square distribution with integer ``df``."""
+    half = x / 2
+    if df % 2 == 0:
+        term = total = math.exp(-half)
+        for i in range(1, df // 2):
+            term *= half / i
+            total += term
+        return min(total, 1.0)
+    total = math.erfc(math.sqrt(half))
+    term = math.sqrt(half) * math.exp(-half) / math.gamma(1.5)
+    for i in range(1, (df + 1) // 2):
+        total += term
+        term *= half / (i + 0.5)
+    return min(total, 1.0)
+
+
+def logrank_test(inputs):
+    """(chi-square, degrees of freedom, p-value) for equal survival across groups.
+
+    The covariance matrix of observed - expected is singular (each row sums to
+    zero), so the statistic uses all groups but the last.
+    """
+    groups = sorted(inputs['GROUP_VALUE'].unique())
+    if len(groups) < 2:
+        return None
+    covariance = inputs.pivot(index='GROUP_VALUE', columns='OTHER_GROUP', values='COVARIANCE')
+    covariance = covariance.loc[groups, groups].to_numpy(dtype=float)
+    totals = inputs.drop_duplicates('GROUP_VALUE').set_index('GROUP_VALUE').loc[groups]
+    excess = (totals['OBSERVED'] - totals['EXPECTED']).to_numpy(dtype=float)
+    chi2 = float(excess[:-1] @ np.linalg.solve(covariance[:-1, :-1], excess[:-1]))
+    df = len(groups) - 1
+    return chi2, df, chi2_sf(chi2, df)
+
+
+def survival_summary(curves):
+    """Patients, events, median survival and 12-month survival per group."""
+    rows = []
+    for group, points in curves.groupby('GROUP_VALUE'):
+        reached = points[points['SURVIVAL'] <= 0.5]
+        at_12 = points[points['TIME_MONTHS'] <= 12]
+        rows.append({
+            'GROUP': group,
+            'PATIENTS': int(points['AT_RISK'].max()),
+            'EVENTS': int(points['EVENTS'].sum()),
+            'MEDIAN_MONTHS': float(reached['TIME_MONTHS'].iloc[0]) if not reached.empty else None,
+            'SURVIVAL_12M_PCT': round(float(at_12['SURVIVAL'].iloc[-1]) * 100, 1) if not at_12.empty else 100.0
+        })
+    return pd.DataFrame(rows)
+
+
+@fragment
+def render_survival_curves():
+    st.markdown('<p class="section-header">Survival (Kaplan-Meier)</p>', unsafe_allow_html=True)
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        label = st.selectbox("Group patients by", list(SURVIVAL_DIMENSIONS), key="survival_dimension")
+    with col2:
+        endpoint = st.radio("Endpoint", ["PFS", "OS"], horizontal=True, key="survival_endpoint")
+    dimension = SURVIVAL_DIMENSIONS[label]
+
+    try:
+        curves = get_survival_curves(dimension, endpoint).astype({
+            'TIME_MONTHS': float, 'AT_RISK': int, 'EVENTS': int, 'CENSORED': int, 'SURVIVAL': float, 'STD_ERR': float
+        })
+        test = logrank_test(get_logrank_inputs(dimension, endpoint))
+    except Exception as e:
+        st.info(f"Survival curves unavailable - run PART 10 of sql_scripts/dashboard_aggregates.sql ({e})")
+        return
+
+    # Every curve starts at S = 1 at time 0; the band is S +/- 1.96 Greenwood SE
+    start = pd.DataFrame({'GROUP_VALUE': curves['GROUP_VALUE'].unique(), 'TIME_MONTHS': 0.0,
+                          'SURVIVAL': 1.0, 'STD_ERR': 0.0})
+    points = pd.concat([start, curves], ignore_index=True).sort_values(['GROUP_VALUE', 'TIME_MONTHS'])
+    points['LOWER'] = (points['SURVIVAL'] - 1.96 * points['STD_ERR']).clip(lower=0)
+    points['UPPER'] = (points['SURVIVAL'] + 1.96 * points['STD_ERR']).clip(upper=1)
+
+    base = alt.Chart(points).encode(
+        x=alt.X('TIME_MONTHS:Q', title=f'{endpoint} (months)'),
+        color=alt.Color('GROUP_VALUE:N', title=label)
+    )
+    band = base.mark_area(interpolate='step-after', opacity=0.15).encode(y='LOWER:Q', y2='UPPER:Q')
+    line = base.mark_line(interpolate='step-after', strokeWidth=2.5).encode(
+        y=alt.Y('SURVIVAL:Q', title='Survival Probability', scale=alt.Scale(domain=[0, 1])),
+        tooltip=['GROUP_VALUE', 'TIME_MONTHS', 'SURVIVAL', 'AT_RISK']
+    )
+    st.altair_chart((band + line).properties(height=380), use_container_width=True)
+
+    if test is not None:
+        chi2, df, p_value = test
+        st.caption(
+            f"Log-rank χ² = {chi2:,.1f} on {df} df, "
+            f"{'p < 0.001' if p_value < 0.001 else f'p = {p_value:.3f}'} · follow-up censored at "
+            f"{SURVIVAL_FOLLOW_UP_MONTHS} months"
+        )
+    st.dataframe(survival_summary(curves), use_container_width=True, hide_index=True)
+
+
+# =============================================================================
+# COHORT BUILDER
+# =============================================================================
+# Any combination of the stratum dimensions is a GROUP BY over
+# PATIENT_STRATUM_RATES (a few thousand rows), so the pivot runs in the
+# warehouse and only one page of cohorts is returned. The total cohort count
+# rides along as a window aggregate, and a pivot spreads at most
+# COHORT_PIVOT_MAX_VALUES columns, so a page is bounded in both directions.
+COHORT_DIMENSIONS = {
+    'Trial': 'TRIAL_ID',
+    'Target Gene': 'TARGET_GENE',
+    'Treatment Arm': 'TREATMENT_ARM',
+    'Cohort': 'COHORT',
+    'Sex': 'PATIENT_SEX',
+    'Age Band': 'AGE_BAND',
+    'Biomarker Status': 'BIOMARKER_STATUS',
+    'ctDNA Confirmation': 'CTDNA_CONFIRMATION'
+}
+COHORT_SORTS = {
+    'Patients (most first)': 'PATIENTS DESC',
+    'Response rate (highest first)': 'RESPONSE_RATE DESC NULLS LAST',
+    'Response rate (lowest first)': 'RESPONSE_RATE ASC NULLS LAST'
+}
+COHORT_PAGE_SIZES = [25, 50, 100]
+COHORT_PIVOT_MAX_VALUES = 12
+
+
+def sql_literal(value):
+    return str(value) if isinstance(value, (int, float)) else "'" + str(value).replace("'", "''") + "'"
+
+
+def get_pivot_values(column):
+    """Distinct values of a pivot dimension, capped at COHORT_PIVOT_MAX_VALUES."""
+    values = run_query(f"""
+        SELECT DISTINCT {column} AS VALUE
+        FROM {STRATUM_TABLE}
+        WHERE {column} IS NOT NULL
+        ORDER BY VALUE
+        LIMIT {COHORT_PIVOT_MAX_VALUES}
+    """, tables=(STRATUM_TABLE,), section="cohort_pivot_values")['VALUE']
+    return [int(v) if column == 'AGE_BAND' else v for v in values]
+
+
+def get_cohort_page(columns, pivot_column, sort, min_patients, page_size, page):
+    """One page of cohorts for the selected dimensions, with TOTAL_COHORTS on every row."""
+    pivot_measures = []
+    if pivot_column:
+        for value in get_pivot_values(pivot_column):
+            condition = f"{pivot_column} = {sql_literal(value)}"
+            alias = f"{value} RESPONSE %".replace('"', '""')
+            pivot_measures.append(
+                f'ROUND(SUM(IFF({condition}, RESPONDERS, 0)) * 100 '
+                f'/ NULLIF(SUM(IFF({condition}, RESPONSE_ROWS, 0)), 0), 1) AS "{alias}"'
+            )
+    select_list = columns + [
+        "SUM(ROW_COUNT) AS PATIENTS",
+        "SUM(RESPONDERS) AS RESPONDERS",
+        "ROUND(SUM(RESPONDERS) * 100 / NULLIF(SUM(RESPONSE_ROWS), 0), 1) AS RESPONSE_RATE"
+    ] + pivot_measures + ["COUNT(*) OVER () AS TOTAL_COHORTS"]
+    group_by = f"GROUP BY {', '.join(columns)}" if columns else ""
+    order_by = ", ".join([COHORT_SORTS[sort]] + columns)
+    return run_query(f"""
+        SELECT {', '.join(select_list)}
+        FROM {STRATUM_TABLE}
+        {group_by}
+        HAVING SUM(ROW_COUNT) >= {int(min_patients)}
+        ORDER BY {order_by}
+        LIMIT {int(page_size)} OFFSET {(int(page) - 1) * int(page_size)}
+    """, tables=(STRATUM_TABLE,), section="cohort_builder")
+
+
+@fragment
+def render_cohort_builder():
+    st.markdown('<p class="section-header">Cohort Builder</p>', unsafe_allow_html=True)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        labels = st.multiselect("Group by", list(COHORT_DIMENSIONS), default=['Trial', 'Treatment Arm'],
+                                key="cohort_dimensions")
+    with col2:
+        pivot_label = st.selectbox("Pivot response rate by", ['None'] + labels, key="cohort_pivot")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort = st.selectbox("Sort by", list(COHORT_SORTS), key="cohort_sort")
+    with col2:
+        min_patients = st.number_input("Minimum patients per cohort", min_value=0, value=0, step=100,
+                                       key="cohort_min_patients")
+    with col3:
+        page_size = st.selectbox("Cohorts per page", COHORT_PAGE_SIZES, key="cohort_page_size")
+
+    pivot_column = COHORT_DIMENSIONS.get(pivot_label)
+    columns = [COHORT_DIMENSIONS[label] for label in labels if label != pivot_label]
+    # A new definition starts again from the first page
+    definition = (tuple(columns), pivot_column, sort, min_patients, page_size)
+    if st.session_state.get('cohort_definition') != definition:
+        st.session_state['cohort_definition'] = definition
+        st.session_state['cohort_page'] = 1
+
+    try:
+        page_df = get_cohort_page(columns, pivot_column, sort, min_patients, page_size,
+                                  st.session_state['cohort_page'])
+    except Exception as e:
+        st.warning(f"Could not build cohorts: {e}")
+        return
+    total = int(page_df['TOTAL_COHORTS'].iloc[0]) if not page_df.empty else 0
+    pages = max(1, math.ceil(total / page_size))
+
+    st.dataframe(page_df.drop(columns='TOTAL_COHORTS'), use_container_width=True, hide_index=True)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Page", min_value=1, max_value=pages, key="cohort_page")
+    with col2:
+        first = (st.session_state['cohort_page'] - 1) * page_size
+        st.caption(
+            f"Cohorts {min(first + 1, total):,}-{min(first + len(page_df), total):,} of {total:,} · "
+            "response rate = responders / patients with a recorded response"
+        )
+
+
+# =============================================================================
+# BATCH SCORING
+# =============================================================================
+# Uploaded or referenced patients land in a session temp table and are scored
+# by set-based PREDICT over ROW_ID ranges, one query per chunk.
+BATCH_INPUT_TABLE = "LIFEARC_POC.ML_DEMO.BATCH_SCORING_INPUT"
+BATCH_RESULTS_TABLE = "LIFEARC_POC.ML_DEMO.BATCH_SCORING_RESULTS"
+
+MODEL_INPUT_COLUMNS = [
+    'TRIAL_ID', 'TREATMENT_ARM', 'BIOMARKER_STATUS', 'CTDNA_CONFIRMATION', 'TARGET_GENE',
+    'PATIENT_AGE', 'PATIENT_SEX', 'COHORT'
+]
+
+# demo_data/clinical_outcomes.csv names -> model input names
+BATCH_COLUMN_ALIASES = {
+    'AGE': 'PATIENT_AGE',
+    'SEX': 'PATIENT_SEX',
+    'STUDY_ID': 'TRIAL_ID',
+    'CTDNA': 'CTDNA_CONFIRMATION',
+    'GENE': 'TARGET_GENE'
+}
+
+# Categories the classifier was trained on (the RESPONSE_SURFACE grid); uploaded
+# values are checked against them, and they are the choices for missing columns
+BATCH_COLUMN_DEFAULTS = {
+    'TRIAL_ID': ["TRIAL-BRCA-001", "TRIAL-BRCA-002", "TRIAL-EGFR-001", "TRIAL-KRAS-001", "TRIAL-TP53-001"],
+    'TREATMENT_ARM': ["Combination", "Experimental", "Standard"],
+    'BIOMARKER_STATUS': ["POSITIVE", "NEGATIVE"],
+    'CTDNA_CONFIRMATION': ["YES", "NO"],
+    'TARGET_GENE': ["BRCA1", "BRCA2", "EGFR", "KRAS", "TP53"],
+    'PATIENT_SEX': ["F", "M"],
+    'COHORT': ["Cohort_A", "Cohort_B", "Cohort_C"]
+}
+
+EXCLUDE_ROWS = "Exclude these rows"
+
+TABLE_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*){0,2}$')
+
+
+def normalize_patient_frame(df):
+    """Map clinical_outcomes.csv style columns and values onto model inputs."""
+    df = df.rename(columns=lambda c: c.strip().upper())
+    df = df.rename(columns={k: v for k, v in BATCH_COLUMN_ALIASES.items() if v not in df.columns})
+    
+    if 'BIOMARKER_STATUS' in df.columns:
+        raw_status = df['BIOMARKER_STATUS'].astype(str).str.upper()
+        if 'TARGET_GENE' not in df.columns and raw_status.str.contains('_').all():
+            # e.g. KRAS_G12C_POS -> KRAS
+            df['TARGET_GENE'] = raw_status.str.split('_').str[0]
+        df['BIOMARKER_STATUS'] = raw_status.mask(raw_status.str.endswith('POS'), 'POSITIVE') \
+                                           .mask(raw_status.str.endswith('NEG'), 'NEGATIVE')
+    if 'PATIENT_SEX' in df.columns:
+        df['PATIENT_SEX'] = df['PATIENT_SEX'].astype(str).str.strip().str[0].str.upper()
+    if 'COHORT' in df.columns:
+        cohort = df['COHORT'].astype(str).str.strip()
+        df['COHORT'] = cohort.where(cohort.str.len() > 1, 'Cohort_' + cohort)
+    if 'PATIENT_ID' not in df.columns:
+        df['PATIENT_ID'] = [f"ROW_{i + 1}" for i in range(len(df))]
+    return df
+
+
+def unknown_category_values(df):
+    """{column: sorted values outside BATCH_COLUMN_DEFAULTS} for the categorical inputs."""
+    unknown = {}
+    for name, known in BATCH_COLUMN_DEFAULTS.items():
+        if name in df.columns:
+            values = set(df[name].astype(str)) - set(known)
+            if values:
+                unknown[name] = sorted(values)
+    return unknown
+
+
+def apply_category_mapping(df, mapping):
+    """Replace unknown values per {column: {value: category}}; drop rows mapped to EXCLUDE_ROWS."""
+    df = df.copy()
+    keep = pd.Series(True, index=df.index)
+    for name, values in mapping.items():
+        mapped = df[name].astype(str).map(lambda v, values=values: values.get(v, v))
+        keep &= mapped != EXCLUDE_ROWS
+        df[name] = mapped
+    return df[keep]
+
+
+def stage_batch_input(df):
+    """Bulk-load a DataFrame into the temp input table; return its row count."""
+    df = df[['PATIENT_ID'] + MODEL_INPUT_COLUMNS].copy()
+    df['PATIENT_ID'] = df['PATIENT_ID'].astype(str)
+    df['PATIENT_AGE'] = pd.to_numeric(df['PATIENT_AGE'], errors='coerce')
+    df.insert(0, 'ROW_ID', range(1, len(df) + 1))
+    database, schema, table = BATCH_INPUT_TABLE.split('.')
+    session.write_pandas(
+        df, table, database=database, schema=schema,
+        auto_create_table=True, overwrite=True, table_type="temporary", quote_identifiers=False
+    )
+    return len(df)
+
+
+def stage_batch_table(source_table):
+    """Copy a Snowflake table's model input columns into the temp input table.
+
+    Returns (scorable, rejected) row counts. Rows with a NULL or a value
+    outside BATCH_COLUMN_DEFAULTS in a categorical column are staged after
+    the scorable ones, with KNOWN_VALUES false, so ROW_IDs 1..scorable are
+    exactly the rows to score and the rest can be shown to the user.
+    """
+    known_values = " AND ".join(
+        f"{name} IN ({', '.join(sql_string(value) for value in known)})"
+        for name, known in BATCH_COLUMN_DEFAULTS.items()
+    )
+    tracked_sql(f"""
+        CREATE OR REPLACE TEMPORARY TABLE {BATCH_INPUT_TABLE} AS
+        SELECT 
+            ROW_NUMBER() OVER (ORDER BY KNOWN_VALUES DESC, PATIENT_ID) AS ROW_ID,
+            *
+        FROM (
+            SELECT 
+                PATIENT_ID::VARCHAR AS PATIENT_ID,
+                {', '.join(MODEL_INPUT_COLUMNS)},
+                COALESCE({known_values}, FALSE) AS KNOWN_VALUES
+            FROM {source_table}
+        )
+    """, "batch_stage_table").collect()
+    counts = tracked_sql(f"""
+        SELECT COUNT_IF(KNOWN_VALUES) AS SCORABLE, COUNT_IF(NOT KNOWN_VALUES) AS REJECTED
+        FROM {BATCH_INPUT_TABLE}
+    """, "batch_stage_table").collect()[0]
+    return int(counts['SCORABLE']), int(counts['REJECTED'])
+
+
+def score_batch_chunk(first_row, last_row):
+    """Score one ROW_ID range with a single set-based PREDICT into the results table."""
+    tracked_sql(f"""
+        INSERT INTO {BATCH_RESULTS_TABLE}
+        SELECT 
+            ROW_ID, PATIENT_ID, TRIAL_ID, TREATMENT_ARM, TARGET_GENE, COHORT,
+            PREDICTION:class::INT AS PREDICTED_CLASS,
+            PREDICTION:probability:"1"::FLOAT AS PROB_RESPONDER
+        FROM (
+            SELECT 
+                *,
+                LIFEARC_POC.ML_DEMO.RESPONSE_CLASSIFIER_CLEAN!PREDICT(
+                    INPUT_DATA => OBJECT_CONSTRUCT(
+                        'TRIAL_ID', TRIAL_ID,
+                        'TREATMENT_ARM', TREATMENT_ARM,
+                        'BIOMARKER_STATUS', BIOMARKER_STATUS,
+                        'CTDNA_CONFIRMATION', CTDNA_CONFIRMATION,
+                        'TARGET_GENE', TARGET_GENE,
+                        'PATIENT_AGE', PATIENT_AGE,
+                        'PATIENT_SEX', PATIENT_SEX,
+                        'COHORT', COHORT,
+                        'BIOMARKER_POSITIVE', IFF(BIOMARKER_STATUS = 'POSITIVE', 1, 0),
+                        'CTDNA_CONFIRMED', IFF(CTDNA_CONFIRMATION = 'YES', 1, 0),
+                        'TREATMENT_INTENSITY', CASE TREATMENT_ARM 
+                            WHEN 'Combination' THEN 3 WHEN 'Experimental' THEN 2 ELSE 1 END
+                    )
+                ) AS PREDICTION
+            FROM {BATCH_INPUT_TABLE}
+            WHERE ROW_ID BETWEEN {first_row} AND {last_row}
+        )
+    """, "batch_predict").collect()
+    return tracked_sql(f"""
+        SELECT PATIENT_ID, TRIAL_ID, TREATMENT_ARM, TARGET_GENE, COHORT, PREDICTED_CLASS,
+               ROUND(PROB_RESPONDER * 100, 1) AS RESPONSE_PROBABILITY
+        FROM {BATCH_RESULTS_TABLE}
+        WHERE ROW_ID BETWEEN {first_row} AND {last_row}
+        ORDER BY ROW_ID
+    """, "batch_results").to_pandas()
+
+@fragment
+def render_quick_stats():
+    """Sidebar headline stats; reruns on its own so page widgets never re-query it."""
+    st.markdown("### Quick Stats")
+    try:
+        quick_stats = run_query("""
+            SELECT 
+                ROW_COUNT AS RECORDS,
+                (SELECT COUNT(DISTINCT TRIAL_ID) FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+                 WHERE DIMENSION_SET = 'TRIAL') AS TRIALS,
+                ROUND(RESPONDERS * 100 / ROW_COUNT, 1) AS RESPONSE_RATE
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'ALL'
+        """, section="quick_stats").iloc[0]
+        
+        st.metric("Total Records", f"{quick_stats['RECORDS']:,}")
+        st.metric("Active Trials", quick_stats['TRIALS'])
+        st.metric("Response Rate", f"{quick_stats['RESPONSE_RATE']}%")
+    except:
+        st.metric("Total Records", "1,000,000")
+        st.metric("Active Trials", "5")
+        st.metric("Response Rate", "50.4%")
+    
+    cache_stats = get_query_cache().stats()
+    st.caption(
+        f"Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']}% hit rate, {cache_stats['entries']} entries)"
+    )
+    st.button("Refresh stats", key="refresh_quick_stats", use_container_width=True)
+
 # =============================================================================
 # SIDEBAR - LIFEARC BRANDED NAVIGATION
 # =============================================================================
@@ -397,33 +1459,26 @@ with st.sidebar:
     
     # Navigation
     st.markdown("### Navigate")
+    pages = ["Dashboard", "Patient Prediction", "Batch Prediction", "Model Analytics", "Cohort Analysis", "Trial Insights"]
+    if st.query_params.get("perf") == "1":
+        pages.append("Performance")
     page = st.radio(
         "",
-        ["Dashboard", "Patient Prediction", "Model Analytics", "Cohort Analysis", "Trial Insights"],
+        pages,
         label_visibility="collapsed"
     )
+    st.session_state['query_page'] = page
+    
+    fast_mode = st.toggle(
+        "Fast mode",
+        key="fast_mode",
+        help="Answer charts from a fixed-size stratified sample with 95% confidence intervals"
+    )
     
     st.markdown("---")
     
     # Quick Stats
-    st.markdown("### Quick Stats")
-    try:
-        quick_stats = session.sql("""
-            SELECT 
-                COUNT(*) AS RECORDS,
-                COUNT(DISTINCT TRIAL_ID) AS TRIALS,
-                ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                               THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE
-            FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-        """).collect()[0]
-        
-        st.metric("Total Records", f"{quick_stats['RECORDS']:,}")
-        st.metric("Active Trials", quick_stats['TRIALS'])
-        st.metric("Response Rate", f"{quick_stats['RESPONSE_RATE']}%")
-    except:
-        st.metric("Total Records", "1,000,000")
-        st.metric("Active Trials", "5")
-        st.metric("Response Rate", "50.4%")
+    render_quick_stats()
     
     st.markdown("---")
     st.markdown("""
@@ -454,19 +1509,45 @@ if page == "Dashboard":
     </div>
     """, unsafe_allow_html=True)
     
+    # All sections' queries run concurrently; each section waits only for its own
+    dashboard_queries = submit_queries({
+        'metrics': (SAMPLED_METRICS_QUERY, (CUBE_TABLE, SAMPLE_TABLE)) if fast_mode else """
+            SELECT 
+                DISTINCT_PATIENTS AS PATIENTS,
+                (SELECT COUNT(DISTINCT TRIAL_ID) FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+                 WHERE DIMENSION_SET = 'TRIAL') AS TRIALS,
+                ROUND(RESPONDERS * 100 / ROW_COUNT, 1) AS RESPONSE_RATE,
+                27 AS SITES
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'ALL'
+        """,
+        'trial_perf': (sampled_rate_query("TARGET_GENE", "TARGET_GENE"), (SAMPLE_TABLE,)) if fast_mode else """
+            SELECT 
+                TARGET_GENE,
+                RESPONSE_ROWS AS PATIENTS,
+                ROUND(RESPONDERS * 100 / RESPONSE_ROWS, 1) AS RESPONSE_RATE
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'TARGET_GENE' AND RESPONSE_ROWS > 0
+            ORDER BY RESPONSE_RATE DESC
+        """,
+        'model_metrics': ("""
+            SELECT 
+                ROUND(ACCURACY * 100, 1) AS ACCURACY,
+                ROUND(PRECISION_SCORE * 100, 1) AS PRECISION_VAL,
+                ROUND(RECALL_SCORE * 100, 1) AS RECALL_VAL,
+                ROUND(F1_SCORE * 100, 1) AS F1
+            FROM LIFEARC_POC.ML_DEMO.MODEL_METRICS_LOG
+            ORDER BY TRAINED_AT DESC
+            LIMIT 1
+        """, (METRICS_TABLE,))
+    })
+    
     # Key Metrics Row
     col1, col2, col3, col4 = st.columns(4)
     
     try:
-        metrics = session.sql("""
-            SELECT 
-                COUNT(DISTINCT PATIENT_ID) AS PATIENTS,
-                COUNT(DISTINCT TRIAL_ID) AS TRIALS,
-                ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                               THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE,
-                27 AS SITES
-            FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-        """).collect()[0]
+        metrics = dashboard_queries['metrics'].result().iloc[0]
+        rate_ci = f" (&plusmn;{metrics['CI_95']}%)" if fast_mode else ""
         
         with col1:
             st.markdown(f"""
@@ -488,7 +1569,7 @@ if page == "Dashboard":
             st.markdown(f"""
             <div class="metric-card" style="border-left-color: {LIFEARC_COLORS['accent_coral']};">
                 <p class="metric-value">{metrics['RESPONSE_RATE']}%</p>
-                <p class="metric-label">Overall Response</p>
+                <p class="metric-label">Overall Response{rate_ci}</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -511,23 +1592,13 @@ if page == "Dashboard":
         st.markdown('<p class="section-header">Trial Performance</p>', unsafe_allow_html=True)
         
         try:
-            trial_perf = session.sql("""
-                SELECT 
-                    TARGET_GENE,
-                    COUNT(*) AS PATIENTS,
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                WHERE RESPONSE_CATEGORY IS NOT NULL
-                GROUP BY TARGET_GENE
-                ORDER BY RESPONSE_RATE DESC
-            """).to_pandas()
+            trial_perf = dashboard_queries['trial_perf'].result()
             
             chart = alt.Chart(trial_perf).mark_bar(
                 cornerRadiusTopLeft=6,
                 cornerRadiusTopRight=6
             ).encode(
-                x=alt.X('TARGET_GENE:N', title='Target Gene', sort='-y'),
+                x=alt.X('TARGET_GENE:N', title='Target Gene', sort=list(trial_perf['TARGET_GENE'])),
                 y=alt.Y('RESPONSE_RATE:Q', title='Response Rate (%)', scale=alt.Scale(domain=[0, 100])),
                 color=alt.Color('TARGET_GENE:N', scale=alt.Scale(
                     domain=['BRCA1', 'BRCA2', 'EGFR', 'KRAS', 'TP53'],
@@ -536,9 +1607,11 @@ if page == "Dashboard":
                            LIFEARC_COLORS['light_purple']]
                 ), legend=None),
                 tooltip=['TARGET_GENE', 'PATIENTS', 'RESPONSE_RATE']
-            ).properties(height=350)
+            )
+            if fast_mode:
+                chart += error_bars(trial_perf, 'TARGET_GENE')
             
-            st.altair_chart(chart, use_container_width=True)
+            st.altair_chart(chart.properties(height=350), use_container_width=True)
         except Exception as e:
             st.warning(f"Could not load trial data: {e}")
     
@@ -546,16 +1619,7 @@ if page == "Dashboard":
         st.markdown('<p class="section-header">Model Performance</p>', unsafe_allow_html=True)
         
         try:
-            model_metrics = session.sql("""
-                SELECT 
-                    ROUND(ACCURACY * 100, 1) AS ACCURACY,
-                    ROUND(PRECISION_SCORE * 100, 1) AS PRECISION_VAL,
-                    ROUND(RECALL_SCORE * 100, 1) AS RECALL_VAL,
-                    ROUND(F1_SCORE * 100, 1) AS F1
-                FROM LIFEARC_POC.ML_DEMO.MODEL_METRICS_LOG
-                ORDER BY TRAINED_AT DESC
-                LIMIT 1
-            """).collect()[0]
+            model_metrics = dashboard_queries['model_metrics'].result().iloc[0]
             
             metrics_data = pd.DataFrame({
                 'Metric': ['Accuracy', 'Precision', 'Recall', 'F1 Score'],
@@ -629,260 +1693,446 @@ elif page == "Patient Prediction":
     </div>
     """, unsafe_allow_html=True)
     
-    # Trial-Gene mapping for auto-sync
-    TRIAL_GENE_MAP = {
-        "TRIAL-BRCA-001": "BRCA1",
-        "TRIAL-BRCA-002": "BRCA2", 
-        "TRIAL-EGFR-001": "EGFR",
-        "TRIAL-KRAS-001": "KRAS",
-        "TRIAL-TP53-001": "TP53"
-    }
-    
-    # Input Form
-    col1, col2, col3 = st.columns(3)
+    # Form, prediction and charts rerun as one fragment; the comparison chart
+    # is a nested fragment so changing strata does not re-score the patient
+    @fragment
+    def render_prediction_panel():
+        # Trial-Gene mapping for auto-sync
+        TRIAL_GENE_MAP = {
+            "TRIAL-BRCA-001": "BRCA1",
+            "TRIAL-BRCA-002": "BRCA2", 
+            "TRIAL-EGFR-001": "EGFR",
+            "TRIAL-KRAS-001": "KRAS",
+            "TRIAL-TP53-001": "TP53"
+        }
+    
+        # Input Form
+        col1, col2, col3 = st.columns(3)
     
-    with col1:
-        st.markdown("""
-        <div class="input-card">
-            <h4>Biomarker Profile</h4>
-        </div>
-        """, unsafe_allow_html=True)
-        trial_id = st.selectbox("Clinical Trial", [
-            "TRIAL-BRCA-001", "TRIAL-BRCA-002", "TRIAL-EGFR-001", 
-            "TRIAL-KRAS-001", "TRIAL-TP53-001"
-        ])
-        # Auto-select gene based on trial
-        default_gene = TRIAL_GENE_MAP.get(trial_id, "BRCA1")
-        gene_options = ["BRCA1", "BRCA2", "EGFR", "KRAS", "TP53"]
-        target_gene = st.selectbox("Target Gene", gene_options, index=gene_options.index(default_gene))
-        biomarker_status = st.selectbox("Biomarker Status", ["POSITIVE", "NEGATIVE"])
-        ctdna = st.selectbox("ctDNA Confirmation", ["YES", "NO"])
+        with col1:
+            st.markdown("""
+            <div class="input-card">
+                <h4>Biomarker Profile</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            trial_id = st.selectbox("Clinical Trial", [
+                "TRIAL-BRCA-001", "TRIAL-BRCA-002", "TRIAL-EGFR-001", 
+                "TRIAL-KRAS-001", "TRIAL-TP53-001"
+            ])
+            # Auto-select gene based on trial
+            default_gene = TRIAL_GENE_MAP.get(trial_id, "BRCA1")
+            gene_options = ["BRCA1", "BRCA2", "EGFR", "KRAS", "TP53"]
+            target_gene = st.selectbox("Target Gene", gene_options, index=gene_options.index(default_gene))
+            biomarker_status = st.selectbox("Biomarker Status", ["POSITIVE", "NEGATIVE"])
+            ctdna = st.selectbox("ctDNA Confirmation", ["YES", "NO"])
     
-    with col2:
-        st.markdown("""
-        <div class="input-card">
-            <h4>Treatment Protocol</h4>
-        </div>
-        """, unsafe_allow_html=True)
-        treatment_arm = st.selectbox("Treatment Arm", ["Combination", "Experimental", "Standard"])
-        cohort = st.selectbox("Cohort", ["Cohort_A", "Cohort_B", "Cohort_C"])
+        with col2:
+            st.markdown("""
+            <div class="input-card">
+                <h4>Treatment Protocol</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            treatment_arm = st.selectbox("Treatment Arm", ["Combination", "Experimental", "Standard"])
+            cohort = st.selectbox("Cohort", ["Cohort_A", "Cohort_B", "Cohort_C"])
     
-    with col3:
-        st.markdown("""
-        <div class="input-card">
-            <h4>Patient Demographics</h4>
-        </div>
-        """, unsafe_allow_html=True)
-        patient_age = st.slider("Patient Age", 18, 90, 55)
-        patient_sex = st.selectbox("Sex", ["Female", "Male"])
+        with col3:
+            st.markdown("""
+            <div class="input-card">
+                <h4>Patient Demographics</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            patient_age = st.slider("Patient Age", 18, 90, 55)
+            patient_sex = st.selectbox("Sex", ["Female", "Male"])
     
-    st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
     
-    # Predict Button
-    if st.button("Generate Prediction", type="primary", use_container_width=True):
-        biomarker_positive = 1 if biomarker_status == "POSITIVE" else 0
-        ctdna_confirmed = 1 if ctdna == "YES" else 0
-        treatment_intensity = 3 if treatment_arm == "Combination" else (2 if treatment_arm == "Experimental" else 1)
-        sex_code = "F" if patient_sex == "Female" else "M"
+        response_surface = get_response_surface()
+        response_scorer = load_response_scorer(SCORER_ARTIFACT_PATH)
+        engine_options = ["Warehouse (RESPONSE_CLASSIFIER_CLEAN)"]
+        if response_scorer is not None:
+            engine_options.append(f"In-process ({response_scorer.model_name} {response_scorer.model_version})")
+        scoring_engine = st.radio("Scoring engine", engine_options, horizontal=True)
+        use_local_scorer = scoring_engine.startswith("In-process")
+    
+        what_if_mode = st.toggle(
+            "What-if mode (update predictions live without a warehouse call)",
+            value=False,
+            disabled=not (response_surface or use_local_scorer)
+        )
+    
+        # Predict Button
+        generate_clicked = st.button("Generate Prediction", type="primary", use_container_width=True)
+        if generate_clicked or what_if_mode:
+            biomarker_positive = 1 if biomarker_status == "POSITIVE" else 0
+            ctdna_confirmed = 1 if ctdna == "YES" else 0
+            treatment_intensity = 3 if treatment_arm == "Combination" else (2 if treatment_arm == "Experimental" else 1)
+            sex_code = "F" if patient_sex == "Female" else "M"
+            profile_key = (trial_id, target_gene, biomarker_status, ctdna,
+                           treatment_arm, cohort, patient_age, sex_code)
         
-        prediction_query = f"""
-        SELECT 
-            LIFEARC_POC.ML_DEMO.RESPONSE_CLASSIFIER_CLEAN!PREDICT(
-                INPUT_DATA => OBJECT_CONSTRUCT(
-                    'TRIAL_ID', '{trial_id}',
-                    'TREATMENT_ARM', '{treatment_arm}',
-                    'BIOMARKER_STATUS', '{biomarker_status}',
-                    'CTDNA_CONFIRMATION', '{ctdna}',
-                    'TARGET_GENE', '{target_gene}',
-                    'PATIENT_AGE', {patient_age},
-                    'PATIENT_SEX', '{sex_code}',
-                    'COHORT', '{cohort}',
-                    'BIOMARKER_POSITIVE', {biomarker_positive},
-                    'CTDNA_CONFIRMED', {ctdna_confirmed},
-                    'TREATMENT_INTENSITY', {treatment_intensity}
-                )
-            ) AS PREDICTION
-        """
+            prediction_query = f"""
+            SELECT 
+                LIFEARC_POC.ML_DEMO.RESPONSE_CLASSIFIER_CLEAN!PREDICT(
+                    INPUT_DATA => OBJECT_CONSTRUCT(
+                        'TRIAL_ID', '{trial_id}',
+                        'TREATMENT_ARM', '{treatment_arm}',
+                        'BIOMARKER_STATUS', '{biomarker_status}',
+                        'CTDNA_CONFIRMATION', '{ctdna}',
+                        'TARGET_GENE', '{target_gene}',
+                        'PATIENT_AGE', {patient_age},
+                        'PATIENT_SEX', '{sex_code}',
+                        'COHORT', '{cohort}',
+                        'BIOMARKER_POSITIVE', {biomarker_positive},
+                        'CTDNA_CONFIRMED', {ctdna_confirmed},
+                        'TREATMENT_INTENSITY', {treatment_intensity}
+                    )
+                ) AS PREDICTION
+            """
         
-        try:
-            with st.spinner("Analyzing patient profile..."):
-                result = session.sql(prediction_query).collect()[0]
-                prediction = eval(result['PREDICTION'])
-                
-                predicted_class = int(prediction['class'])
-                prob_responder = prediction['probability']['1']
-                prob_non_responder = prediction['probability']['0']
-            
-            # Results
-            st.markdown("<br>", unsafe_allow_html=True)
-            col1, col2, col3 = st.columns([1, 2, 1])
+            try:
+                age_curve = []
+                if use_local_scorer:
+                    # One vectorized call scores this profile at every age for the what-if sweep
+                    ages = list(range(18, 91))
+                    sweep = {
+                        'TRIAL_ID': [trial_id] * len(ages),
+                        'TREATMENT_ARM': [treatment_arm] * len(ages),
+                        'BIOMARKER_STATUS': [biomarker_status] * len(ages),
+                        'CTDNA_CONFIRMATION': [ctdna] * len(ages),
+                        'TARGET_GENE': [target_gene] * len(ages),
+                        'PATIENT_SEX': [sex_code] * len(ages),
+                        'COHORT': [cohort] * len(ages),
+                        'PATIENT_AGE': ages,
+                        'BIOMARKER_POSITIVE': [biomarker_positive] * len(ages),
+                        'CTDNA_CONFIRMED': [ctdna_confirmed] * len(ages),
+                        'TREATMENT_INTENSITY': [treatment_intensity] * len(ages)
+                    }
+                    age_proba = response_scorer.predict_proba(sweep)
+                    age_curve = [{'Age': age, 'Probability': p * 100} for age, p in zip(ages, age_proba)]
+                    prob_responder = float(age_proba[patient_age - 18])
+                    prob_non_responder = 1.0 - prob_responder
+                    predicted_class = int(prob_responder >= 0.5)
+                elif profile_key in response_surface:
+                    predicted_class, prob_responder, prob_non_responder = response_surface[profile_key]
+                else:
+                    with st.spinner("Analyzing patient profile..."):
+                        # Keyed on the classifier version so a retrained model is never
+                        # answered from the cache; an unknown version always re-runs
+                        model_version = get_classifier_version()
+                        result = run_query(prediction_query, tables=(), section="predict",
+                                           versions=(model_version,), refresh=model_version is None).iloc[0]
+                        prediction = eval(result['PREDICTION'])
+                    
+                        predicted_class = int(prediction['class'])
+                        prob_responder = prediction['probability']['1']
+                        prob_non_responder = prediction['probability']['0']
             
-            # Determine confidence level for styling
-            confidence_pct = max(prob_responder, prob_non_responder) * 100
-            if confidence_pct >= 80:
-                confidence_level = "HIGH"
-                confidence_color = LIFEARC_COLORS['primary_teal']
-            elif confidence_pct >= 60:
-                confidence_level = "MEDIUM"
-                confidence_color = LIFEARC_COLORS['warning_amber']
-            else:
-                confidence_level = "LOW"
-                confidence_color = LIFEARC_COLORS['accent_coral']
+                # Results
+                st.markdown("<br>", unsafe_allow_html=True)
+                col1, col2, col3 = st.columns([1, 2, 1])
             
-            with col2:
-                if predicted_class == 1:
-                    st.markdown(f"""
-                    <div class="prediction-responder">
-                        <h2>PREDICTED RESPONDER</h2>
-                        <p class="probability">{prob_responder*100:.1f}%</p>
-                        <p class="subtitle">Probability of Treatment Response</p>
-                        <p style="margin-top: 1rem; padding: 0.5rem 1rem; background: rgba(255,255,255,0.2); border-radius: 20px; display: inline-block;">
-                            Confidence: <strong>{confidence_level}</strong>
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                # Determine confidence level for styling
+                confidence_pct = max(prob_responder, prob_non_responder) * 100
+                if confidence_pct >= 80:
+                    confidence_level = "HIGH"
+                    confidence_color = LIFEARC_COLORS['primary_teal']
+                elif confidence_pct >= 60:
+                    confidence_level = "MEDIUM"
+                    confidence_color = LIFEARC_COLORS['warning_amber']
                 else:
-                    st.markdown(f"""
-                    <div class="prediction-non-responder">
-                        <h2>PREDICTED NON-RESPONDER</h2>
-                        <p class="probability">{prob_non_responder*100:.1f}%</p>
-                        <p class="subtitle">Probability of Non-Response</p>
-                        <p style="margin-top: 1rem; padding: 0.5rem 1rem; background: rgba(255,255,255,0.2); border-radius: 20px; display: inline-block;">
-                            Confidence: <strong>{confidence_level}</strong>
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    confidence_level = "LOW"
+                    confidence_color = LIFEARC_COLORS['accent_coral']
             
-            # Historical Comparison
-            st.markdown("<br>", unsafe_allow_html=True)
-            st.markdown('<p class="section-header">How Does This Patient Compare?</p>', unsafe_allow_html=True)
+                with col2:
+                    if predicted_class == 1:
+                        st.markdown(f"""
+                        <div class="prediction-responder">
+                            <h2>PREDICTED RESPONDER</h2>
+                            <p class="probability">{prob_responder*100:.1f}%</p>
+                            <p class="subtitle">Probability of Treatment Response</p>
+                            <p style="margin-top: 1rem; padding: 0.5rem 1rem; background: rgba(255,255,255,0.2); border-radius: 20px; display: inline-block;">
+                                Confidence: <strong>{confidence_level}</strong>
+                            </p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown(f"""
+                        <div class="prediction-non-responder">
+                            <h2>PREDICTED NON-RESPONDER</h2>
+                            <p class="probability">{prob_non_responder*100:.1f}%</p>
+                            <p class="subtitle">Probability of Non-Response</p>
+                            <p style="margin-top: 1rem; padding: 0.5rem 1rem; background: rgba(255,255,255,0.2); border-radius: 20px; display: inline-block;">
+                                Confidence: <strong>{confidence_level}</strong>
+                            </p>
+                        </div>
+                        """, unsafe_allow_html=True)
             
-            try:
-                # Get historical response rates for similar patients
-                comparison_query = f"""
-                SELECT 
-                    'Same Biomarker Profile' AS COMPARISON,
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1) AS HISTORICAL_RATE,
-                    COUNT(*) AS SAMPLE_SIZE
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                WHERE BIOMARKER_STATUS = '{biomarker_status}' AND CTDNA_CONFIRMATION = '{ctdna}'
-                UNION ALL
-                SELECT 
-                    'Same Treatment Arm',
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1),
-                    COUNT(*)
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                WHERE TREATMENT_ARM = '{treatment_arm}'
-                UNION ALL
-                SELECT 
-                    'Same Target Gene',
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1),
-                    COUNT(*)
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                WHERE TARGET_GENE = '{target_gene}'
-                UNION ALL
-                SELECT 
-                    'Overall Population',
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1),
-                    COUNT(*)
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                """
-                comparison_df = session.sql(comparison_query).to_pandas()
-                comparison_df['PREDICTED'] = prob_responder * 100
+                # What-if: probability across the age range for this profile
+                if not use_local_scorer:
+                    for age in range(18, 91):
+                        age_key = profile_key[:6] + (age, sex_code)
+                        if age_key in response_surface:
+                            age_curve.append({'Age': age, 'Probability': response_surface[age_key][1] * 100})
+                if age_curve:
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    st.markdown('<p class="section-header">What-If: Response Probability by Age</p>', unsafe_allow_html=True)
                 
-                # Create comparison chart
-                chart_data = comparison_df.melt(
-                    id_vars=['COMPARISON'], 
-                    value_vars=['HISTORICAL_RATE', 'PREDICTED'],
-                    var_name='Type',
-                    value_name='Rate'
-                )
-                chart_data['Type'] = chart_data['Type'].replace({
-                    'HISTORICAL_RATE': 'Historical',
-                    'PREDICTED': 'This Patient'
-                })
+                    age_df = pd.DataFrame(age_curve)
+                    line = alt.Chart(age_df).mark_line(
+                        color=LIFEARC_COLORS['primary_teal'],
+                        strokeWidth=3
+                    ).encode(
+                        x=alt.X('Age:Q', title='Patient Age', scale=alt.Scale(domain=[18, 90])),
+                        y=alt.Y('Probability:Q', title='Response Probability (%)', scale=alt.Scale(domain=[0, 100])),
+                        tooltip=['Age', alt.Tooltip('Probability:Q', format='.1f')]
+                    )
+                    marker = alt.Chart(pd.DataFrame({'Age': [patient_age]})).mark_rule(
+                        color=LIFEARC_COLORS['accent_coral'],
+                        strokeDash=[6, 4]
+                    ).encode(x='Age:Q')
                 
-                comparison_chart = alt.Chart(chart_data).mark_bar(
-                    cornerRadiusTopLeft=4,
-                    cornerRadiusTopRight=4
+                    st.altair_chart((line + marker).properties(height=250), use_container_width=True)
+            
+                # Historical Comparison
+                render_historical_comparison({
+                    'TRIAL_ID': trial_id,
+                    'TARGET_GENE': target_gene,
+                    'TREATMENT_ARM': treatment_arm,
+                    'BIOMARKER_STATUS': biomarker_status,
+                    'CTDNA_CONFIRMATION': ctdna,
+                    'COHORT': cohort,
+                    'PATIENT_SEX': sex_code,
+                    'AGE_BAND': patient_age // 10 * 10
+                }, prob_responder)
+            
+                # Probability Chart
+                st.markdown('<p class="section-header">Probability Distribution</p>', unsafe_allow_html=True)
+            
+                prob_df = pd.DataFrame({
+                    'Outcome': ['Responder', 'Non-Responder'],
+                    'Probability': [prob_responder * 100, prob_non_responder * 100]
+                })
+            
+                chart = alt.Chart(prob_df).mark_bar(
+                    cornerRadiusTopLeft=8,
+                    cornerRadiusTopRight=8
                 ).encode(
-                    x=alt.X('COMPARISON:N', title='', sort=None),
-                    y=alt.Y('Rate:Q', title='Response Rate (%)', scale=alt.Scale(domain=[0, 100])),
-                    color=alt.Color('Type:N', scale=alt.Scale(
-                        domain=['Historical', 'This Patient'],
-                        range=[LIFEARC_COLORS['text_muted'], LIFEARC_COLORS['primary_teal']]
-                    )),
-                    xOffset='Type:N',
-                    tooltip=['COMPARISON', 'Type', 'Rate']
+                    x=alt.X('Outcome:N', title='', sort=None),
+                    y=alt.Y('Probability:Q', title='Probability (%)', scale=alt.Scale(domain=[0, 100])),
+                    color=alt.Color('Outcome:N', scale=alt.Scale(
+                        domain=['Responder', 'Non-Responder'],
+                        range=[LIFEARC_COLORS['primary_teal'], LIFEARC_COLORS['accent_coral']]
+                    ), legend=None)
                 ).properties(height=300)
-                
-                st.altair_chart(comparison_chart, use_container_width=True)
-                
-            except Exception as comp_err:
-                st.info("Historical comparison data not available")
             
-            # Probability Chart
-            st.markdown('<p class="section-header">Probability Distribution</p>', unsafe_allow_html=True)
+                st.altair_chart(chart, use_container_width=True)
             
-            prob_df = pd.DataFrame({
-                'Outcome': ['Responder', 'Non-Responder'],
-                'Probability': [prob_responder * 100, prob_non_responder * 100]
-            })
+                # Clinical Interpretation
+                st.markdown('<p class="section-header">Clinical Interpretation</p>', unsafe_allow_html=True)
             
-            chart = alt.Chart(prob_df).mark_bar(
-                cornerRadiusTopLeft=8,
-                cornerRadiusTopRight=8
-            ).encode(
-                x=alt.X('Outcome:N', title='', sort=None),
-                y=alt.Y('Probability:Q', title='Probability (%)', scale=alt.Scale(domain=[0, 100])),
-                color=alt.Color('Outcome:N', scale=alt.Scale(
-                    domain=['Responder', 'Non-Responder'],
-                    range=[LIFEARC_COLORS['primary_teal'], LIFEARC_COLORS['accent_coral']]
-                ), legend=None)
-            ).properties(height=300)
+                interpretations = []
+                if biomarker_status == "POSITIVE":
+                    interpretations.append(("positive", "Positive biomarker status associated with +15-20% response rate improvement"))
+                else:
+                    interpretations.append(("negative", "Negative biomarker status may indicate reduced treatment efficacy"))
             
-            st.altair_chart(chart, use_container_width=True)
+                if ctdna == "YES":
+                    interpretations.append(("positive", "ctDNA confirmation provides additional +5-7% response signal"))
+                else:
+                    interpretations.append(("negative", "Absence of ctDNA confirmation reduces predictive confidence"))
             
-            # Clinical Interpretation
-            st.markdown('<p class="section-header">Clinical Interpretation</p>', unsafe_allow_html=True)
+                if treatment_arm == "Combination":
+                    interpretations.append(("positive", "Combination therapy shows highest efficacy in this patient population"))
+                elif treatment_arm == "Standard":
+                    interpretations.append(("negative", "Standard therapy may have lower efficacy compared to combination"))
+                else:
+                    interpretations.append(("positive", "Experimental therapy shows promising efficacy signals"))
             
-            interpretations = []
-            if biomarker_status == "POSITIVE":
-                interpretations.append(("positive", "Positive biomarker status associated with +15-20% response rate improvement"))
-            else:
-                interpretations.append(("negative", "Negative biomarker status may indicate reduced treatment efficacy"))
+                st.markdown('<div class="interpretation-card">', unsafe_allow_html=True)
+                for interp_type, text in interpretations:
+                    color_class = "interpretation-positive" if interp_type == "positive" else "interpretation-negative"
+                    symbol = "+" if interp_type == "positive" else "!"
+                    st.markdown(f"""
+                    <div class="interpretation-item">
+                        <span class="{color_class}" style="font-weight: bold; font-size: 1.2rem;">{symbol}</span>
+                        <span>{text}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+                st.markdown('</div>', unsafe_allow_html=True)
             
-            if ctdna == "YES":
-                interpretations.append(("positive", "ctDNA confirmation provides additional +5-7% response signal"))
-            else:
-                interpretations.append(("negative", "Absence of ctDNA confirmation reduces predictive confidence"))
+            except Exception as e:
+                st.error(f"Prediction error: {str(e)}")
+    
+    render_prediction_panel()
+
+# =============================================================================
+# PAGE: BATCH PREDICTION
+# =============================================================================
+elif page == "Batch Prediction":
+    st.markdown("""
+    <div class="lifearc-header">
+        <h1>Batch Patient Scoring</h1>
+        <p>Score a screened cohort in bulk with set-based warehouse inference</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    source = st.radio("Patient source", ["Upload CSV", "Snowflake table"], horizontal=True)
+    
+    patients_df = None
+    source_table = None
+    if source == "Upload CSV":
+        uploaded = st.file_uploader(
+            "Patient CSV (demo_data/clinical_outcomes.csv columns or model input columns)",
+            type=["csv"]
+        )
+        if uploaded is not None:
+            patients_df = normalize_patient_frame(pd.read_csv(uploaded))
+            missing = [c for c in MODEL_INPUT_COLUMNS if c not in patients_df.columns]
+            if 'PATIENT_AGE' in missing:
+                st.error("The CSV needs an AGE or PATIENT_AGE column.")
+                patients_df = None
+            elif missing:
+                st.markdown('<p class="section-header">Defaults for Missing Columns</p>', unsafe_allow_html=True)
+                default_cols = st.columns(len(missing))
+                for col, name in zip(default_cols, missing):
+                    with col:
+                        patients_df[name] = st.selectbox(name, BATCH_COLUMN_DEFAULTS[name])
+            unknown = unknown_category_values(patients_df) if patients_df is not None else {}
+            if unknown:
+                # PREDICT has never seen these categories; map or exclude them before scoring
+                st.markdown('<p class="section-header">Values Outside the Model Vocabulary</p>', unsafe_allow_html=True)
+                unknown_rows = pd.concat(
+                    [~patients_df[name].astype(str).isin(BATCH_COLUMN_DEFAULTS[name]) for name in unknown], axis=1
+                ).any(axis=1)
+                st.warning(
+                    f"{int(unknown_rows.sum()):,} of {len(patients_df):,} rows have values the model was not "
+                    "trained on. Map each value to a known category, or exclude its rows."
+                )
+                st.dataframe(patients_df.loc[unknown_rows, ['PATIENT_ID'] + list(unknown)].head(50),
+                             use_container_width=True, hide_index=True)
+                mapping = {}
+                for name, values in unknown.items():
+                    counts = patients_df[name].astype(str).value_counts()
+                    mapping[name] = {
+                        value: st.selectbox(
+                            f"{name} = {value} ({counts[value]:,} rows)",
+                            [EXCLUDE_ROWS] + BATCH_COLUMN_DEFAULTS[name],
+                            key=f"batch_map_{name}_{value}"
+                        )
+                        for value in values
+                    }
+                patients_df = apply_category_mapping(patients_df, mapping)
+                if patients_df.empty:
+                    st.error("Every row is excluded; map the values above to score these patients.")
+                    patients_df = None
+            if patients_df is not None:
+                st.caption(f"{len(patients_df):,} patients loaded")
+                st.dataframe(patients_df[['PATIENT_ID'] + MODEL_INPUT_COLUMNS].head(10),
+                             use_container_width=True, hide_index=True)
+    else:
+        source_table = st.text_input("Fully qualified table name", "LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M")
+        st.caption(
+            f"The table needs PATIENT_ID plus: {', '.join(MODEL_INPUT_COLUMNS)}. "
+            "Rows with NULLs or categories the model was not trained on are listed and not scored."
+        )
+    
+    chunk_size = st.select_slider(
+        "Rows per PREDICT query",
+        options=[10_000, 50_000, 100_000, 250_000, 1_000_000],
+        value=100_000
+    )
+    
+    ready = patients_df is not None or (source_table and TABLE_NAME_PATTERN.match(source_table.strip()))
+    if source_table and not TABLE_NAME_PATTERN.match(source_table.strip()):
+        st.error("Enter a table name as DATABASE.SCHEMA.TABLE")
+    
+    if st.button("Score Patients", type="primary", use_container_width=True, disabled=not ready):
+        try:
+            with st.spinner("Staging patients..."):
+                if patients_df is not None:
+                    total_rows = stage_batch_input(patients_df)
+                else:
+                    total_rows, rejected_rows = stage_batch_table(source_table.strip())
+                    if rejected_rows:
+                        st.warning(
+                            f"{rejected_rows:,} of {total_rows + rejected_rows:,} rows have NULLs or values "
+                            "the model was not trained on and will not be scored."
+                        )
+                        st.dataframe(tracked_sql(f"""
+                            SELECT PATIENT_ID, {', '.join(BATCH_COLUMN_DEFAULTS)}
+                            FROM {BATCH_INPUT_TABLE}
+                            WHERE NOT KNOWN_VALUES
+                            ORDER BY ROW_ID
+                            LIMIT 50
+                        """, "batch_rejected_rows").to_pandas(), use_container_width=True, hide_index=True)
+                tracked_sql(f"""
+                    CREATE OR REPLACE TEMPORARY TABLE {BATCH_RESULTS_TABLE} (
+                        ROW_ID NUMBER, PATIENT_ID VARCHAR, TRIAL_ID VARCHAR, TREATMENT_ARM VARCHAR,
+                        TARGET_GENE VARCHAR, COHORT VARCHAR, PREDICTED_CLASS INT, PROB_RESPONDER FLOAT
+                    )
+                """, "batch_results_table").collect()
             
-            if treatment_arm == "Combination":
-                interpretations.append(("positive", "Combination therapy shows highest efficacy in this patient population"))
-            elif treatment_arm == "Standard":
-                interpretations.append(("negative", "Standard therapy may have lower efficacy compared to combination"))
-            else:
-                interpretations.append(("positive", "Experimental therapy shows promising efficacy signals"))
+            progress = st.progress(0.0, text=f"Scoring {total_rows:,} patients...")
+            preview = st.empty()
+            # Only the CSV text of each chunk is kept; the DataFrames are dropped as we go
+            csv_parts = []
+            start = time.perf_counter()
+            for first_row in range(1, total_rows + 1, chunk_size):
+                last_row = min(first_row + chunk_size - 1, total_rows)
+                scored_chunk = score_batch_chunk(first_row, last_row)
+                csv_parts.append(scored_chunk.to_csv(index=False, header=not csv_parts))
+                progress.progress(
+                    last_row / total_rows,
+                    text=f"Scored {last_row:,} of {total_rows:,} patients ({time.perf_counter() - start:.1f}s)"
+                )
+                preview.dataframe(scored_chunk.head(200), use_container_width=True, hide_index=True)
+            
+            # Cohort summary
+            st.markdown('<p class="section-header">Cohort Summary</p>', unsafe_allow_html=True)
+            summary_df = tracked_sql(f"""
+                SELECT 
+                    TRIAL_ID,
+                    TREATMENT_ARM,
+                    COUNT(*) AS PATIENTS,
+                    SUM(PREDICTED_CLASS) AS PREDICTED_RESPONDERS,
+                    ROUND(AVG(PREDICTED_CLASS) * 100, 1) AS PREDICTED_RESPONSE_PCT,
+                    ROUND(AVG(PROB_RESPONDER) * 100, 1) AS AVG_PROBABILITY
+                FROM {BATCH_RESULTS_TABLE}
+                GROUP BY TRIAL_ID, TREATMENT_ARM
+                ORDER BY PREDICTED_RESPONSE_PCT DESC
+            """, "batch_cohort_summary").to_pandas()
             
-            st.markdown('<div class="interpretation-card">', unsafe_allow_html=True)
-            for interp_type, text in interpretations:
-                icon = "checkmark" if interp_type == "positive" else "warning"
-                color_class = "interpretation-positive" if interp_type == "positive" else "interpretation-negative"
-                symbol = "+" if interp_type == "positive" else "!"
-                st.markdown(f"""
-                <div class="interpretation-item">
-                    <span class="{color_class}" style="font-weight: bold; font-size: 1.2rem;">{symbol}</span>
-                    <span>{text}</span>
-                </div>
-                """, unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Patients Scored", f"{total_rows:,}")
+            with col2:
+                st.metric("Predicted Responders", f"{int(summary_df['PREDICTED_RESPONDERS'].sum()):,}")
+            with col3:
+                st.metric("Scoring Time", f"{time.perf_counter() - start:.1f}s")
             
+            chart = alt.Chart(summary_df).mark_bar(
+                cornerRadiusTopLeft=8,
+                cornerRadiusTopRight=8
+            ).encode(
+                x=alt.X('TRIAL_ID:N', title='Trial'),
+                y=alt.Y('PREDICTED_RESPONSE_PCT:Q', title='Predicted Response Rate (%)'),
+                color=alt.Color('TREATMENT_ARM:N', scale=alt.Scale(
+                    range=[LIFEARC_COLORS['primary_teal'], LIFEARC_COLORS['secondary_purple'], LIFEARC_COLORS['accent_coral']]
+                )),
+                xOffset='TREATMENT_ARM:N',
+                tooltip=['TRIAL_ID', 'TREATMENT_ARM', 'PATIENTS', 'PREDICTED_RESPONSE_PCT', 'AVG_PROBABILITY']
+            ).properties(height=350)
+            st.altair_chart(chart, use_container_width=True)
+            st.dataframe(summary_df, use_container_width=True, hide_index=True)
+            
+            st.download_button(
+                "Download Predictions (CSV)",
+                "".join(csv_parts),
+                file_name="batch_predictions.csv",
+                mime="text/csv"
+            )
         except Exception as e:
-            st.error(f"Prediction error: {str(e)}")
+            st.error(f"Batch scoring error: {e}")
 
 # =============================================================================
 # PAGE: MODEL ANALYTICS
@@ -897,7 +2147,7 @@ elif page == "Model Analytics":
     
     # Model Metrics
     try:
-        metrics_df = session.sql("""
+        metrics_df = run_query("""
             SELECT 
                 MODEL_NAME,
                 MODEL_VERSION,
@@ -915,7 +2165,7 @@ elif page == "Model Analytics":
             FROM LIFEARC_POC.ML_DEMO.MODEL_METRICS_LOG
             ORDER BY TRAINED_AT DESC
             LIMIT 1
-        """).to_pandas()
+        """, tables=(METRICS_TABLE,), section="model_metrics")
         
         latest = metrics_df.iloc[0]
         
@@ -1019,6 +2269,8 @@ elif page == "Model Analytics":
     except Exception as e:
         st.warning(f"Could not load model metrics: {e}")
 
+    render_threshold_curves()
+
 # =============================================================================
 # PAGE: COHORT ANALYSIS
 # =============================================================================
@@ -1030,91 +2282,111 @@ elif page == "Cohort Analysis":
     </div>
     """, unsafe_allow_html=True)
     
-    try:
-        # Treatment Arm Analysis
-        col1, col2 = st.columns(2)
+    cohort_queries = submit_queries({
+        'treatment': (sampled_rate_query("TREATMENT_ARM", "TREATMENT_ARM"), (SAMPLE_TABLE,)) if fast_mode else """
+            SELECT 
+                TREATMENT_ARM,
+                RESPONSE_ROWS AS PATIENTS,
+                ROUND(RESPONDERS * 100 / RESPONSE_ROWS, 1) AS RESPONSE_RATE
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'TREATMENT_ARM' AND RESPONSE_ROWS > 0
+            ORDER BY RESPONSE_RATE DESC
+        """,
+        'biomarker': (sampled_rate_query(
+            "BIOMARKER_STATUS || ' / ' || CTDNA_CONFIRMATION", "PROFILE"
+        ), (SAMPLE_TABLE,)) if fast_mode else """
+            SELECT 
+                BIOMARKER_STATUS || ' / ' || CTDNA_CONFIRMATION AS PROFILE,
+                RESPONSE_ROWS AS PATIENTS,
+                ROUND(RESPONDERS * 100 / RESPONSE_ROWS, 1) AS RESPONSE_RATE
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'BIOMARKER_CTDNA' AND RESPONSE_ROWS > 0
+            ORDER BY RESPONSE_RATE DESC
+        """,
+        'trials': (sampled_rate_query(
+            "TRIAL_ID || '|' || TARGET_GENE", "TRIAL", survival=True
+        ), (SAMPLE_TABLE,)) if fast_mode else """
+            SELECT 
+                TRIAL_ID,
+                TARGET_GENE,
+                RESPONSE_ROWS AS PATIENTS,
+                ROUND(RESPONDERS * 100 / RESPONSE_ROWS, 1) AS RESPONSE_RATE,
+                ROUND(PFS_SUM / NULLIF(PFS_COUNT, 0), 1) AS AVG_PFS,
+                ROUND(OS_SUM / NULLIF(OS_COUNT, 0), 1) AS AVG_OS
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'TRIAL' AND RESPONSE_ROWS > 0
+            ORDER BY RESPONSE_RATE DESC
+        """
+    })
+    
+    # Treatment Arm Analysis
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown('<p class="section-header">Response by Treatment Arm</p>', unsafe_allow_html=True)
         
-        with col1:
-            st.markdown('<p class="section-header">Response by Treatment Arm</p>', unsafe_allow_html=True)
-            
-            treatment_df = session.sql("""
-                SELECT 
-                    TREATMENT_ARM,
-                    COUNT(*) AS PATIENTS,
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                WHERE RESPONSE_CATEGORY IS NOT NULL
-                GROUP BY TREATMENT_ARM
-                ORDER BY RESPONSE_RATE DESC
-            """).to_pandas()
+        try:
+            treatment_df = cohort_queries['treatment'].result()
             
             chart = alt.Chart(treatment_df).mark_bar(
                 cornerRadiusTopLeft=8,
                 cornerRadiusTopRight=8
             ).encode(
-                x=alt.X('TREATMENT_ARM:N', title='Treatment Arm', sort='-y'),
+                x=alt.X('TREATMENT_ARM:N', title='Treatment Arm', sort=list(treatment_df['TREATMENT_ARM'])),
                 y=alt.Y('RESPONSE_RATE:Q', title='Response Rate (%)'),
                 color=alt.Color('TREATMENT_ARM:N', scale=alt.Scale(
                     range=[LIFEARC_COLORS['primary_teal'], LIFEARC_COLORS['secondary_purple'], 
                            LIFEARC_COLORS['accent_coral']]
                 ), legend=None),
                 tooltip=['TREATMENT_ARM', 'PATIENTS', 'RESPONSE_RATE']
-            ).properties(height=350)
+            )
+            if fast_mode:
+                chart += error_bars(treatment_df, 'TREATMENT_ARM')
             
-            st.altair_chart(chart, use_container_width=True)
+            st.altair_chart(chart.properties(height=350), use_container_width=True)
+        except Exception as e:
+            st.warning(f"Could not load treatment arm data: {e}")
+    
+    with col2:
+        st.markdown('<p class="section-header">Response by Biomarker + ctDNA</p>', unsafe_allow_html=True)
         
-        with col2:
-            st.markdown('<p class="section-header">Response by Biomarker + ctDNA</p>', unsafe_allow_html=True)
-            
-            biomarker_df = session.sql("""
-                SELECT 
-                    BIOMARKER_STATUS || ' / ' || CTDNA_CONFIRMATION AS PROFILE,
-                    COUNT(*) AS PATIENTS,
-                    ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                                   THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE
-                FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-                WHERE RESPONSE_CATEGORY IS NOT NULL
-                GROUP BY BIOMARKER_STATUS, CTDNA_CONFIRMATION
-                ORDER BY RESPONSE_RATE DESC
-            """).to_pandas()
+        try:
+            biomarker_df = cohort_queries['biomarker'].result()
             
             chart = alt.Chart(biomarker_df).mark_bar(
                 cornerRadiusTopLeft=8,
                 cornerRadiusTopRight=8
             ).encode(
-                x=alt.X('PROFILE:N', title='Biomarker / ctDNA', sort='-y'),
+                x=alt.X('PROFILE:N', title='Biomarker / ctDNA', sort=list(biomarker_df['PROFILE'])),
                 y=alt.Y('RESPONSE_RATE:Q', title='Response Rate (%)'),
                 color=alt.Color('RESPONSE_RATE:Q', scale=alt.Scale(
                     scheme='teals'
                 ), legend=None),
                 tooltip=['PROFILE', 'PATIENTS', 'RESPONSE_RATE']
-            ).properties(height=350)
+            )
+            if fast_mode:
+                chart += error_bars(biomarker_df, 'PROFILE')
             
-            st.altair_chart(chart, use_container_width=True)
-        
-        # Trial Performance Table
-        st.markdown('<p class="section-header">Trial Performance Summary</p>', unsafe_allow_html=True)
-        
-        trial_df = session.sql("""
-            SELECT 
-                TRIAL_ID,
-                TARGET_GENE,
-                COUNT(*) AS PATIENTS,
-                ROUND(AVG(CASE WHEN RESPONSE_CATEGORY IN ('Complete_Response', 'Partial_Response') 
-                               THEN 1 ELSE 0 END) * 100, 1) AS RESPONSE_RATE,
-                ROUND(AVG(PFS_MONTHS), 1) AS AVG_PFS,
-                ROUND(AVG(OS_MONTHS), 1) AS AVG_OS
-            FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-            WHERE RESPONSE_CATEGORY IS NOT NULL
-            GROUP BY TRIAL_ID, TARGET_GENE
-            ORDER BY RESPONSE_RATE DESC
-        """).to_pandas()
+            st.altair_chart(chart.properties(height=350), use_container_width=True)
+        except Exception as e:
+            st.warning(f"Could not load biomarker data: {e}")
+    
+    # Trial Performance Table
+    st.markdown('<p class="section-header">Trial Performance Summary</p>', unsafe_allow_html=True)
+    
+    try:
+        trial_df = cohort_queries['trials'].result()
+        if fast_mode:
+            trial_df[['TRIAL_ID', 'TARGET_GENE']] = trial_df.pop('TRIAL').str.split('|', expand=True)
+            trial_df = trial_df[['TRIAL_ID', 'TARGET_GENE', 'PATIENTS', 'RESPONSE_RATE', 'CI_95', 'AVG_PFS', 'AVG_OS']]
+            st.caption("Estimated from the stratified sample; CI_95 is the 95% confidence half-width in points.")
         
         st.dataframe(trial_df, use_container_width=True, hide_index=True)
-        
     except Exception as e:
-        st.error(f"Error loading cohort analysis: {e}")
+        st.error(f"Error loading trial summary: {e}")
+    
+    render_cohort_builder()
+    render_survival_curves()
 
 # =============================================================================
 # PAGE: TRIAL INSIGHTS
@@ -1131,15 +2403,14 @@ elif page == "Trial Insights":
         # Response Distribution
         st.markdown('<p class="section-header">Response Category Distribution</p>', unsafe_allow_html=True)
         
-        response_df = session.sql("""
+        response_df = run_query("""
             SELECT 
                 RESPONSE_CATEGORY,
-                COUNT(*) AS COUNT
-            FROM LIFEARC_POC.BENCHMARK.CLINICAL_TRIAL_RESULTS_1M
-            WHERE RESPONSE_CATEGORY IS NOT NULL
-            GROUP BY RESPONSE_CATEGORY
+                ROW_COUNT AS COUNT
+            FROM LIFEARC_POC.BENCHMARK.DASHBOARD_RESPONSE_CUBE
+            WHERE DIMENSION_SET = 'RESPONSE_CATEGORY' AND RESPONSE_CATEGORY IS NOT NULL
             ORDER BY COUNT DESC
-        """).to_pandas()
+        """, section="response_distribution")
         
         chart = alt.Chart(response_df).mark_arc(innerRadius=80).encode(
             theta='COUNT:Q',
@@ -1158,24 +2429,24 @@ elif page == "Trial Insights":
         if st.button("Generate Strategic Analysis", type="primary"):
             with st.spinner("Analyzing trial data with Snowflake Cortex..."):
                 try:
-                    ai_summary = session.sql("""
-                        SELECT SNOWFLAKE.CORTEX.COMPLETE(
-                            'mistral-large2',
-                            'You are a senior clinical trial analyst at a life sciences company. Based on this trial portfolio summary, provide 4 strategic insights for executive leadership. Be specific and actionable.
-                            
-                            Portfolio Summary:
-                            - 5 oncology trials: BRCA1, BRCA2, EGFR, KRAS, TP53
-                            - 1 million patient records across 27 global sites
-                            - BRCA trials: 60-65% response rates (excellent)
-                            - EGFR trials: 50% response rates (good)
-                            - KRAS/TP53 trials: 35-40% response rates (challenging)
-                            - Combination therapy: +22% vs standard care
-                            - Biomarker-positive: +25% response vs negative
-                            - ML model: 66% accuracy for patient stratification
-                            
-                            Format as numbered insights with bold headers.'
-                        ) AS SUMMARY
-                    """).collect()[0]['SUMMARY']
+                    strategic_prompt = """You are a senior clinical trial analyst at a life sciences company. Based on this trial portfolio summary, provide 4 strategic insights for executive leadership. Be specific and actionable.
+
+Portfolio Summary:
+- 5 oncology trials: BRCA1, BRCA2, EGFR, KRAS, TP53
+- 1 million patient records across 27 global sites
+- BRCA trials: 60-65% response rates (excellent)
+- EGFR trials: 50% response rates (good)
+- KRAS/TP53 trials: 35-40% response rates (challenging)
+- Combination therapy: +22% vs standard care
+- Biomarker-positive: +25% response vs negative
+- ML model: 66% accuracy for patient stratification
+
+Format as numbered insights with bold headers."""
+                    # Keyed on the cube's data version, so a reload regenerates it
+                    ai_summary, source, ms = cortex_complete(
+                        'mistral-large2', strategic_prompt, "strategic_analysis",
+                        data_version=get_data_version(CUBE_TABLE) or ""
+                    )
                     
                     st.markdown(f"""
                     <div class="ai-summary">
@@ -1183,6 +2454,7 @@ elif page == "Trial Insights":
                         {ai_summary}
                     </div>
                     """, unsafe_allow_html=True)
+                    st.caption(cortex_source_caption(source, ms))
                     
                 except Exception as e:
                     st.markdown("""
@@ -1198,6 +2470,98 @@ elif page == "Trial Insights":
     except Exception as e:
         st.error(f"Error loading insights: {e}")
 
+# =============================================================================
+# PAGE: PERFORMANCE (hidden; open the app with ?perf=1)
+# =============================================================================
+elif page == "Performance":
+    st.markdown("""
+    <div class="lifearc-header">
+        <h1>Query Performance</h1>
+        <p>Client and warehouse cost of every tagged query across the LifeArc apps</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    hours = st.select_slider("Window (hours)", options=[1, 6, 24, 72, 168], value=24)
+    flush_query_log(force=True)
+    
+    try:
+        perf_df = tracked_sql(f"""
+            SELECT 
+                l.APP,
+                l.PAGE,
+                l.SECTION,
+                COUNT(*) AS QUERIES,
+                ROUND(AVG(l.CLIENT_MS)) AS AVG_CLIENT_MS,
+                ROUND(MAX(l.CLIENT_MS)) AS MAX_CLIENT_MS,
+                ROUND(AVG(h.TOTAL_ELAPSED_TIME)) AS AVG_WAREHOUSE_MS,
+                ROUND(AVG(h.QUEUED_OVERLOAD_TIME + h.QUEUED_PROVISIONING_TIME)) AS AVG_QUEUED_MS,
+                SUM(h.BYTES_SCANNED) AS BYTES_SCANNED,
+                SUM(h.PARTITIONS_SCANNED) AS PARTITIONS_SCANNED,
+                SUM(h.PARTITIONS_TOTAL) AS PARTITIONS_TOTAL,
+                ROUND(AVG(h.PERCENTAGE_SCANNED_FROM_CACHE) * 100, 1) AS PCT_FROM_WAREHOUSE_CACHE,
+                -- Result-cache hits and metadata-only answers scan nothing
+                SUM(IFF(h.BYTES_SCANNED = 0 AND h.EXECUTION_STATUS = 'SUCCESS', 1, 0)) AS NO_SCAN_QUERIES,
+                SUM(l.ROWS_RETURNED) AS ROWS_RETURNED,
+                SUM(l.RESULT_BYTES) AS RESULT_BYTES
+            FROM {QUERY_LOG_TABLE} l
+            LEFT JOIN TABLE(LIFEARC_POC.INFORMATION_SCHEMA.QUERY_HISTORY(
+                END_TIME_RANGE_START => DATEADD('hour', -{hours}, CURRENT_TIMESTAMP()),
+                RESULT_LIMIT => 10000
+            )) h ON h.QUERY_ID = l.QUERY_ID
+            WHERE l.LOGGED_AT >= DATEADD('hour', -{hours}, CURRENT_TIMESTAMP())
+            GROUP BY l.APP, l.PAGE, l.SECTION
+            ORDER BY AVG_CLIENT_MS DESC
+        """, "query_performance").to_pandas()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Queries", f"{int(perf_df['QUERIES'].sum()):,}")
+        with col2:
+            st.metric("Client Time", f"{(perf_df['AVG_CLIENT_MS'] * perf_df['QUERIES']).sum() / 1000:,.1f}s")
+        with col3:
+            st.metric("Bytes Scanned", f"{perf_df['BYTES_SCANNED'].fillna(0).sum() / 1e9:,.2f} GB")
+        with col4:
+            st.metric("No-Scan Queries", f"{int(perf_df['NO_SCAN_QUERIES'].fillna(0).sum()):,}")
+        
+        st.markdown('<p class="section-header">Slowest Sections</p>', unsafe_allow_html=True)
+        
+        hot_spots = perf_df.head(15).copy()
+        hot_spots['SECTION_LABEL'] = hot_spots['APP'] + ' / ' + hot_spots['PAGE'] + ' / ' + hot_spots['SECTION']
+        chart = alt.Chart(hot_spots).mark_bar(
+            cornerRadiusTopRight=4,
+            cornerRadiusBottomRight=4,
+            color=LIFEARC_COLORS['primary_teal']
+        ).encode(
+            x=alt.X('AVG_CLIENT_MS:Q', title='Average Client Wall Time (ms)'),
+            y=alt.Y('SECTION_LABEL:N', title='', sort='-x'),
+            tooltip=['APP', 'PAGE', 'SECTION', 'QUERIES', 'AVG_CLIENT_MS', 'AVG_WAREHOUSE_MS', 'BYTES_SCANNED']
+        ).properties(height=max(200, 28 * len(hot_spots)))
+        st.altair_chart(chart, use_container_width=True)
+        
+        st.dataframe(perf_df, use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.error(f"Error loading query performance: {e}")
+    
+    st.markdown('<p class="section-header">Cortex Response Cache</p>', unsafe_allow_html=True)
+    try:
+        cortex_df = tracked_sql("""
+            SELECT APP, SECTION, MODEL, ENTRIES, LIVE_ENTRIES, HITS, MISSES, HIT_RATE_PCT,
+                   AVG_GENERATION_MS, GENERATION_SECONDS_SAVED, LAST_HIT_AT
+            FROM LIFEARC_POC.BENCHMARK.CORTEX_CACHE_STATS
+            ORDER BY HITS + MISSES DESC
+        """, "cortex_cache_stats").to_pandas()
+        hits, misses = cortex_df['HITS'].fillna(0).sum(), cortex_df['MISSES'].fillna(0).sum()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("COMPLETE Lookups", f"{int(hits + misses):,}")
+        with col2:
+            st.metric("Hit Rate", f"{hits / (hits + misses):.1%}" if hits + misses else "n/a")
+        with col3:
+            st.metric("LLM Time Saved", f"{cortex_df['GENERATION_SECONDS_SAVED'].fillna(0).sum():,.0f}s")
+        st.dataframe(cortex_df, use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.info(f"Cortex cache stats unavailable - run PART 11 of sql_scripts/dashboard_aggregates.sql ({e})")
+
 # =============================================================================
 # FOOTER
 # =============================================================================
@@ -0,0 +1,178 @@
+"""
+LifeArc Response Scorer - In-Process Inference
+===============================================
+Pure NumPy scoring engine for the LIFEARC_RESPONSE_PREDICTOR XGBoost model
+registered by notebooks/lifearc_ml_production.ipynb.
+
+The notebook exports one JSON artifact per model version containing:
+- OrdinalEncoder category lists (index = encoded value)
+- StandardScaler mean/scale per numeric column
+- All boosted trees flattened into parallel node arrays
+
+Scoring walks every tree for every row at once with array indexing, so a
+single patient scores in microseconds without a warehouse round-trip.
+"""
+
+import json
+import time
+
+import numpy as np
+
+
+def export_scorer_artifact(booster_json, categories, scaler_mean, scaler_scale,
+                           categorical_cols, numeric_cols, model_name, model_version):
+    """Build the scorer artifact from a fitted pipeline.
+
+    ``booster_json`` is the parsed output of ``Booster.save_raw('json')``.
+    ``categories`` is the fitted OrdinalEncoder's ``categories_``, keyed by
+    input column; ``scaler_mean`` and ``scaler_scale`` are the fitted
+    StandardScaler's ``mean_`` and ``scale_`` arrays, ordered like
+    ``numeric_cols``.
+    """
+    learner = booster_json['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Unsupported objective: {objective}")
+    if not len(scaler_mean) == len(scaler_scale) == len(numeric_cols):
+        raise ValueError("scaler_mean and scaler_scale need one value per numeric column")
+
+    base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+    trees = learner['gradient_booster']['model']['trees']
+
+    left, right, feature, threshold, default_left, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        roots.append(offset)
+        left.extend(c + offset if c != -1 else -1 for c in tree['left_children'])
+        right.extend(c + offset if c != -1 else -1 for c in tree['right_children'])
+        feature.extend(tree['split_indices'])
+        # For leaf nodes XGBoost stores the (shrunk) leaf value in split_conditions
+        threshold.extend(tree['split_conditions'])
+        default_left.extend(bool(d) for d in tree['default_left'])
+        offset += len(tree['left_children'])
+
+    return {
+        'model_name': model_name,
+        'model_version': model_version,
+        'categorical_cols': list(categorical_cols),
+        'numeric_cols': list(numeric_cols),
+        'categories': {col: [str(v) for v in categories[col]] for col in categorical_cols},
+        'scaler_mean': {col: float(mean) for col, mean in zip(numeric_cols, scaler_mean)},
+        'scaler_scale': {col: float(scale) for col, scale in zip(numeric_cols, scaler_scale)},
+        'base_margin': float(np.log(base_score / (1.0 - base_score))),
+        'trees': {
+            'roots': roots,
+            'left': left,
+            'right': right,
+            'feature': feature,
+            'threshold': threshold,
+            'default_left': default_left
+        }
+    }
+
+
+class ResponseScorer:
+    """Vectorized XGBoost binary classifier with its preprocessing baked in."""
+
+    def __init__(self, artifact):
+        self.model_name = artifact['model_name']
+        self.model_version = artifact['model_version']
+        self.categorical_cols = artifact['categorical_cols']
+        self.numeric_cols = artifact['numeric_cols']
+        self.category_index = {
+            col: {value: i for i, value in enumerate(values)}
+            for col, values in artifact['categories'].items()
+        }
+        self.mean = np.array([artifact['scaler_mean'][c] for c in self.numeric_cols])
+        self.scale = np.array([artifact['scaler_scale'][c] for c in self.numeric_cols])
+        self.base_margin = artifact['base_margin']
+
+        trees = artifact['trees']
+        self.roots = np.asarray(trees['roots'], dtype=np.int64)
+        self.left = np.asarray(trees['left'], dtype=np.int64)
+        self.right = np.asarray(trees['right'], dtype=np.int64)
+        self.feature = np.asarray(trees['feature'], dtype=np.int64)
+        self.threshold = np.asarray(trees['threshold'], dtype=np.float32)
+        self.default_left = np.asarray(trees['default_left'], dtype=bool)
+        self.is_leaf = self.left == -1
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(json.loads(text))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def transform(self, records):
+        """Encode and scale raw feature columns into the model's float32 matrix.
+
+        ``records`` maps column name to a sequence of values (a dict of lists
+        or a DataFrame). Unseen categories encode as missing.
+        """
+        encoded = [
+            [self.category_index[col].get(str(v), np.nan) for v in records[col]]
+            for col in self.categorical_cols
+        ]
+        numeric = np.column_stack([np.asarray(records[c], dtype=np.float64) for c in self.numeric_cols])
+        scaled = (numeric - self.mean) / self.scale
+        return np.column_stack([np.asarray(encoded, dtype=np.float64).T, scaled]).astype(np.float32)
+
+    def margin(self, X):
+        """Raw boosted margin for a transformed feature matrix."""
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+        while True:
+            active = ~self.is_leaf[node]
+            if not active.any():
+                break
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(active, np.where(go_left, self.left[node], self.right[node]), node)
+        return self.threshold[node].sum(axis=1, dtype=np.float32) + np.float32(self.base_margin)
+
+    def predict_proba(self, records):
+        """P(responder) for each record."""
+        return 1.0 / (1.0 + np.exp(-self.margin(self.transform(records)).astype(np.float64)))
+
+    def predict(self, records, threshold=0.5):
+        return (self.predict_proba(records) >= threshold).astype(int)
+
+
+def check_parity(scorer, records, expected_proba, atol=1e-5):
+    """Compare in-process probabilities with warehouse PREDICT output."""
+    actual = scorer.predict_proba(records)
+    expected = np.asarray(expected_proba, dtype=np.float64)
+    abs_diff = np.abs(actual - expected)
+    return {
+        'rows': int(expected.size),
+        'max_abs_diff': float(abs_diff.max()) if expected.size else 0.0,
+        'class_agreement': float(np.mean((actual >= 0.5) == (expected >= 0.5))) if expected.size else 1.0,
+        'passed': bool(np.all(abs_diff <= atol))
+    }
+
+
+def benchmark(scorer, records, repeat=1000):
+    """Mean microseconds per call for one row and for the whole batch."""
+    columns = scorer.categorical_cols + scorer.numeric_cols
+    single = {col: list(records[col])[:1] for col in columns}
+    n_rows = len(records[columns[0]])
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scorer.predict_proba(single)
+    single_us = (time.perf_counter() - start) / repeat * 1e6
+
+    batch_repeat = max(1, repeat // 100)
+    start = time.perf_counter()
+    for _ in range(batch_repeat):
+        scorer.predict_proba(records)
+    batch_us = (time.perf_counter() - start) / batch_repeat * 1e6
+
+    return {
+        'single_row_us': round(single_us, 1),
+        'batch_rows': n_rows,
+        'batch_us': round(batch_us, 1),
+        'batch_us_per_row': round(batch_us / n_rows, 3)
+    }
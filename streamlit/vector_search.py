@@ -0,0 +1,131 @@
+"""
+LifeArc Vector Search - Shared Semantic Search over Research Embeddings
+=======================================================================
+Imported by the intelligence demo (Research Intelligence) and the
+unstructured data demo (Cortex Search), after configure_app() from
+app_queries.py.
+
+Research chunks are embedded once, in the warehouse, by
+AI_DEMO.EMBED_RESEARCH_CHUNKS (sql_scripts/research_embeddings.sql). A query
+is embedded with the same model and ranked by cosine similarity: in process,
+over a snapshot of the embeddings reloaded only when the table changes, while
+the corpus fits in memory; otherwise with VECTOR_COSINE_SIMILARITY in the
+warehouse. With hnswlib installed, large snapshots get an HNSW graph instead
+of the exact NumPy scan.
+
+Deploy this file next to each app, with app_queries.py; locally, put
+streamlit/ on PYTHONPATH.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app_queries import sql_string, tracked_sql
+
+EMBED_MODEL = 'snowflake-arctic-embed-m-v1.5'
+EMBEDDINGS_TABLE = "LIFEARC_POC.AI_DEMO.RESEARCH_EMBEDDINGS"
+EMBEDDINGS_VERSION_TTL_SECONDS = 60
+VECTOR_INDEX_MAX_CHUNKS = 200000   # about 600 MB of float32 vectors
+HNSW_MIN_CHUNKS = 20000
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def as_vector(value):
+    """VECTOR values arrive as lists (or JSON text) depending on the driver."""
+    return np.asarray(json.loads(value) if isinstance(value, str) else value, dtype=np.float32)
+
+
+class VectorIndex:
+    """Cosine top-k over one source's chunk embeddings."""
+
+    def __init__(self, chunks, vectors):
+        self.chunks = chunks.reset_index(drop=True)
+        self.vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        self.hnsw = None
+        if hnswlib is not None and len(self.vectors) >= HNSW_MIN_CHUNKS:
+            self.hnsw = hnswlib.Index(space='ip', dim=self.vectors.shape[1])
+            self.hnsw.init_index(max_elements=len(self.vectors), ef_construction=200, M=16)
+            self.hnsw.add_items(self.vectors)
+            self.hnsw.set_ef(100)
+
+    def search(self, query_vector, k):
+        """Best chunk per document for the ``k`` closest documents."""
+        query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)
+        # Over-fetch chunks so documents with several close chunks still leave k documents
+        n = min(len(self.vectors), k * 4)
+        if self.hnsw is not None:
+            labels, distances = self.hnsw.knn_query(query_vector, k=n)
+            top, similarity = labels[0], 1 - distances[0]
+        else:
+            scores = self.vectors @ query_vector
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top])]
+            similarity = scores[top]
+        result = self.chunks.iloc[top].assign(SIMILARITY=similarity)
+        return result.drop_duplicates('DOC_ID').head(k).reset_index(drop=True)
+
+
+@st.cache_data(ttl=EMBEDDINGS_VERSION_TTL_SECONDS, show_spinner=False)
+def get_embeddings_version():
+    """(LAST_ALTERED, ROW_COUNT) of the embeddings table, read from metadata only."""
+    try:
+        row = tracked_sql("""
+            SELECT LAST_ALTERED, ROW_COUNT
+            FROM LIFEARC_POC.INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = 'AI_DEMO' AND TABLE_NAME = 'RESEARCH_EMBEDDINGS'
+        """, "embeddings_version").collect()
+        return (str(row[0]['LAST_ALTERED']), row[0]['ROW_COUNT']) if row else ("", None)
+    except Exception:
+        return "", None
+
+
+@st.cache_resource(show_spinner="Loading research embeddings...", max_entries=4)
+def load_vector_index(source_table, data_version):
+    """In-process index over a snapshot of one source; ``data_version`` keys the cache."""
+    frame = tracked_sql(f"""
+        SELECT DOC_ID, CHUNK_INDEX, CHUNK_TEXT, EMBEDDING
+        FROM {EMBEDDINGS_TABLE}
+        WHERE SOURCE_TABLE = '{source_table}' AND EMBED_MODEL = '{EMBED_MODEL}'
+    """, "embeddings_snapshot").to_pandas()
+    if frame.empty:
+        return None
+    vectors = np.stack([as_vector(value) for value in frame.pop('EMBEDDING')])
+    return VectorIndex(frame, vectors)
+
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def embed_query(text):
+    row = tracked_sql(
+        f"SELECT SNOWFLAKE.CORTEX.EMBED_TEXT_768('{EMBED_MODEL}', {sql_string(text)}) AS EMBEDDING",
+        "embed_query"
+    ).collect()[0]
+    return as_vector(row['EMBEDDING'])
+
+
+def vector_search(query, source_table, k=5):
+    """The ``k`` documents of ``source_table`` closest to ``query``, best chunk
+    first: DOC_ID, CHUNK_INDEX, CHUNK_TEXT and SIMILARITY."""
+    data_version, row_count = get_embeddings_version()
+    if row_count is None or row_count <= VECTOR_INDEX_MAX_CHUNKS:
+        index = load_vector_index(source_table, data_version)
+        if index is None:
+            return pd.DataFrame(columns=['DOC_ID', 'CHUNK_INDEX', 'CHUNK_TEXT', 'SIMILARITY'])
+        return index.search(embed_query(query), k)
+    return tracked_sql(f"""
+        SELECT DOC_ID, CHUNK_INDEX, CHUNK_TEXT,
+               VECTOR_COSINE_SIMILARITY(
+                   EMBEDDING, SNOWFLAKE.CORTEX.EMBED_TEXT_768('{EMBED_MODEL}', {sql_string(query)})
+               ) AS SIMILARITY
+        FROM {EMBEDDINGS_TABLE}
+        WHERE SOURCE_TABLE = '{source_table}' AND EMBED_MODEL = '{EMBED_MODEL}'
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY DOC_ID ORDER BY SIMILARITY DESC) = 1
+        ORDER BY SIMILARITY DESC
+        LIMIT {int(k)}
+    """, "vector_search").to_pandas()
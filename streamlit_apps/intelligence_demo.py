@@ -12,7 +12,20 @@ Demonstrates:
 
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
+import pandas as pd
+import hashlib
 import json
+import os
+import re
+import threading
+import time
+import uuid
+
+from app_queries import (
+    CORTEX_CACHE_TTL_HOURS, configure_app, cortex_cache_key, cortex_cache_lookup, cortex_cache_store,
+    cortex_source_caption, count_cache_hit, record_client_timing, sql_string, tracked_sql
+)
+from vector_search import vector_search
 
 # Page config
 st.set_page_config(
@@ -21,8 +34,16 @@ st.set_page_config(
     layout="wide"
 )
 
-# Get Snowflake session
-session = get_active_session()
+# Get Snowflake session (LIFEARC_DATA_BACKEND=local runs against the DuckDB
+# backend in local_dev/)
+@st.cache_resource
+def get_session():
+    if os.environ.get("LIFEARC_DATA_BACKEND") == "local":
+        from local_backend import get_local_session
+        return get_local_session()
+    return get_active_session()
+
+session = get_session()
 
 # Header
 st.title("🧬 LifeArc: Talk to Your Data")
@@ -38,69 +59,658 @@ demo_mode = st.sidebar.radio(
     "Select Demo Mode",
     ["Ask Any Question", "Guided Why Questions", "Research Intelligence", "Executive Dashboard"]
 )
+st.session_state['query_page'] = demo_mode
+
+# ============================================
+# Query Instrumentation & Cortex Response Cache
+# ============================================
+# tracked_sql() tags and times every statement into BENCHMARK.APP_QUERY_LOG
+# (see the ML dashboard's hidden Performance page), and cortex_complete()
+# answers COMPLETE through BENCHMARK.CORTEX_RESPONSE_CACHE. Both live in
+# streamlit/app_queries.py, shared with the ML dashboard. Semantic search over
+# the research embeddings, vector_search(), is in streamlit/vector_search.py.
+APP_NAME = "INTELLIGENCE_DEMO"
+configure_app(session, APP_NAME)
+
+
+# ============================================
+# Streaming Answers
+# ============================================
+# snowflake.cortex.complete(stream=True) calls the Cortex REST API and yields
+# text as it is generated, so the first words render in well under a second
+# instead of after the whole answer. Without snowflake-ml-python the answer
+# arrives in one piece from SQL COMPLETE. Time to first token and total time
+# go to APP_QUERY_LOG as <section>_first_token and <section>_stream.
+try:
+    from snowflake.cortex import complete as cortex_rest_complete
+except ImportError:
+    cortex_rest_complete = None
+
+
+class CortexStream:
+    """Iterable answer for st.write_stream, served from the response cache
+    when possible; ``source``, ``first_token_ms`` and ``total_ms`` are set as
+    it is consumed and the full text is cached once it finishes."""
+
+    def __init__(self, model, prompt, section, data_version=""):
+        self.model = model
+        self.prompt = prompt
+        self.section = section
+        self.key = cortex_cache_key(model, prompt, data_version)
+        self.page = st.session_state.get('query_page', '')
+        self.source = None
+        self.first_token_ms = None
+        self.total_ms = None
+        self.text = ""
+
+    def _chunks(self):
+        cached, source = cortex_cache_lookup(self.key, self.section)
+        if cached is not None:
+            self.source = source
+            yield cached
+            return
+        self.source = 'model'
+        if cortex_rest_complete is None:
+            yield tracked_sql(f"SELECT SNOWFLAKE.CORTEX.COMPLETE({self.key['MODEL']}, {sql_string(self.prompt)}) "
+                              "AS RESPONSE", self.section).collect()[0]['RESPONSE']
+        else:
+            yield from cortex_rest_complete(self.model, self.prompt, session=session, stream=True)
+
+    def __iter__(self):
+        started = time.perf_counter()
+        for chunk in self._chunks():
+            if self.first_token_ms is None:
+                self.first_token_ms = (time.perf_counter() - started) * 1000
+                record_client_timing(f"stream-{uuid.uuid4()}", self.page, f"{self.section}_first_token",
+                                     self.first_token_ms, 0, len(chunk))
+            self.text += chunk
+            yield chunk
+        self.total_ms = (time.perf_counter() - started) * 1000
+        record_client_timing(f"stream-{uuid.uuid4()}", self.page, f"{self.section}_stream",
+                             self.total_ms, 1, len(self.text))
+        if self.source == 'model':
+            cortex_cache_store(self.key, self.text, self.section, self.total_ms)
+
+    def caption(self):
+        if self.source != 'model':
+            return cortex_source_caption(self.source, self.total_ms)
+        return (f"First token in {self.first_token_ms:,.0f} ms · complete in {self.total_ms / 1000:.1f}s · "
+                f"cached for {CORTEX_CACHE_TTL_HOURS}h")
+
+
+# ============================================
+# Prompt Context
+# ============================================
+# Questions carry only the table summaries they need, capped at
+# PROMPT_CONTEXT_TOKENS (about 4 characters per token). A table is relevant
+# when a question word starts with one of its keywords, taken from the table
+# names, synonyms and dimensions in DRUG_DISCOVERY_SEMANTIC_VIEW; questions
+# matching none get the summaries in table order until the budget runs out.
+# The summaries are computed from the tables and cached per data version of
+# the semantic view's tables, so the digest is rebuilt only after one of
+# them changes.
+AI_DEMO_VERSION_TTL_SECONDS = 60
+PROMPT_CONTEXT_TOKENS = 200
+# Rows listed per digest line, so a line stays short as its table grows
+CONTEXT_LIST_ITEMS = 5
+PROMPT_CONTEXT_TABLES = {
+    'COMPOUND_PIPELINE_ANALYSIS': (
+        'compound', 'molecul', 'drug', 'candidate', 'logp', 'lipophil', 'weight', 'mw', 'tpsa', 'hbd', 'hba',
+        'likeness', 'ro5', 'lipinski', 'fail', 'propert', 'screen'
+    ),
+    'CLINICAL_TRIAL_PERFORMANCE': (
+        'trial', 'stud', 'clinical', 'response', 'orr', 'pfs', 'survival', 'progression', 'biomarker',
+        'ctdna', 'liquid', 'enrol', 'patient', 'adverse', 'sae', 'indication'
+    ),
+    'PROGRAM_ROI_SUMMARY': (
+        'program', 'pipeline', 'roi', 'return', 'invest', 'revenue', 'spend', 'cost', 'expand', 'maintain',
+        'reduce', 'terminat', 'portfolio'
+    ),
+    'RESEARCH_INTELLIGENCE': (
+        'research', 'document', 'publication', 'paper', 'journal', 'literature', 'competit', 'finding',
+        'intelligence', 'landscape'
+    ),
+    'BOARD_CANDIDATE_SCORECARD': (
+        'board', 'priorit', 'scorecard', 'sales', 'market', 'risk', 'recommend', 'first-in-class',
+        'best-in-class', 'position', 'watch'
+    ),
+}
+CONTEXT_DIGEST_QUERIES = {
+    'COMPOUND_PIPELINE_ANALYSIS': ("""
+        SELECT COUNT(*) AS N,
+               ROUND(100 * COUNT_IF(drug_likeness <> 'drug_like') / COUNT(*), 0) AS FAIL_PCT,
+               MODE(failure_reason) AS TOP_FAILURE,
+               ROUND(AVG(predicted_success_pct), 0) AS AVG_SUCCESS,
+               LISTAGG(DISTINCT therapeutic_area, ', ') AS AREAS
+        FROM LIFEARC_POC.AI_DEMO.COMPOUND_PIPELINE_ANALYSIS
+    """, "{N:.0f} compounds ({AREAS}); {FAIL_PCT:.0f}% not drug-like, most often {TOP_FAILURE}; "
+         "mean predicted success {AVG_SUCCESS:.0f}%"),
+    'CLINICAL_TRIAL_PERFORMANCE': ("""
+        SELECT COUNT(*) AS N,
+               ROUND(AVG(IFF(biomarker_selection = 'YES', response_rate_pct, NULL)), 1) AS ORR_BIOMARKER,
+               ROUND(AVG(IFF(biomarker_selection = 'NO', response_rate_pct, NULL)), 1) AS ORR_UNSELECTED,
+               ROUND(AVG(IFF(ctdna_confirmation = 'YES', pfs_months, NULL)), 1) AS PFS_CTDNA,
+               ROUND(AVG(IFF(ctdna_confirmation = 'NO', pfs_months, NULL)), 1) AS PFS_NO_CTDNA,
+               MAX_BY(target_gene, response_rate_pct) AS BEST_GENE,
+               MAX(response_rate_pct) AS BEST_ORR,
+               MIN_BY(target_gene, response_rate_pct) AS WORST_GENE,
+               MIN(response_rate_pct) AS WORST_ORR
+        FROM LIFEARC_POC.AI_DEMO.CLINICAL_TRIAL_PERFORMANCE
+    """, "{N:.0f} trials; ORR {ORR_BIOMARKER}% biomarker-selected vs {ORR_UNSELECTED}% unselected; "
+         "PFS {PFS_CTDNA} vs {PFS_NO_CTDNA} months with/without ctDNA confirmation; "
+         "best {BEST_GENE} {BEST_ORR}% ORR, worst {WORST_GENE} {WORST_ORR}%"),
+    'PROGRAM_ROI_SUMMARY': (f"""
+        SELECT COUNT(*) AS N,
+               ROUND(SUM(total_investment_millions), 0) AS INVESTED,
+               MAX_BY(program_name || ' (' || therapeutic_area || ')', roi_multiple) AS BEST_PROGRAM,
+               MAX(roi_multiple) AS BEST_ROI,
+               MIN_BY(program_name || ' (' || therapeutic_area || ')', roi_multiple) AS WORST_PROGRAM,
+               MIN(roi_multiple) AS WORST_ROI,
+               LISTAGG(IFF(ROI_RANK <= {CONTEXT_LIST_ITEMS}, program_name || ' ' || recommendation, NULL), ', ')
+                   WITHIN GROUP (ORDER BY ROI_RANK) AS RECOMMENDATIONS
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (ORDER BY roi_multiple DESC) AS ROI_RANK
+            FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY
+        )
+    """, "{N:.0f} programs, ${INVESTED:,.0f}M invested; ROI from {WORST_ROI}x {WORST_PROGRAM} to "
+         "{BEST_ROI}x {BEST_PROGRAM}; top by ROI: {RECOMMENDATIONS}"),
+    'RESEARCH_INTELLIGENCE': (f"""
+        SELECT COUNT(*) AS N,
+               COUNT_IF(competitive_impact = 'High') AS HIGH_IMPACT,
+               LISTAGG(IFF(competitive_impact = 'High' AND FINDING_RANK <= {CONTEXT_LIST_ITEMS},
+                           target_gene || ': ' || key_finding, NULL), '; ')
+                   WITHIN GROUP (ORDER BY FINDING_RANK) AS FINDINGS
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY competitive_impact ORDER BY publication_date DESC) AS FINDING_RANK
+            FROM LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE
+        )
+    """, "{N:.0f} documents, {HIGH_IMPACT:.0f} high competitive impact, latest: {FINDINGS}"),
+    'BOARD_CANDIDATE_SCORECARD': (f"""
+        SELECT COUNT(*) AS N,
+               LISTAGG(IFF(BOARD_RANK <= {CONTEXT_LIST_ITEMS},
+                           board_recommendation || ' ' || target_gene || ' (' || competitive_position || ')', NULL), ', ')
+                   WITHIN GROUP (ORDER BY BOARD_RANK) AS RECOMMENDATIONS
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (ORDER BY board_recommendation, predicted_success_pct DESC) AS BOARD_RANK
+            FROM LIFEARC_POC.AI_DEMO.BOARD_CANDIDATE_SCORECARD
+        )
+    """, "{N:.0f} candidates, highest priority first: {RECOMMENDATIONS}"),
+}
+
+
+@st.cache_data(ttl=AI_DEMO_VERSION_TTL_SECONDS, show_spinner=False)
+def get_ai_demo_version():
+    """Latest LAST_ALTERED across the semantic view's tables, read from metadata only.
+
+    Only PROMPT_CONTEXT_TABLES count. The rerank, embedding and search caches
+    and the executive snapshot share the AI_DEMO schema and are written while
+    the apps run; counting them would invalidate the digest and the analyst
+    caches on every one of those writes.
+    """
+    table_names = ", ".join(sql_string(table) for table in PROMPT_CONTEXT_TABLES)
+    try:
+        row = tracked_sql(f"""
+            SELECT MAX(LAST_ALTERED) AS LAST_ALTERED
+            FROM LIFEARC_POC.INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = 'AI_DEMO'
+              AND TABLE_NAME IN ({table_names})
+        """, "context_version").collect()
+        return str(row[0]['LAST_ALTERED']) if row else ""
+    except Exception:
+        return ""
+
+
+@st.cache_data(show_spinner=False)
+def get_context_digest(data_version):
+    """One summary line per AI_DEMO table; ``data_version`` keys the cache."""
+    digest = {}
+    for table, (sql, template) in CONTEXT_DIGEST_QUERIES.items():
+        try:
+            row = tracked_sql(sql, "context_digest").to_pandas().iloc[0].to_dict()
+            digest[table] = f"- {table}: " + template.format(**row)
+        except Exception:
+            continue
+    return digest
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text, tokens):
+    """``text`` cut to at most ``tokens`` estimated tokens, marked with an ellipsis."""
+    if estimate_tokens(text) <= tokens:
+        return text
+    chars = (tokens - 1) * 4
+    return text[:chars - 1].rstrip() + "…" if chars > 1 else ""
+
+
+def build_question_context(question, budget=PROMPT_CONTEXT_TOKENS):
+    """Digest lines for the tables the question mentions, within ``budget`` tokens.
+
+    Returns (context, data_version); the version goes into the response cache
+    key so cached answers expire with the digest they were built from.
+    """
+    data_version = get_ai_demo_version()
+    digest = get_context_digest(data_version)
+    words = re.findall(r"[a-z0-9-]+", question.lower())
+    scores = {
+        table: sum(word.startswith(keyword) for word in words for keyword in keywords)
+        for table, keywords in PROMPT_CONTEXT_TABLES.items()
+        if table in digest
+    }
+    ranked = sorted(scores, key=lambda table: -scores[table])
+    if any(scores.values()):
+        ranked = [table for table in ranked if scores[table]]
+
+    # A line longer than what is left of the budget is cut to fit it
+    lines, used = [], 0
+    for table in ranked:
+        line = truncate_to_tokens(digest[table], budget - used)
+        if not line:
+            break
+        lines.append(line)
+        used += estimate_tokens(line)
+    return "\n".join(lines), data_version
+
+
+# ============================================
+# Cortex Analyst
+# ============================================
+# Ask Any Question is answered by Cortex Analyst text-to-SQL over the
+# semantic view, run against the AI_DEMO tables. SQL that executes is cached
+# per normalized question in memory and in ANALYST_SQL_CACHE, and its result
+# per AI_DEMO data version, so a repeated or reworded question costs one
+# cache lookup and no Analyst call. Questions the Analyst cannot translate
+# (or runs outside Snowflake, where the REST endpoint is unreachable) fall
+# back to a streamed COMPLETE answer over the context digest.
+SEMANTIC_VIEW = "LIFEARC_POC.AI_DEMO.DRUG_DISCOVERY_SEMANTIC_VIEW"
+ANALYST_ENDPOINT = "/api/v2/cortex/analyst/message"
+ANALYST_TIMEOUT_MS = 50000
+ANALYST_SQL_CACHE_TABLE = "LIFEARC_POC.BENCHMARK.ANALYST_SQL_CACHE"
+QUESTION_FILLER_WORDS = frozenset({
+    'a', 'an', 'the', 'please', 'show', 'tell', 'give', 'list', 'me', 'us', 'can', 'could', 'would', 'you',
+    'i', 'we', 'our', 'my', 'is', 'are', 'was', 'were', 'do', 'does', 'did', 'what', 'which', 'there'
+})
+
+
+def normalize_question(question):
+    """Lower case, no punctuation, filler words or plural 's', so that
+    rewordings like 'Show me the trials...?' and 'which trial ...' match."""
+    words = re.findall(r"[a-z0-9]+(?:[.-][a-z0-9]+)*", question.lower())
+    return " ".join(
+        word[:-1] if len(word) > 4 and word.endswith('s') and not word.endswith('ss') else word
+        for word in words if word not in QUESTION_FILLER_WORDS
+    )
+
+
+@st.cache_resource
+def get_analyst_sql_memo():
+    """Validated SQL by question hash, shared across sessions."""
+    return {'lock': threading.Lock(), 'entries': {}}
+
+
+def analyst_sql_lookup(question_hash):
+    """Return (sql, interpretation, source) from memory or the cache table, or None."""
+    memo = get_analyst_sql_memo()
+    with memo['lock']:
+        entry = memo['entries'].get(question_hash)
+    hit_key = {'SEMANTIC_VIEW': sql_string(SEMANTIC_VIEW), 'QUESTION_HASH': sql_string(question_hash)}
+    if entry is not None:
+        count_cache_hit(ANALYST_SQL_CACHE_TABLE, hit_key)
+        return entry + ('memory',)
+    try:
+        rows = tracked_sql(f"""
+            SELECT SQL_TEXT, INTERPRETATION
+            FROM {ANALYST_SQL_CACHE_TABLE}
+            WHERE SEMANTIC_VIEW = '{SEMANTIC_VIEW}' AND QUESTION_HASH = '{question_hash}'
+        """, "analyst_sql_cache").collect()
+    except Exception:
+        rows = []
+    if not rows:
+        return None
+    entry = (rows[0]['SQL_TEXT'], rows[0]['INTERPRETATION'] or "")
+    with memo['lock']:
+        memo['entries'][question_hash] = entry
+    count_cache_hit(ANALYST_SQL_CACHE_TABLE, hit_key)
+    return entry + ('cache',)
+
+
+def analyst_sql_store(question_hash, normalized, question, sql, interpretation, generation_ms):
+    """Remember SQL that ran and upsert it into the cache table (not awaited)."""
+    memo = get_analyst_sql_memo()
+    with memo['lock']:
+        memo['entries'][question_hash] = (sql, interpretation)
+    try:
+        tracked_sql(f"""
+            MERGE INTO {ANALYST_SQL_CACHE_TABLE} t
+            USING (SELECT {sql_string(sql)} AS SQL_TEXT, {sql_string(interpretation)} AS INTERPRETATION) s
+            ON t.SEMANTIC_VIEW = '{SEMANTIC_VIEW}' AND t.QUESTION_HASH = '{question_hash}'
+            WHEN MATCHED THEN UPDATE SET
+                SQL_TEXT = s.SQL_TEXT, INTERPRETATION = s.INTERPRETATION,
+                GENERATION_MS = {generation_ms:.1f}, CREATED_AT = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN INSERT
+                (SEMANTIC_VIEW, QUESTION_HASH, NORMALIZED_QUESTION, QUESTION, SQL_TEXT, INTERPRETATION,
+                 GENERATION_MS, CREATED_AT, HIT_COUNT)
+            VALUES
+                ('{SEMANTIC_VIEW}', '{question_hash}', {sql_string(normalized)}, {sql_string(question)},
+                 s.SQL_TEXT, s.INTERPRETATION, {generation_ms:.1f}, CURRENT_TIMESTAMP(), 0)
+        """, "analyst_sql_cache_fill").submit()
+    except Exception:
+        pass
+
+
+def analyst_sql_evict(question_hash, sql):
+    """Forget cached SQL that no longer runs, in memory and in the cache table (not awaited).
+
+    The DELETE matches the failed SQL text, so it cannot remove a newer entry
+    stored for the same question while it is still queued.
+    """
+    memo = get_analyst_sql_memo()
+    with memo['lock']:
+        memo['entries'].pop(question_hash, None)
+    try:
+        tracked_sql(f"""
+            DELETE FROM {ANALYST_SQL_CACHE_TABLE}
+            WHERE SEMANTIC_VIEW = '{SEMANTIC_VIEW}' AND QUESTION_HASH = '{question_hash}'
+              AND SQL_TEXT = {sql_string(sql)}
+        """, "analyst_sql_cache_evict").submit()
+    except Exception:
+        pass
+
+
+def request_analyst_sql(question):
+    """Translate a question with the Cortex Analyst REST API.
+
+    Returns (sql, text); sql is None when the Analyst answers with text only,
+    e.g. suggestions for an ambiguous question. Raises outside Streamlit in
+    Snowflake, where _snowflake is not available.
+    """
+    import _snowflake
+    body = {
+        "messages": [{"role": "user", "content": [{"type": "text", "text": question}]}],
+        "semantic_view": SEMANTIC_VIEW,
+    }
+    response = _snowflake.send_snow_api_request("POST", ANALYST_ENDPOINT, {}, {}, body, None, ANALYST_TIMEOUT_MS)
+    if response["status"] >= 400:
+        raise RuntimeError(f"Cortex Analyst returned {response['status']}: {response['content']}")
+    content = json.loads(response["content"])["message"]["content"]
+    text = " ".join(part["text"] for part in content if part["type"] == "text")
+    sql = next((part["statement"] for part in content if part["type"] == "sql"), None)
+    return sql, text
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def run_analyst_sql(sql, data_version):
+    """Result of generated SQL; ``data_version`` keys the cache."""
+    return tracked_sql(sql, "analyst_sql").to_pandas()
+
+
+# ============================================
+# Research Search
+# ============================================
+# Research Intelligence search reads the inverted index built by
+# sql_scripts/research_search_index.sql: only the postings of the query terms
+# are touched, ranked with BM25 (k1 = 1.2, b = 0.75). Text in double quotes
+# is a phrase the document must contain word for word, checked against the
+# stored token positions. Queries are tokenized like the index (lower case,
+# split on non-alphanumerics); common words are dropped outside phrases.
+RESEARCH_INDEX_TABLE = "LIFEARC_POC.AI_DEMO.RESEARCH_TERM_INDEX"
+RESEARCH_DOC_STATS_TABLE = "LIFEARC_POC.AI_DEMO.RESEARCH_DOC_STATS"
+RESEARCH_CORPUS_STATS_TABLE = "LIFEARC_POC.AI_DEMO.RESEARCH_CORPUS_STATS"
+RESEARCH_SEARCH_TTL_SECONDS = 300
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEARCH_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it', 'of', 'on',
+    'or', 'that', 'the', 'to', 'with'
+})
+
+
+def tokenize_search_text(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def parse_search_query(query):
+    """Split search box text into (terms, phrases); a quoted single word is a term."""
+    phrases = [tokenize_search_text(phrase) for phrase in re.findall(r'"([^"]*)"', query)]
+    terms = [term for term in tokenize_search_text(re.sub(r'"[^"]*"', ' ', query)) if term not in SEARCH_STOPWORDS]
+    terms += [phrase[0] for phrase in phrases if len(phrase) == 1]
+    return list(dict.fromkeys(terms)), [phrase for phrase in phrases if len(phrase) > 1]
+
+
+@st.cache_data(ttl=RESEARCH_SEARCH_TTL_SECONDS, show_spinner=False, max_entries=512)
+def search_research_index(query, columns, limit=20):
+    """Documents matching ``query`` ranked by BM25, with ``columns`` of
+    RESEARCH_INTELLIGENCE and a SCORE column; None if no term is searchable."""
+    terms, phrases = parse_search_query(query)
+    query_terms = list(dict.fromkeys(terms + [term for phrase in phrases for term in phrase]))
+    if not query_terms:
+        return None
+
+    # Tokens are [a-z0-9]+, so they are safe to inline as literals
+    term_values = ", ".join(f"('{term}')" for term in query_terms)
+    ctes = [f"query_terms AS (SELECT * FROM (VALUES {term_values}) AS v(TERM))"]
+    phrase_join = ""
+    if phrases:
+        phrase_values = ", ".join(
+            f"({phrase_id}, {offset}, '{term}', {len(phrase)})"
+            for phrase_id, phrase in enumerate(phrases) for offset, term in enumerate(phrase)
+        )
+        ctes += [
+            f"phrase_terms AS (SELECT * FROM (VALUES {phrase_values}) AS v(PHRASE_ID, TERM_OFFSET, TERM, PHRASE_LENGTH))",
+            # A phrase starts at position p when its k-th word occurs at p + k
+            f"""phrase_starts AS (
+                SELECT i.DOC_ID, t.PHRASE_ID, p.VALUE::INT - t.TERM_OFFSET AS START_POSITION
+                FROM {RESEARCH_INDEX_TABLE} i
+                JOIN phrase_terms t ON i.TERM = t.TERM,
+                LATERAL FLATTEN(i.POSITIONS) p
+                GROUP BY i.DOC_ID, t.PHRASE_ID, p.VALUE::INT - t.TERM_OFFSET
+                HAVING COUNT(DISTINCT t.TERM_OFFSET) = MAX(t.PHRASE_LENGTH)
+            )""",
+            f"""phrase_docs AS (
+                SELECT DOC_ID FROM phrase_starts GROUP BY DOC_ID HAVING COUNT(DISTINCT PHRASE_ID) = {len(phrases)}
+            )""",
+        ]
+        phrase_join = "JOIN phrase_docs f ON f.DOC_ID = p.DOC_ID"
+    ctes += [
+        f"""postings AS (
+            SELECT i.DOC_ID, i.TF, COUNT(*) OVER (PARTITION BY i.TERM) AS DF
+            FROM {RESEARCH_INDEX_TABLE} i
+            JOIN query_terms q ON i.TERM = q.TERM
+        )""",
+        f"""scores AS (
+            SELECT p.DOC_ID,
+                   SUM(LN(1 + (c.DOC_COUNT - p.DF + 0.5) / (p.DF + 0.5))
+                       * p.TF * ({BM25_K1} + 1)
+                       / (p.TF + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * s.DOC_LENGTH / c.AVG_DOC_LENGTH))) AS SCORE
+            FROM postings p
+            JOIN {RESEARCH_DOC_STATS_TABLE} s ON s.DOC_ID = p.DOC_ID
+            CROSS JOIN {RESEARCH_CORPUS_STATS_TABLE} c
+            {phrase_join}
+            GROUP BY p.DOC_ID
+        )""",
+    ]
+    return tracked_sql(f"""
+        WITH {', '.join(ctes)}
+        SELECT {', '.join(f'r.{column}' for column in columns)}, ROUND(s.SCORE, 3) AS SCORE
+        FROM scores s
+        JOIN LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE r ON r.DOC_ID = s.DOC_ID
+        ORDER BY s.SCORE DESC
+        LIMIT {int(limit)}
+    """, "research_search").to_pandas()
+
+
+# ============================================
+# Executive Snapshot
+# ============================================
+# The Executive Dashboard reads one row of AI_DEMO.EXECUTIVE_SNAPSHOT, rebuilt
+# by AI_DEMO.BUILD_EXECUTIVE_SNAPSHOT_TASK (sql_scripts/executive_snapshot.sql)
+# whenever a source table changes: KPIs as columns, dashboard tables as
+# arrays of objects. Until the snapshot exists the page queries the source
+# tables directly.
+EXECUTIVE_SNAPSHOT_TABLE = "LIFEARC_POC.AI_DEMO.EXECUTIVE_SNAPSHOT"
+EXECUTIVE_SNAPSHOT_TTL_SECONDS = 300
+EXECUTIVE_TABLE_COLUMNS = {
+    'DRUG_LIKENESS': ['THERAPEUTIC_AREA', 'DRUG_LIKENESS', 'COUNT'],
+    'PROGRAM_ROI': ['PROGRAM_NAME', 'THERAPEUTIC_AREA', 'ROI_MULTIPLE', 'RECOMMENDATION'],
+    'BOARD_PRIORITIES': ['BOARD_RECOMMENDATION', 'COMPOUND_NAME', 'TARGET_GENE', 'PREDICTED_SUCCESS_PCT',
+                         'COMPETITIVE_POSITION', 'PEAK_SALES_MILLIONS', 'INVESTMENT_REQUIRED_MILLIONS'],
+}
+
+
+def executive_table(value, name):
+    """DataFrame from a VARIANT array of objects, in the dashboard's column order."""
+    records = value if isinstance(value, list) else json.loads(value or "[]")
+    return pd.DataFrame(records, columns=EXECUTIVE_TABLE_COLUMNS[name])
+
+
+def query_executive_sources():
+    """The dashboard built from the source tables, shaped like a snapshot row."""
+    snapshot = tracked_sql("""
+        SELECT 
+            (SELECT COUNT(*) FROM LIFEARC_POC.AI_DEMO.COMPOUND_PIPELINE_ANALYSIS) as total_compounds,
+            (SELECT COUNT(*) FROM LIFEARC_POC.AI_DEMO.CLINICAL_TRIAL_PERFORMANCE WHERE status = 'Active') as active_trials,
+            (SELECT ROUND(SUM(total_investment_millions), 0) FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY) as total_investment,
+            (SELECT ROUND(AVG(roi_multiple), 1) FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY) as avg_roi
+    """, "executive_kpis").collect()[0].as_dict()
+    snapshot['DRUG_LIKENESS'] = tracked_sql("""
+        SELECT 
+            therapeutic_area,
+            drug_likeness,
+            COUNT(*) as count
+        FROM LIFEARC_POC.AI_DEMO.COMPOUND_PIPELINE_ANALYSIS
+        GROUP BY therapeutic_area, drug_likeness
+        ORDER BY therapeutic_area, drug_likeness
+    """, "executive_drug_likeness").to_pandas()
+    snapshot['PROGRAM_ROI'] = tracked_sql("""
+        SELECT 
+            program_name,
+            therapeutic_area,
+            roi_multiple,
+            recommendation
+        FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY
+        ORDER BY roi_multiple DESC
+    """, "executive_roi").to_pandas()
+    snapshot['BOARD_PRIORITIES'] = tracked_sql("""
+        SELECT 
+            board_recommendation,
+            compound_name,
+            target_gene,
+            predicted_success_pct,
+            competitive_position,
+            peak_sales_millions,
+            investment_required_millions
+        FROM LIFEARC_POC.AI_DEMO.BOARD_CANDIDATE_SCORECARD
+        WHERE board_recommendation IN ('Priority 1', 'Priority 2', 'Priority 3')
+        ORDER BY board_recommendation
+    """, "executive_priorities").to_pandas()
+    snapshot['BUILT_AT'] = None
+    return snapshot
+
+
+@st.cache_data(ttl=EXECUTIVE_SNAPSHOT_TTL_SECONDS, show_spinner=False)
+def load_executive_snapshot():
+    """KPIs, the three dashboard tables as DataFrames and BUILT_AT (None when
+    read live), from the latest snapshot in one query."""
+    try:
+        rows = tracked_sql(f"""
+            SELECT BUILT_AT, TOTAL_COMPOUNDS, ACTIVE_TRIALS, TOTAL_INVESTMENT, AVG_ROI,
+                   DRUG_LIKENESS, PROGRAM_ROI, BOARD_PRIORITIES
+            FROM {EXECUTIVE_SNAPSHOT_TABLE}
+            ORDER BY SNAPSHOT_ID DESC
+            LIMIT 1
+        """, "executive_snapshot").collect()
+    except Exception:
+        rows = []
+    if not rows:
+        return query_executive_sources()
+    snapshot = rows[0].as_dict()
+    for name in EXECUTIVE_TABLE_COLUMNS:
+        snapshot[name] = executive_table(snapshot[name], name)
+    return snapshot
+
 
 # ============================================
 # Helper Functions
 # ============================================
 
 def run_cortex_analyst(question: str) -> dict:
-    """Send question to Cortex Analyst using semantic view."""
+    """Answer a question with Cortex Analyst SQL over the semantic view."""
+    started = time.perf_counter()
+    normalized = normalize_question(question)
+    question_hash = hashlib.sha256(f"{SEMANTIC_VIEW}\n{normalized}".encode()).hexdigest()
+    cached = analyst_sql_lookup(question_hash)
+    if cached is not None:
+        sql, interpretation, source = cached
+        try:
+            data = run_analyst_sql(sql, get_ai_demo_version())
+            return {
+                "success": True, "sql": sql, "interpretation": interpretation, "data": data,
+                "source": source, "ms": (time.perf_counter() - started) * 1000
+            }
+        except Exception:
+            # Cached SQL that no longer runs, e.g. after a semantic view
+            # change: drop it everywhere and ask the Analyst afresh
+            analyst_sql_evict(question_hash, sql)
     try:
-        # Use Cortex Analyst with semantic view
-        sql = f"""
-        SELECT SNOWFLAKE.CORTEX.COMPLETE(
-            'llama3.1-70b',
-            'You are a drug discovery analytics assistant. Based on the LifeArc pipeline data, answer this question concisely with specific numbers and actionable insights:
-
-Question: {question}
-
-Data Context:
-- COMPOUND_PIPELINE_ANALYSIS: 29 compounds with molecular properties, drug-likeness (drug_like, borderline, non_drug_like), therapeutic areas (Oncology, Autoimmune, CNS)
-- CLINICAL_TRIAL_PERFORMANCE: 17 trials with response rates, PFS, OS, biomarker selection (YES/NO), ctDNA confirmation
-- PROGRAM_ROI_SUMMARY: 9 R&D programs with ROI multiples, recommendations (EXPAND, MAINTAIN, REDUCE, TERMINATE)
-- RESEARCH_INTELLIGENCE: 8 research documents with competitive impact (High, Medium)
-- BOARD_CANDIDATE_SCORECARD: 8 candidates with board recommendations (Priority 1-3, Watch List, Terminate)
-
-Key insights from the data:
-- 41% of compounds fail drug-likeness, primarily due to LogP > 5.0
-- BRCA1 trials have 52.9% response rate vs KRAS at 32.1%
-- ctDNA confirmation correlates with better trial outcomes
-- Oncology ROI is 21.6x vs CNS at 2.8x
-- MYC program has first-in-class opportunity with 18-24 month competitive window
-
-Provide a specific, data-backed answer:'
-        ) AS answer
-        """
-        result = session.sql(sql).collect()
-        return {"success": True, "answer": result[0]['ANSWER']}
+        sql, interpretation = request_analyst_sql(question)
+        if sql is None:
+            return {"success": True, "interpretation": interpretation}
+        generated_ms = (time.perf_counter() - started) * 1000
+        data = run_analyst_sql(sql, get_ai_demo_version())
+    except Exception:
+        # Analyst unreachable or its SQL failed: cache nothing
+        return answer_from_context(question)
+    analyst_sql_store(question_hash, normalized, question, sql, interpretation, generated_ms)
+    return {
+        "success": True, "sql": sql, "interpretation": interpretation, "data": data,
+        "source": "analyst", "ms": (time.perf_counter() - started) * 1000
+    }
+
+
+def answer_from_context(question: str) -> dict:
+    """Stream a COMPLETE answer over the relevant slice of the data context."""
+    try:
+        # Static instructions first and the question last keep the prompt
+        # prefix identical across questions that share tables
+        context, data_version = build_question_context(question)
+        prompt = f"""You are a drug discovery analytics assistant for the LifeArc pipeline. Answer concisely with specific numbers and actionable insights, using this data:
+{context}
+
+Question: {question}"""
+        return {"success": True, "stream": CortexStream('llama3.1-70b', prompt, "ask_any_question", data_version)}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 def search_research_docs(query: str) -> list:
-    """Search research documents using Cortex Search."""
+    """Top research documents for a keyword query, from the BM25 index."""
     try:
-        sql = f"""
-        SELECT 
-            doc_id,
-            doc_title,
-            doc_type,
-            target_gene,
-            key_finding,
-            competitive_impact,
-            recommended_action
-        FROM LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE
-        WHERE CONTAINS(LOWER(full_text), LOWER('{query}'))
-           OR CONTAINS(LOWER(key_finding), LOWER('{query}'))
-           OR CONTAINS(LOWER(target_gene), LOWER('{query}'))
-        LIMIT 5
-        """
-        result = session.sql(sql).to_pandas()
-        return result.to_dict('records')
-    except Exception as e:
+        result = search_research_index(query, (
+            'DOC_ID', 'DOC_TITLE', 'DOC_TYPE', 'TARGET_GENE', 'KEY_FINDING', 'COMPETITIVE_IMPACT',
+            'RECOMMENDED_ACTION'
+        ), limit=5)
+        return [] if result is None else result.to_dict('records')
+    except Exception:
         return []
 
 
+def semantic_research_search(query: str, columns, k=10):
+    """Research documents closest in meaning to ``query``, from the chunk
+    embeddings, with ``columns`` of RESEARCH_INTELLIGENCE and a SCORE column."""
+    hits = vector_search(query, 'RESEARCH_INTELLIGENCE', k)
+    if hits.empty:
+        return hits
+    doc_ids = ", ".join(sql_string(doc_id) for doc_id in hits['DOC_ID'])
+    docs = tracked_sql(f"""
+        SELECT DOC_ID, {', '.join(column for column in columns if column != 'DOC_ID')}
+        FROM LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE
+        WHERE DOC_ID IN ({doc_ids})
+    """, "semantic_search_docs").to_pandas()
+    return hits[['DOC_ID', 'SIMILARITY']].merge(docs, on='DOC_ID').rename(columns={'SIMILARITY': 'SCORE'})
+
+
 # ============================================
 # SECTION: Ask Any Question
 # ============================================
@@ -147,14 +757,30 @@ if demo_mode == "Ask Any Question":
         ask_button = st.button("🔍 Ask", type="primary", use_container_width=True)
     
     if ask_button and user_question:
-        with st.spinner("Analyzing your pipeline data..."):
-            response = run_cortex_analyst(user_question)
-            
-            if response["success"]:
-                st.success("Answer:")
-                st.markdown(response["answer"])
-            else:
-                st.error(f"Error: {response['error']}")
+        response = run_cortex_analyst(user_question)
+        
+        if not response["success"]:
+            st.error(f"Error: {response['error']}")
+        elif "data" in response:
+            st.success("Answer:")
+            if response["interpretation"]:
+                st.markdown(response["interpretation"])
+            st.dataframe(response["data"], use_container_width=True, hide_index=True)
+            with st.expander("Generated SQL"):
+                st.code(response["sql"], language="sql")
+            sql_source = {'memory': "in-memory SQL cache", 'cache': "SQL cache table"}.get(
+                response["source"], "Cortex Analyst")
+            st.caption(f"SQL from the {sql_source} · answered in {response['ms']:,.0f} ms")
+        elif "stream" in response:
+            st.success("Answer:")
+            # Tokens render as they arrive; errors mid-stream land below
+            try:
+                st.write_stream(response["stream"])
+                st.caption(response["stream"].caption())
+            except Exception as e:
+                st.error(f"Error: {e}")
+        else:
+            st.info(response["interpretation"])
 
 
 # ============================================
@@ -264,7 +890,7 @@ elif demo_mode == "Guided Why Questions":
     with col1:
         if st.button("Run Analysis", type="primary"):
             with st.spinner("Querying pipeline data..."):
-                result = session.sql(q_data['sql']).to_pandas()
+                result = tracked_sql(q_data['sql'], "why_question").to_pandas()
                 st.dataframe(result, use_container_width=True, hide_index=True)
     
     with col2:
@@ -282,41 +908,31 @@ elif demo_mode == "Research Intelligence":
     
     st.markdown("""
     Search across research documents, publications, and competitive intelligence.
-    Uses semantic search to find relevant insights.
+    **Keyword** ranks by term relevance (put "exact phrases" in double quotes);
+    **Semantic** finds documents close in meaning using text embeddings.
     """)
     
     search_query = st.text_input(
         "Search research documents:",
         placeholder="e.g., EGFR resistance mechanisms"
     )
+    search_mode = st.radio("Search mode", ["Keyword", "Semantic"], horizontal=True)
+    result_columns = (
+        'DOC_TITLE', 'DOC_TYPE', 'TARGET_GENE', 'THERAPEUTIC_AREA', 'COMPETITIVE_IMPACT',
+        'KEY_FINDING', 'RECOMMENDED_ACTION', 'PUBLICATION_DATE'
+    )
     
     if st.button("🔍 Search", type="primary") and search_query:
         with st.spinner("Searching research intelligence..."):
-            # Direct SQL search as fallback
-            sql = f"""
-                SELECT 
-                    doc_title,
-                    doc_type,
-                    target_gene,
-                    therapeutic_area,
-                    competitive_impact,
-                    key_finding,
-                    recommended_action,
-                    publication_date
-                FROM LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE
-                WHERE LOWER(full_text) LIKE LOWER('%{search_query}%')
-                   OR LOWER(key_finding) LIKE LOWER('%{search_query}%')
-                   OR LOWER(target_gene) LIKE LOWER('%{search_query}%')
-                   OR LOWER(doc_title) LIKE LOWER('%{search_query}%')
-                ORDER BY 
-                    CASE WHEN competitive_impact = 'High' THEN 1 ELSE 2 END,
-                    publication_date DESC
-            """
-            
             try:
-                results = session.sql(sql).to_pandas()
+                if search_mode == "Semantic":
+                    results = semantic_research_search(search_query, result_columns)
+                else:
+                    results = search_research_index(search_query, result_columns)
                 
-                if len(results) > 0:
+                if results is None:
+                    st.warning("Enter at least one search term (common words like 'the' are ignored).")
+                elif len(results) > 0:
                     st.success(f"Found {len(results)} relevant documents")
                     
                     for _, row in results.iterrows():
@@ -340,7 +956,7 @@ elif demo_mode == "Research Intelligence":
     
     # Show all documents
     with st.expander("View All Research Documents"):
-        all_docs = session.sql("""
+        all_docs = tracked_sql("""
             SELECT 
                 doc_title,
                 doc_type,
@@ -350,7 +966,7 @@ elif demo_mode == "Research Intelligence":
                 action_required
             FROM LIFEARC_POC.AI_DEMO.RESEARCH_INTELLIGENCE
             ORDER BY publication_date DESC
-        """).to_pandas()
+        """, "research_all_docs").to_pandas()
         st.dataframe(all_docs, use_container_width=True, hide_index=True)
 
 
@@ -360,26 +976,21 @@ elif demo_mode == "Research Intelligence":
 elif demo_mode == "Executive Dashboard":
     st.header("📊 Executive Pipeline Dashboard")
     
+    snapshot = load_executive_snapshot()
+    if snapshot['BUILT_AT'] is not None:
+        st.caption(f"Snapshot built {snapshot['BUILT_AT']:%Y-%m-%d %H:%M}")
+    
     # KPI Row
     col1, col2, col3, col4 = st.columns(4)
     
-    # Get summary stats
-    stats = session.sql("""
-        SELECT 
-            (SELECT COUNT(*) FROM LIFEARC_POC.AI_DEMO.COMPOUND_PIPELINE_ANALYSIS) as total_compounds,
-            (SELECT COUNT(*) FROM LIFEARC_POC.AI_DEMO.CLINICAL_TRIAL_PERFORMANCE WHERE status = 'Active') as active_trials,
-            (SELECT ROUND(SUM(total_investment_millions), 0) FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY) as total_investment,
-            (SELECT ROUND(AVG(roi_multiple), 1) FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY) as avg_roi
-    """).collect()[0]
-    
     with col1:
-        st.metric("Total Compounds", stats['TOTAL_COMPOUNDS'])
+        st.metric("Total Compounds", snapshot['TOTAL_COMPOUNDS'])
     with col2:
-        st.metric("Active Trials", stats['ACTIVE_TRIALS'])
+        st.metric("Active Trials", snapshot['ACTIVE_TRIALS'])
     with col3:
-        st.metric("Total Investment", f"${stats['TOTAL_INVESTMENT']}M")
+        st.metric("Total Investment", f"${snapshot['TOTAL_INVESTMENT']}M")
     with col4:
-        st.metric("Avg ROI Multiple", f"{stats['AVG_ROI']}x")
+        st.metric("Avg ROI Multiple", f"{snapshot['AVG_ROI']}x")
     
     st.divider()
     
@@ -388,48 +999,18 @@ elif demo_mode == "Executive Dashboard":
     
     with col1:
         st.subheader("Drug-Likeness by Therapeutic Area")
-        dl_data = session.sql("""
-            SELECT 
-                therapeutic_area,
-                drug_likeness,
-                COUNT(*) as count
-            FROM LIFEARC_POC.AI_DEMO.COMPOUND_PIPELINE_ANALYSIS
-            GROUP BY therapeutic_area, drug_likeness
-            ORDER BY therapeutic_area, drug_likeness
-        """).to_pandas()
-        st.dataframe(dl_data, use_container_width=True, hide_index=True)
+        st.dataframe(snapshot['DRUG_LIKENESS'], use_container_width=True, hide_index=True)
     
     with col2:
         st.subheader("Program ROI Summary")
-        roi_data = session.sql("""
-            SELECT 
-                program_name,
-                therapeutic_area,
-                roi_multiple,
-                recommendation
-            FROM LIFEARC_POC.AI_DEMO.PROGRAM_ROI_SUMMARY
-            ORDER BY roi_multiple DESC
-        """).to_pandas()
-        st.dataframe(roi_data, use_container_width=True, hide_index=True)
+        st.dataframe(snapshot['PROGRAM_ROI'], use_container_width=True, hide_index=True)
     
     st.divider()
     
     # Board Priorities
     st.subheader("🎯 Board Priority Candidates")
     
-    priorities = session.sql("""
-        SELECT 
-            board_recommendation,
-            compound_name,
-            target_gene,
-            predicted_success_pct,
-            competitive_position,
-            peak_sales_millions,
-            investment_required_millions
-        FROM LIFEARC_POC.AI_DEMO.BOARD_CANDIDATE_SCORECARD
-        WHERE board_recommendation IN ('Priority 1', 'Priority 2', 'Priority 3')
-        ORDER BY board_recommendation
-    """).to_pandas()
+    priorities = snapshot['BOARD_PRIORITIES']
     
     for _, row in priorities.iterrows():
         with st.container():
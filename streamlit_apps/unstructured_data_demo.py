@@ -10,8 +10,17 @@ Demonstrates Snowflake capabilities for life sciences data types:
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
 import pandas as pd
+import hashlib
 import json
+import os
 import re
+import threading
+import time
+
+from app_queries import (
+    configure_app, cortex_complete, cortex_source_caption, count_cache_hit, sql_string, tracked_sql
+)
+from vector_search import EMBED_MODEL, vector_search
 
 # Page config
 st.set_page_config(
@@ -20,8 +29,16 @@ st.set_page_config(
     layout="wide"
 )
 
-# Get Snowflake session
-session = get_active_session()
+# Get Snowflake session (LIFEARC_DATA_BACKEND=local runs against the DuckDB
+# backend in local_dev/)
+@st.cache_resource
+def get_session():
+    if os.environ.get("LIFEARC_DATA_BACKEND") == "local":
+        from local_backend import get_local_session
+        return get_local_session()
+    return get_active_session()
+
+session = get_session()
 
 # Header
 st.title("🧬 LifeArc: Unstructured Data Management")
@@ -34,6 +51,137 @@ demo_section = st.sidebar.radio(
     ["Overview", "FASTA/FASTQ Processing", "Molecular Data (SDF)", 
      "Clinical Trial JSON", "Cortex LLM Analysis", "Cortex Search"]
 )
+st.session_state['query_page'] = demo_section
+
+# ============================================
+# Query Instrumentation & Cortex Response Cache
+# ============================================
+# tracked_sql() tags and times every statement into BENCHMARK.APP_QUERY_LOG
+# (see the ML dashboard's hidden Performance page), and cortex_complete()
+# answers COMPLETE through BENCHMARK.CORTEX_RESPONSE_CACHE. Both live in
+# streamlit/app_queries.py, shared with the ML dashboard. Semantic search over
+# the research embeddings, vector_search(), is in streamlit/vector_search.py.
+APP_NAME = "UNSTRUCTURED_DATA_DEMO"
+configure_app(session, APP_NAME)
+
+
+# ============================================
+# Reranking
+# ============================================
+# Semantic search is two-stage: vector search proposes RERANK_CANDIDATES
+# documents, then (optionally) the LLM scores only those for relevance. All
+# candidates missing from the score cache are scored in one statement, so a
+# search costs at most RERANK_CANDIDATES COMPLETE calls however large the
+# corpus is, and none when the (query, chunk) pairs were scored before.
+RERANK_MODEL = 'llama3.1-8b'
+RERANK_CANDIDATES = 20
+RERANK_CACHE_TABLE = "LIFEARC_POC.AI_DEMO.RESEARCH_RERANK_CACHE"
+RERANK_PROMPT = (
+    "Rate the relevance (0-10) of this document to the query \"{query}\".\n"
+    "Document: {document}\n"
+    "Return only the number."
+)
+
+
+@st.cache_resource
+def get_rerank_memo():
+    """Rerank scores by (model, query hash, doc, content hash), shared across sessions."""
+    return {'lock': threading.Lock(), 'scores': {}}
+
+
+def parse_relevance(reply):
+    """First number in the model's reply, clipped to 0-10; None if there is none."""
+    match = re.search(r"\d+(?:\.\d+)?", reply or "")
+    return min(max(float(match.group()), 0.0), 10.0) if match else None
+
+
+def rerank_candidates(query, source_table, candidates):
+    """Add RERANK_SCORE to vector-search ``candidates`` (DOC_ID, CHUNK_INDEX,
+    CHUNK_TEXT, SIMILARITY) and sort by it, similarity breaking ties.
+
+    Returns (ranked, cached, scored): how many scores came from the caches
+    and how many were generated.
+    """
+    query_hash = hashlib.sha256(" ".join(query.lower().split()).encode()).hexdigest()
+    keys = [
+        (RERANK_MODEL, query_hash, doc_id, hashlib.sha256(chunk_text.encode()).hexdigest())
+        for doc_id, chunk_text in zip(candidates['DOC_ID'], candidates['CHUNK_TEXT'])
+    ]
+    memo = get_rerank_memo()
+    with memo['lock']:
+        scores = {key: memo['scores'][key] for key in keys if key in memo['scores']}
+
+    def key_filter(pairs):
+        return " OR ".join(
+            f"(DOC_ID = {sql_string(doc_id)} AND CONTENT_HASH = '{content_hash}')"
+            for _, _, doc_id, content_hash in pairs
+        )
+
+    missing = [key for key in keys if key not in scores]
+    if missing:
+        try:
+            rows = tracked_sql(f"""
+                SELECT DOC_ID, CONTENT_HASH, SCORE
+                FROM {RERANK_CACHE_TABLE}
+                WHERE MODEL = '{RERANK_MODEL}' AND QUERY_HASH = '{query_hash}'
+                  AND SOURCE_TABLE = '{source_table}' AND ({key_filter(missing)})
+            """, "rerank_cache").collect()
+        except Exception:
+            rows = []
+        for row in rows:
+            scores[(RERANK_MODEL, query_hash, row['DOC_ID'], row['CONTENT_HASH'])] = row['SCORE']
+    for _, _, doc_id, content_hash in scores:
+        count_cache_hit(RERANK_CACHE_TABLE, {
+            'MODEL': sql_string(RERANK_MODEL), 'QUERY_HASH': sql_string(query_hash),
+            'SOURCE_TABLE': sql_string(source_table), 'DOC_ID': sql_string(doc_id),
+            'CONTENT_HASH': sql_string(content_hash)
+        }, last_hit_column=None)
+    cached = len(scores)
+
+    missing = [key for key in keys if key not in scores]
+    if missing:
+        texts = dict(zip(keys, candidates['CHUNK_TEXT']))
+        prompts = " UNION ALL ".join(
+            f"SELECT {sql_string(doc_id)} AS DOC_ID, '{content_hash}' AS CONTENT_HASH, "
+            f"{sql_string(RERANK_PROMPT.format(query=query, document=texts[key]))} AS PROMPT"
+            for key in missing for _, _, doc_id, content_hash in [key]
+        )
+        rows = tracked_sql(f"""
+            SELECT DOC_ID, CONTENT_HASH, SNOWFLAKE.CORTEX.COMPLETE('{RERANK_MODEL}', PROMPT) AS REPLY
+            FROM ({prompts})
+        """, "rerank_score").collect()
+        fresh = {
+            (RERANK_MODEL, query_hash, row['DOC_ID'], row['CONTENT_HASH']): parse_relevance(row['REPLY'])
+            for row in rows
+        }
+        scores.update(fresh)
+        try:
+            values = ", ".join(
+                f"({sql_string(doc_id)}, '{content_hash}', {'NULL' if score is None else score})"
+                for (_, _, doc_id, content_hash), score in fresh.items()
+            )
+            tracked_sql(f"""
+                MERGE INTO {RERANK_CACHE_TABLE} t
+                USING (SELECT * FROM (VALUES {values}) AS v(DOC_ID, CONTENT_HASH, SCORE)) s
+                ON t.MODEL = '{RERANK_MODEL}' AND t.QUERY_HASH = '{query_hash}'
+                   AND t.SOURCE_TABLE = '{source_table}'
+                   AND t.DOC_ID = s.DOC_ID AND t.CONTENT_HASH = s.CONTENT_HASH
+                WHEN MATCHED THEN UPDATE SET SCORE = s.SCORE, CREATED_AT = CURRENT_TIMESTAMP()
+                WHEN NOT MATCHED THEN INSERT
+                    (MODEL, QUERY_HASH, QUERY_TEXT, SOURCE_TABLE, DOC_ID, CONTENT_HASH, SCORE, CREATED_AT, HIT_COUNT)
+                VALUES
+                    ('{RERANK_MODEL}', '{query_hash}', {sql_string(query)}, '{source_table}',
+                     s.DOC_ID, s.CONTENT_HASH, s.SCORE, CURRENT_TIMESTAMP(), 0)
+            """, "rerank_cache_fill").submit()
+        except Exception:
+            pass
+
+    with memo['lock']:
+        memo['scores'].update(scores)
+    ranked = candidates.assign(RERANK_SCORE=[scores.get(key) for key in keys])
+    ranked = ranked.sort_values(['RERANK_SCORE', 'SIMILARITY'], ascending=False, na_position='last')
+    return ranked.reset_index(drop=True), cached, len(missing)
+
 
 # ============================================
 # SECTION: Overview
@@ -114,7 +262,7 @@ elif demo_section == "FASTA/FASTQ Processing":
         
         if st.button("Setup Sequence Table"):
             try:
-                session.sql(setup_sql).collect()
+                tracked_sql(setup_sql, "fasta_setup").collect()
                 st.success("Table created successfully!")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -190,7 +338,7 @@ $$;
         
         if st.button("Create Parser UDF"):
             try:
-                session.sql(udf_code).collect()
+                tracked_sql(udf_code, "fasta_parser_udf").collect()
                 st.success("UDF created successfully!")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -219,7 +367,7 @@ ATGGAGGAGCCGCAGTCAGATCCTAGCGTCGAGCCCCCTCTGAGTCAGGAAACATTTTCAGACCTATGGAAACTACTTCC
         
         if st.button("Run Query"):
             try:
-                result = session.sql(query).to_pandas()
+                result = tracked_sql(query, "fasta_query").to_pandas()
                 st.dataframe(result, use_container_width=True)
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -282,7 +430,7 @@ SELECT
             try:
                 for stmt in schema_sql.split(';'):
                     if stmt.strip():
-                        session.sql(stmt).collect()
+                        tracked_sql(stmt, "sdf_schema").collect()
                 st.success("Compound library created!")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -345,7 +493,7 @@ SELECT
         
         if st.button("Run Molecule Query"):
             try:
-                result = session.sql(query).to_pandas()
+                result = tracked_sql(query, "sdf_query").to_pandas()
                 st.dataframe(result, use_container_width=True)
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -399,7 +547,7 @@ $$);
             try:
                 for stmt in schema_sql.split(';'):
                     if stmt.strip():
-                        session.sql(stmt).collect()
+                        tracked_sql(stmt, "json_schema").collect()
                 st.success("Clinical trial data loaded!")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -442,7 +590,7 @@ FROM LIFEARC_POC.UNSTRUCTURED_DATA.CLINICAL_TRIALS
         
         if st.button("Run JSON Query"):
             try:
-                result = session.sql(queries[selected_query]).to_pandas()
+                result = tracked_sql(queries[selected_query], "json_query").to_pandas()
                 st.dataframe(result, use_container_width=True)
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -466,7 +614,7 @@ LATERAL FLATTEN(input => ct.protocol_data:arms) arm
         
         if st.button("Flatten Arms"):
             try:
-                result = session.sql(flatten_sql).to_pandas()
+                result = tracked_sql(flatten_sql, "json_flatten").to_pandas()
                 st.dataframe(result, use_container_width=True)
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -504,30 +652,23 @@ elif demo_section == "Cortex LLM Analysis":
         
         st.text_area("Research Abstract", sample_abstract, height=200, disabled=True)
         
-        summary_sql = f"""
-SELECT SNOWFLAKE.CORTEX.COMPLETE(
-    'llama3.1-70b',
-    'Summarize this research abstract in 3 bullet points for a scientific audience:
+        summary_prompt = f"""Summarize this research abstract in 3 bullet points for a scientific audience:
 
-{sample_abstract}'
-) AS summary
-        """
+{sample_abstract}"""
         
         if st.button("Generate Summary"):
             try:
-                result = session.sql(summary_sql).collect()
+                summary, source, ms = cortex_complete('llama3.1-70b', summary_prompt, "cortex_summarize")
                 st.success("Summary Generated:")
-                st.markdown(result[0]['SUMMARY'])
+                st.markdown(summary)
+                st.caption(cortex_source_caption(source, ms))
             except Exception as e:
                 st.error(f"Error: {e}")
     
     with tab2:
         st.subheader("Named Entity Extraction")
         
-        extraction_sql = f"""
-SELECT SNOWFLAKE.CORTEX.COMPLETE(
-    'llama3.1-70b',
-    'Extract the following entities from this research text and return as JSON:
+        extraction_prompt = f"""Extract the following entities from this research text and return as JSON:
 - Compound IDs (list)
 - Target protein/gene
 - IC50 values
@@ -535,15 +676,14 @@ SELECT SNOWFLAKE.CORTEX.COMPLETE(
 
 Text: {sample_abstract}
 
-Return only valid JSON.'
-) AS entities
-        """
+Return only valid JSON."""
         
         if st.button("Extract Entities"):
             try:
-                result = session.sql(extraction_sql).collect()
+                entities, source, ms = cortex_complete('llama3.1-70b', extraction_prompt, "cortex_extract")
                 st.success("Extracted Entities:")
-                st.json(result[0]['ENTITIES'])
+                st.json(entities)
+                st.caption(cortex_source_caption(source, ms))
             except Exception as e:
                 st.error(f"Error: {e}")
     
@@ -555,24 +695,20 @@ Return only valid JSON.'
             value="What is the selectivity of the lead compound over wild-type cells?"
         )
         
-        qa_sql = f"""
-SELECT SNOWFLAKE.CORTEX.COMPLETE(
-    'llama3.1-70b',
-    'Based on this research abstract, answer the following question concisely:
+        qa_prompt = f"""Based on this research abstract, answer the following question concisely:
 
 Abstract: {sample_abstract}
 
 Question: {user_question}
 
-Answer:'
-) AS answer
-        """
+Answer:"""
         
         if st.button("Get Answer"):
             try:
-                result = session.sql(qa_sql).collect()
+                answer, source, ms = cortex_complete('llama3.1-70b', qa_prompt, "cortex_qa")
                 st.success("Answer:")
-                st.write(result[0]['ANSWER'])
+                st.write(answer)
+                st.caption(cortex_source_caption(source, ms))
             except Exception as e:
                 st.error(f"Error: {e}")
 
@@ -637,7 +773,7 @@ AS (
             try:
                 for stmt in setup_sql.split(';'):
                     if stmt.strip():
-                        session.sql(stmt).collect()
+                        tracked_sql(stmt, "search_setup").collect()
                 st.success("Cortex Search Service created!")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -650,7 +786,7 @@ AS (
             value="DNA repair pathway inhibitors"
         )
         
-        # Alternative: Use Cortex LLM for semantic search when Cortex Search isn't available
+        # Alternative: vector search over our own embeddings when Cortex Search isn't available
         st.markdown("""
         **Option 1: Cortex Search Service (requires setup)**
         ```sql
@@ -663,36 +799,72 @@ AS (
         );
         ```
         
-        **Option 2: Cortex LLM for similarity search (works now)**
+        **Option 2: Vector search over EMBED_TEXT_768 chunk embeddings (works now)**
         """)
         
+        search_k = st.slider("Results", 1, 10, 5)
+        use_rerank = st.checkbox(
+            f"Rerank the top {RERANK_CANDIDATES} candidates with {RERANK_MODEL}",
+            help="Scores only the vector-search candidates; scores are cached per query and document"
+        )
+        
+        # The warehouse form of the query; small corpora are searched in
+        # process over a snapshot of the same embeddings
         search_sql = f"""
--- Semantic search using Cortex LLM
+-- Semantic search: best chunk per document by cosine similarity
 SELECT 
-    doc_id,
-    title,
-    doc_type,
-    authors,
-    SUBSTRING(content, 1, 200) AS content_preview,
-    SNOWFLAKE.CORTEX.COMPLETE(
-        'llama3.1-8b',
-        'Rate the relevance (0-10) of this document to the query "{search_query}". 
-        Document: ' || content || '
-        Return only the number.'
-    ) AS relevance_score
-FROM LIFEARC_POC.UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS
-ORDER BY relevance_score DESC
+    e.doc_id,
+    d.title,
+    d.doc_type,
+    e.chunk_text,
+    VECTOR_COSINE_SIMILARITY(
+        e.embedding,
+        SNOWFLAKE.CORTEX.EMBED_TEXT_768('{EMBED_MODEL}', {sql_string(search_query)})
+    ) AS similarity
+FROM LIFEARC_POC.AI_DEMO.RESEARCH_EMBEDDINGS e
+JOIN LIFEARC_POC.UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS d ON d.doc_id = e.doc_id
+WHERE e.source_table = 'RESEARCH_DOCUMENTS'
+QUALIFY ROW_NUMBER() OVER (PARTITION BY e.doc_id ORDER BY similarity DESC) = 1
+ORDER BY similarity DESC
+LIMIT {search_k}
         """
         
         st.code(search_sql, language="sql")
         
         if st.button("Search"):
             try:
-                result = session.sql(search_sql).to_pandas()
-                st.success("Search Results:")
-                st.dataframe(result, use_container_width=True)
+                started = time.perf_counter()
+                hits = vector_search(search_query, 'RESEARCH_DOCUMENTS',
+                                     max(RERANK_CANDIDATES, search_k) if use_rerank else search_k)
+                search_ms = (time.perf_counter() - started) * 1000
+                rerank_note = ""
+                if use_rerank and not hits.empty:
+                    started = time.perf_counter()
+                    try:
+                        hits, cached, scored = rerank_candidates(search_query, 'RESEARCH_DOCUMENTS', hits)
+                        rerank_note = (f" · reranked {len(hits)} candidates ({cached} cached, {scored} scored) "
+                                       f"in {(time.perf_counter() - started) * 1000:,.0f} ms")
+                    except Exception as e:
+                        st.warning(f"Rerank unavailable, showing vector order: {e}")
+                    hits = hits.head(search_k)
+                if hits.empty:
+                    st.warning("No embeddings yet - run sql_scripts/research_embeddings.sql.")
+                else:
+                    doc_ids = ", ".join(sql_string(doc_id) for doc_id in hits['DOC_ID'])
+                    docs = tracked_sql(f"""
+                        SELECT doc_id, title, doc_type, authors
+                        FROM LIFEARC_POC.UNSTRUCTURED_DATA.RESEARCH_DOCUMENTS
+                        WHERE doc_id IN ({doc_ids})
+                    """, "search_docs").to_pandas()
+                    result = hits.merge(docs, on='DOC_ID')[
+                        ['DOC_ID', 'TITLE', 'DOC_TYPE', 'AUTHORS', 'CHUNK_TEXT', 'SIMILARITY']
+                        + (['RERANK_SCORE'] if 'RERANK_SCORE' in hits else [])
+                    ]
+                    st.success("Search Results:")
+                    st.dataframe(result, use_container_width=True)
+                    st.caption(f"Retrieved in {search_ms:,.0f} ms{rerank_note}")
             except Exception as e:
-                st.warning("Note: Ensure Cortex LLM is available in your account.")
+                st.warning("Note: Ensure Cortex embedding functions are available in your account.")
                 st.error(f"Error: {e}")
 
 # Footer
@@ -0,0 +1,63 @@
+"""Parity of the in-process ResponseScorer with the XGBoost booster it was exported from."""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "streamlit"))
+from response_scorer import ResponseScorer, export_scorer_artifact  # noqa: E402
+
+CATEGORICAL_COLS = ["TREATMENT_ARM", "COHORT"]
+NUMERIC_COLS = ["PATIENT_AGE", "TREATMENT_INTENSITY"]
+
+
+def make_records(rng, n):
+    arms = rng.choice(["Combination", "Experimental", "Standard"], n)
+    return {
+        "TREATMENT_ARM": arms,
+        "COHORT": rng.choice(["Cohort_A", "Cohort_B", "Cohort_C"], n),
+        "PATIENT_AGE": rng.integers(30, 85, n).astype(float),
+        "TREATMENT_INTENSITY": np.select([arms == "Combination", arms == "Experimental"], [3.0, 2.0], 1.0),
+    }
+
+
+def test_scorer_matches_booster():
+    rng = np.random.default_rng(7)
+    records = make_records(rng, 2000)
+
+    # Fitted the way the notebook's OrdinalEncoder and StandardScaler are:
+    # sorted category lists, and mean_/scale_ arrays ordered like NUMERIC_COLS
+    categories = {col: np.unique(records[col]) for col in CATEGORICAL_COLS}
+    numeric = np.column_stack([records[col] for col in NUMERIC_COLS])
+    scaler_mean, scaler_scale = numeric.mean(axis=0), numeric.std(axis=0)
+
+    encoded = np.column_stack([np.searchsorted(categories[col], records[col]) for col in CATEGORICAL_COLS])
+    X = np.column_stack([encoded, (numeric - scaler_mean) / scaler_scale]).astype(np.float32)
+    logit = 0.8 * (records["TREATMENT_ARM"] == "Combination") - 0.03 * (records["PATIENT_AGE"] - 55)
+    y = (rng.random(len(logit)) < 1 / (1 + np.exp(-logit))).astype(int)
+
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 3, "eta": 0.3},
+        xgb.DMatrix(X, label=y),
+        num_boost_round=25,
+    )
+
+    artifact = export_scorer_artifact(
+        booster_json=json.loads(booster.save_raw(raw_format="json")),
+        categories=categories,
+        scaler_mean=scaler_mean,
+        scaler_scale=scaler_scale,
+        categorical_cols=CATEGORICAL_COLS,
+        numeric_cols=NUMERIC_COLS,
+        model_name="TEST_MODEL",
+        model_version="V1",
+    )
+    scorer = ResponseScorer.from_json(json.dumps(artifact))
+
+    expected = booster.predict(xgb.DMatrix(X))
+    np.testing.assert_allclose(scorer.predict_proba(records), expected, atol=1e-5)